@@ -1,24 +1,34 @@
 """Diagnostic routes for debugging the RAG pipeline."""
 
+import asyncio
 import logging
 from fastapi import APIRouter, HTTPException
 from app.services.vector_store import VectorStoreService
-from app.services.retrieval import RetrievalService
-from app.services.embedder import EmbeddingService
+from app.services.retrieval import RetrievalService, preview_text
 from app.api.routes import vector_store_service, retrieval_service
 
 logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
+# Reuse the embedding client already owned by the shared vector store
+embedding_service = vector_store_service.embedding_service
+
 
 @router.get("/diagnostic/search-test")
 async def test_search(query: str = "test"):
     """Test the search pipeline end-to-end."""
     try:
-        # Test 1: Check vector store
-        stats = vector_store_service.get_stats()
-        logger.info(f"Vector store stats: {stats}")
+        # Test 1 + 2: Check vector store and generate query embedding
+        # concurrently, so the embedding call hides the stats lookup
+        stats, query_embedding = await asyncio.gather(
+            asyncio.to_thread(vector_store_service.get_stats),
+            embedding_service.embed_text(query),
+            return_exceptions=True
+        )
+        if isinstance(stats, Exception):
+            raise stats
+        logger.info("Vector store stats: %s", stats)
         
         if stats['total_vectors'] == 0:
             return {
@@ -27,10 +37,9 @@ async def test_search(query: str = "test"):
                 "steps": []
             }
         
-        # Test 2: Generate query embedding
-        embedding_service = EmbeddingService()
-        query_embedding = await embedding_service.embed_text(query)
-        logger.info(f"Query embedding generated: {len(query_embedding)} dimensions")
+        if isinstance(query_embedding, Exception):
+            raise query_embedding
+        logger.info("Query embedding generated: %s dimensions", len(query_embedding))
         
         # Test 3: Search
         results = await vector_store_service.search(
@@ -38,7 +47,7 @@ async def test_search(query: str = "test"):
             top_k=5,
             threshold=0.0  # No threshold filtering
         )
-        logger.info(f"Search returned {len(results)} results")
+        logger.info("Search returned %s results", len(results))
         
         # Test 4: Retrieval service
         retrieval_results = await retrieval_service.retrieve(
@@ -46,7 +55,7 @@ async def test_search(query: str = "test"):
             top_k=5,
             threshold=0.0
         )
-        logger.info(f"Retrieval service returned {len(retrieval_results)} results")
+        logger.info("Retrieval service returned %s results", len(retrieval_results))
         
         return {
             "success": True,
@@ -57,7 +66,7 @@ async def test_search(query: str = "test"):
             "retrieval_service_results": len(retrieval_results),
             "sample_results": [
                 {
-                    "chunk_preview": chunk[:100] + "..." if len(chunk) > 100 else chunk,
+                    "chunk_preview": preview_text(chunk, 100),
                     "similarity": score,
                     "has_metadata": bool(metadata)
                 }
@@ -65,7 +74,7 @@ async def test_search(query: str = "test"):
             ] if results else [],
             "retrieval_sample": [
                 {
-                    "chunk_preview": chunk[:100] + "..." if len(chunk) > 100 else chunk,
+                    "chunk_preview": preview_text(chunk, 100),
                     "score": score,
                     "has_metadata": bool(metadata)
                 }
@@ -73,7 +82,7 @@ async def test_search(query: str = "test"):
             ] if retrieval_results else []
         }
     except Exception as e:
-        logger.error(f"Diagnostic test failed: {e}", exc_info=True)
+        logger.error("Diagnostic test failed: %s", e, exc_info=True)
         return {
             "error": str(e),
             "error_type": type(e).__name__
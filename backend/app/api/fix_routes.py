@@ -1,10 +1,13 @@
 """Routes for fixing data consistency issues."""
 
+import asyncio
 import logging
+import time
 from fastapi import APIRouter, HTTPException
+from sqlalchemy import func
 from app.services.vector_store import VectorStoreService
 from app.models.database import ChunkMetadata, get_db
-from app.api.routes import vector_store_service
+from app.api.routes import admin_operation, vector_store_service
 
 logger = logging.getLogger(__name__)
 
@@ -17,64 +20,63 @@ async def fix_metadata_mismatch():
     
     WARNING: This will clear the FAISS index and require re-uploading all documents!
     """
-    try:
-        stats = vector_store_service.get_stats()
-        
-        if stats['is_synced']:
+    async with admin_operation():
+        try:
+            stats = vector_store_service.get_stats()
+            
+            if stats['is_synced']:
+                return {
+                    "message": "No mismatch detected. Index and database are in sync.",
+                    "vectors": stats['total_vectors'],
+                    "chunks": stats['chunks_count']
+                }
+            
+            logger.warning(
+                "Fixing mismatch: %s vectors in index, %s chunks in database",
+                stats['total_vectors'], stats['chunks_count']
+            )
+            
+            # Option 1: Clear database to match index (loses metadata but keeps vectors)
+            # Option 2: Clear index to match database (loses vectors but keeps metadata)
+            # Option 3: Clear both and start fresh (recommended)
+            
+            # We'll clear both since having orphaned data is worse
+            
+            # Backup current state
+            backup_dir = vector_store_service.store_path / "backup"
+            backup_dir.mkdir(exist_ok=True)
+            
+            # Blocking file and DB work runs in worker threads so the event
+            # loop keeps serving other requests during large index copies;
+            # pending index writes land first so the backup is complete
+            await vector_store_service.flush_index()
+            if vector_store_service.index_path.exists():
+                backup_path = backup_dir / f"faiss.index.backup.{int(time.time())}"
+                await asyncio.to_thread(vector_store_service.backup_index, backup_path)
+                logger.info("Backed up index to %s", backup_path)
+            
+            # Clear database chunks
+            await asyncio.to_thread(vector_store_service.clear_metadata_in_db)
+            
+            # Delete FAISS index
+            if vector_store_service.index_path.exists():
+                await asyncio.to_thread(vector_store_service.index_path.unlink)
+                logger.info("Deleted FAISS index")
+            
+            # Recreate index
+            vector_store_service._create_new_index()
+            
             return {
-                "message": "No mismatch detected. Index and database are in sync.",
-                "vectors": stats['total_vectors'],
-                "chunks": stats['chunks_count']
+                "message": "Mismatch fixed. Both index and database have been cleared. Please re-upload your documents.",
+                "old_vectors": stats['total_vectors'],
+                "old_chunks": stats['chunks_count'],
+                "backup_location": str(backup_dir),
+                "action_required": "reupload_all_documents"
             }
-        
-        logger.warning(
-            f"Fixing mismatch: {stats['total_vectors']} vectors in index, "
-            f"{stats['chunks_count']} chunks in database"
-        )
-        
-        # Option 1: Clear database to match index (loses metadata but keeps vectors)
-        # Option 2: Clear index to match database (loses vectors but keeps metadata)
-        # Option 3: Clear both and start fresh (recommended)
-        
-        # We'll clear both since having orphaned data is worse
-        from pathlib import Path
-        import shutil
-        
-        # Backup current state
-        backup_dir = vector_store_service.store_path / "backup"
-        backup_dir.mkdir(exist_ok=True)
-        
-        if vector_store_service.index_path.exists():
-            backup_path = backup_dir / f"faiss.index.backup.{int(__import__('time').time())}"
-            shutil.copy(vector_store_service.index_path, backup_path)
-            logger.info(f"Backed up index to {backup_path}")
-        
-        # Clear database chunks
-        with get_db() as db:
-            count = db.query(ChunkMetadata).count()
-            db.query(ChunkMetadata).delete()
-            db.commit()
-            logger.info(f"Cleared {count} chunk metadata records from database")
-        
-        # Delete FAISS index
-        if vector_store_service.index_path.exists():
-            vector_store_service.index_path.unlink()
-            logger.info("Deleted FAISS index")
-        
-        # Recreate index
-        vector_store_service._create_new_index()
-        
-        return {
-            "message": "Mismatch fixed. Both index and database have been cleared. Please re-upload your documents.",
-            "old_vectors": stats['total_vectors'],
-            "old_chunks": stats['chunks_count'],
-            "backup_location": str(backup_dir),
-            "action_required": "reupload_all_documents"
-        }
-        
-    except Exception as e:
-        logger.error(f"Error fixing metadata mismatch: {e}", exc_info=True)
-        raise HTTPException(status_code=500, detail=f"Error fixing mismatch: {str(e)}")
+            
+        except Exception as e:
+            logger.error("Error fixing metadata mismatch: %s", e, exc_info=True)
+            raise HTTPException(status_code=500, detail=f"Error fixing mismatch: {str(e)}")
 
 
 @router.get("/check-sync")
@@ -83,25 +85,22 @@ async def check_sync():
     try:
         stats = vector_store_service.get_stats()
         
-        # Get sample of FAISS IDs to check
-        sample_ids = []
+        # FAISS IDs are sequential, so the first 100 can be checked with a
+        # single COUNT over faiss_id < n
+        sample_size = 0
         if vector_store_service.index and vector_store_service.index.ntotal > 0:
-            # Check first 100 IDs
-            sample_ids = list(range(min(100, vector_store_service.index.ntotal)))
+            sample_size = min(100, vector_store_service.index.ntotal)
         
         missing_count = 0
         found_count = 0
         
-        if sample_ids:
+        if sample_size:
             with get_db() as db:
-                for faiss_id in sample_ids:
-                    exists = db.query(ChunkMetadata).filter(
-                        ChunkMetadata.faiss_id == faiss_id
-                    ).first()
-                    if exists:
-                        found_count += 1
-                    else:
-                        missing_count += 1
+                found_count = db.query(func.count(ChunkMetadata.faiss_id)).filter(
+                    ChunkMetadata.faiss_id >= 0,
+                    ChunkMetadata.faiss_id < sample_size
+                ).scalar() or 0
+                missing_count = sample_size - found_count
         
         return {
             "is_synced": stats['is_synced'],
@@ -109,10 +108,10 @@ async def check_sync():
             "chunks_in_database": stats['chunks_count'],
             "mismatch": stats['total_vectors'] - stats['chunks_count'],
             "sample_check": {
-                "checked_ids": len(sample_ids),
+                "checked_ids": sample_size,
                 "found": found_count,
                 "missing": missing_count,
-                "match_rate": found_count / len(sample_ids) if sample_ids else 0
+                "match_rate": found_count / sample_size if sample_size else 0
             },
             "recommendation": (
                 "reupload_documents" if not stats['is_synced'] else "system_healthy"
@@ -120,7 +119,7 @@ async def check_sync():
         }
         
     except Exception as e:
-        logger.error(f"Error checking sync: {e}", exc_info=True)
+        logger.error("Error checking sync: %s", e, exc_info=True)
         raise HTTPException(status_code=500, detail=f"Error checking sync: {str(e)}")
 
 
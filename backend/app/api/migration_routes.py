@@ -1,11 +1,11 @@
 """Migration routes for fixing index compatibility issues."""
 
+import asyncio
 import logging
+import faiss
 from fastapi import APIRouter, HTTPException
-from pathlib import Path
-import shutil
-from app.services.vector_store import VectorStoreService
-from app.models.database import ChunkMetadata, get_db
+from app.api.routes import admin_operation, vector_store_service
+from app.services.vector_store import peek_index_type
 
 logger = logging.getLogger(__name__)
 
@@ -18,60 +18,61 @@ async def migrate_index_to_cosine():
     
     WARNING: This will delete the old index and require re-uploading documents!
     """
-    try:
-        vector_store = VectorStoreService()
-        
-        # Check current index type
-        if vector_store.index is None:
-            return {"message": "No index exists", "action": "none"}
-        
-        index_type = type(vector_store.index).__name__
-        
-        if "IndexFlatIP" in index_type or "IP" in index_type:
-            return {
-                "message": "Index is already using cosine similarity (IndexFlatIP)",
-                "index_type": index_type,
-                "action": "none"
-            }
-        
-        if "L2" in index_type:
-            # Backup old index
-            backup_path = vector_store.index_path.with_suffix('.index.backup')
-            if vector_store.index_path.exists():
-                shutil.copy(vector_store.index_path, backup_path)
-                logger.info(f"Backed up old index to {backup_path}")
+    async with admin_operation():
+        try:
+            # Write pending vectors first so the file on disk matches the
+            # live index, then check its metric from the file header
+            await vector_store_service.flush_index()
+            header = await asyncio.to_thread(
+                peek_index_type, vector_store_service.index_path
+            )
             
-            # Clear database chunks (they need to be re-indexed)
-            with get_db() as db:
-                count = db.query(ChunkMetadata).count()
-                db.query(ChunkMetadata).delete()
-                db.commit()
-                logger.info(f"Cleared {count} chunk metadata records from database")
+            if header is None:
+                return {"message": "No index exists", "action": "none"}
+            index_type, metric = header
             
-            # Delete old index
-            vector_store.index_path.unlink()
-            logger.info("Deleted old L2 index")
+            if metric == faiss.METRIC_INNER_PRODUCT:
+                return {
+                    "message": "Index is already using cosine similarity (inner product)",
+                    "index_type": index_type,
+                    "action": "none"
+                }
             
-            # Create new index
-            vector_store._create_new_index()
+            if metric == faiss.METRIC_L2:
+                # Migrate the shared service in place; a second instance would
+                # share (and could delete) its write-ahead log. Backup old index
+                backup_path = vector_store_service.index_path.with_suffix('.index.backup')
+                if vector_store_service.index_path.exists():
+                    await asyncio.to_thread(vector_store_service.backup_index, backup_path)
+                    logger.info("Backed up old index to %s", backup_path)
+                
+                # Clear database chunks (they need to be re-indexed)
+                await asyncio.to_thread(vector_store_service.clear_metadata_in_db)
+                
+                # Delete old index
+                await asyncio.to_thread(vector_store_service.index_path.unlink)
+                logger.info("Deleted old L2 index")
+                
+                # Create new index
+                vector_store_service._create_new_index()
+                
+                return {
+                    "message": "Index migrated successfully. Please re-upload your documents.",
+                    "old_index_type": index_type,
+                    "new_index_type": "IndexFlatIP",
+                    "backup_location": str(backup_path),
+                    "action": "reupload_required"
+                }
             
             return {
-                "message": "Index migrated successfully. Please re-upload your documents.",
-                "old_index_type": index_type,
-                "new_index_type": "IndexFlatIP",
-                "backup_location": str(backup_path),
-                "action": "reupload_required"
+                "message": f"Unknown index metric {metric} ({index_type})",
+                "index_type": index_type,
+                "action": "unknown"
             }
-        
-        return {
-            "message": f"Unknown index type: {index_type}",
-            "index_type": index_type,
-            "action": "unknown"
-        }
-        
-    except Exception as e:
-        logger.error(f"Error migrating index: {e}", exc_info=True)
-        raise HTTPException(status_code=500, detail=f"Error migrating index: {str(e)}")
+            
+        except Exception as e:
+            logger.error("Error migrating index: %s", e, exc_info=True)
+            raise HTTPException(status_code=500, detail=f"Error migrating index: {str(e)}")
 
 
 
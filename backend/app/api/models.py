@@ -1,7 +1,7 @@
 """Pydantic models for API requests and responses."""
 
 from typing import Optional, List, Dict, Any
-from pydantic import BaseModel
+from pydantic import BaseModel, TypeAdapter
 
 
 class QueryRequest(BaseModel):
@@ -18,6 +18,10 @@ class SourceItem(BaseModel):
     metadata: Dict[str, Any]
 
 
+# Validates/serializes a whole sources list in one core call
+sources_adapter = TypeAdapter(List[SourceItem])
+
+
 class QueryResponse(BaseModel):
     """Response model for query results."""
     answer: str
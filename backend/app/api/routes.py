@@ -1,14 +1,21 @@
 """FastAPI routes for RAG application."""
 
+import asyncio
 import logging
 import time
-from fastapi import APIRouter, HTTPException, UploadFile, File
+from contextlib import asynccontextmanager
+from pathlib import Path
+from typing import AsyncIterator, Dict, List
+from fastapi import APIRouter, Depends, HTTPException, UploadFile, File
+from sqlalchemy.ext.asyncio import AsyncSession
+from fastapi.responses import ORJSONResponse
 from app.api.models import (
     QueryRequest,
     QueryResponse,
     IngestRequest,
     IngestResponse,
     HealthResponse,
+    sources_adapter,
 )
 from app.services.ingestion import IngestionService
 from app.services.chunker import ChunkingService
@@ -17,6 +24,7 @@ from app.services.retrieval import RetrievalService
 from app.services.synthesis import SynthesisService
 from app.services.analytics import AnalyticsService
 from app.core.config import settings
+from app.models.database import get_async_session
 
 logger = logging.getLogger(__name__)
 
@@ -30,6 +38,18 @@ retrieval_service = RetrievalService(vector_store_service)
 synthesis_service = SynthesisService()
 analytics_service = AnalyticsService()
 
+# Serializes destructive admin operations on the shared index and database
+_admin_lock = asyncio.Lock()
+
+
+@asynccontextmanager
+async def admin_operation() -> AsyncIterator[None]:
+    """Hold the admin lock, rejecting callers while another operation runs."""
+    if _admin_lock.locked():
+        raise HTTPException(status_code=409, detail="Another admin operation is in progress")
+    async with _admin_lock:
+        yield
+
 
 @router.get("/health", response_model=HealthResponse)
 async def health_check():
@@ -49,47 +69,79 @@ async def health_check():
             vector_store_stats=stats
         )
     except Exception as e:
-        logger.error(f"Health check failed: {e}")
+        logger.error("Health check failed: %s", e)
         raise HTTPException(status_code=500, detail=str(e))
 
 
+async def _add_documents_in_batches(chunks: List[str], metadata_list: List[Dict]) -> None:
+    """Add chunks to the vector store in fixed-size batches.
+    
+    Batches run sequentially since each one appends to the index and
+    assigns FAISS IDs from the current chunk count.
+    """
+    batch_size = settings.INGEST_BATCH_SIZE
+    for i in range(0, len(chunks), batch_size):
+        await vector_store_service.add_documents(
+            chunks[i:i + batch_size],
+            metadata=metadata_list[i:i + batch_size]
+        )
+
+
+def _delete_store_files(store_path: Path) -> None:
+    """Delete every file in the vector store directory."""
+    for file in store_path.iterdir():
+        if file.is_file():
+            file.unlink()
+            logger.info("Deleted %s", file)
+
+
 @router.post("/reset-vector-store")
 async def reset_vector_store():
     """Reset/clear the vector store (for debugging)."""
-    try:
-        import shutil
-        import os
-        
-        # Clear the vector store directory
-        store_path = vector_store_service.store_path
-        if store_path.exists():
-            for file in store_path.iterdir():
-                if file.is_file():
-                    file.unlink()
-                    logger.info(f"Deleted {file}")
-        
-        # Reset in-memory state
-        vector_store_service.index = None
-        vector_store_service._create_new_index()
-        
-        # Clear database metadata
+    async with admin_operation():
         try:
-            from app.models.database import ChunkMetadata, get_db
-            with get_db() as db:
-                db.query(ChunkMetadata).delete()
-                db.commit()
-            logger.info("Cleared chunk metadata from database")
+            # Clear the vector store directory (off the event loop), after
+            # any in-flight index write that could recreate the file
+            await vector_store_service.flush_index()
+            store_path = vector_store_service.store_path
+            if store_path.exists():
+                await asyncio.to_thread(_delete_store_files, store_path)
+            
+            # Reset in-memory state
+            vector_store_service.index = None
+            vector_store_service._create_new_index()
+            
+            # Clear database metadata
+            try:
+                await asyncio.to_thread(vector_store_service.clear_metadata_in_db)
+            except Exception as e:
+                logger.warning("Failed to clear database metadata: %s", e)
+            
+            logger.info("Vector store reset successfully")
+            return {
+                "message": "Vector store reset successfully",
+                "stats": vector_store_service.get_stats()
+            }
         except Exception as e:
-            logger.warning(f"Failed to clear database metadata: {e}")
-        
-        logger.info("Vector store reset successfully")
-        return {
-            "message": "Vector store reset successfully",
-            "stats": vector_store_service.get_stats()
-        }
-    except Exception as e:
-        logger.error(f"Error resetting vector store: {e}")
-        raise HTTPException(status_code=500, detail=f"Error resetting vector store: {str(e)}")
+            logger.error("Error resetting vector store: %s", e)
+            raise HTTPException(status_code=500, detail=f"Error resetting vector store: {str(e)}")
+
+
+def _early_return(
+    request: QueryRequest,
+    answer: str,
+    start_time: float,
+    **log_fields
+) -> QueryResponse:
+    """Build a source-less /query response and log it in the background."""
+    analytics_service.log_query(
+        query_text=request.query,
+        answer=answer,
+        sources_count=0,
+        response_time_ms=(time.time() - start_time) * 1000,
+        **log_fields
+    )
+    return QueryResponse(answer=answer, sources=[], query=request.query)
 
 
 @router.post("/query", response_model=QueryResponse)
@@ -112,11 +164,11 @@ async def query_documents(request: QueryRequest):
     error_message = None
     
     try:
-        logger.info(f"Processing query: {request.query}")
+        logger.info("Processing query: %s", request.query)
         
         # Check vector store status before querying
         stats = vector_store_service.get_stats()
-        logger.info(f"Vector store stats: {stats}")
+        logger.info("Vector store stats: %s", stats)
         
         if stats['total_vectors'] == 0:
             logger.warning("Vector store is empty - no documents have been successfully embedded")
@@ -127,79 +179,61 @@ async def query_documents(request: QueryRequest):
                 f"Please re-upload your documents. "
                 f"If this persists, check your NOMIC_API_KEY configuration and server logs."
             )
-            response = QueryResponse(
-                answer=answer,
-                sources=[],
-                query=request.query
-            )
             # Log failed query
-            total_time = (time.time() - start_time) * 1000
-            analytics_service.log_query(
-                query_text=request.query,
-                answer=answer,
-                sources_count=0,
-                response_time_ms=total_time,
+            return _early_return(
+                request,
+                answer,
+                start_time,
                 success=False,
                 error_message="Vector store empty"
             )
-            return response
         
-        # Retrieve relevant chunks (track retrieval time)
+        # Retrieve relevant chunks in one pass (track retrieval time). If
+        # nothing clears the threshold, retrieve() falls back to the best
+        # candidates at any similarity, so a miss doesn't cost a second
+        # embedding + search.
+        top_k = request.top_k or settings.TOP_K_RESULTS
         retrieval_start = time.time()
         results = await retrieval_service.retrieve(
             query=request.query,
-            top_k=request.top_k,
-            threshold=request.threshold
+            top_k=top_k,
+            threshold=request.threshold,
+            fallback_threshold=0.0
         )
         retrieval_time = (time.time() - retrieval_start) * 1000
+        results = results[:top_k]
         
         if not results:
-            # Try with very low threshold and more results
-            logger.info(f"No results with threshold {request.threshold or settings.SIMILARITY_THRESHOLD}, trying with minimal threshold")
-            retrieval_start = time.time()
-            results = await retrieval_service.retrieve(
-                query=request.query,
-                top_k=(request.top_k or settings.TOP_K_RESULTS) * 2,  # Get more candidates
-                threshold=0.0  # Accept any similarity (let reranker/synthesis filter)
+            answer = (
+                f"⚠️ No relevant documents found for your query. "
+                f"The vector store has {stats['total_vectors']} vectors, "
+                f"but none matched your question. Try rephrasing your question or checking if the document contains relevant information."
+            )
+            # Log query with no results (query succeeded, just no results)
+            return _early_return(
+                request,
+                answer,
+                start_time,
+                retrieval_time_ms=retrieval_time,
+                success=True
             )
-            retrieval_time = (time.time() - retrieval_start) * 1000
-            
-            if not results:
-                answer = (
-                    f"⚠️ No relevant documents found for your query. "
-                    f"The vector store has {stats['total_vectors']} vectors, "
-                    f"but none matched your question. Try rephrasing your question or checking if the document contains relevant information."
-                )
-                response = QueryResponse(
-                    answer=answer,
-                    sources=[],
-                    query=request.query
-                )
-                # Log query with no results
-                total_time = (time.time() - start_time) * 1000
-                analytics_service.log_query(
-                    query_text=request.query,
-                    answer=answer,
-                    sources_count=0,
-                    response_time_ms=total_time,
-                    retrieval_time_ms=retrieval_time,
-                    success=True  # Query succeeded, just no results
-                )
-                return response
         
         # Format context
-        logger.info(f"Formatting context from {len(results)} results")
-        context = retrieval_service.format_context(results)
+        logger.info("Formatting context from %s results", len(results))
+        context, sources = retrieval_service.format_context_and_sources(results)
         
         if not context or len(context.strip()) == 0:
-            logger.error("Context is empty after formatting! Results were: " + str([(len(chunk), score) for chunk, score, _ in results]))
+            logger.error(
+                "Context is empty after formatting! Results were: %s",
+                [(len(chunk), score) for chunk, score, _ in results]
+            )
             answer = (
                 f"⚠️ Retrieved {len(results)} results but could not format context. "
                 f"This may indicate an issue with the retrieved chunks. Please check server logs."
             )
         else:
             # Synthesize answer (track synthesis time)
-            logger.info(f"Synthesizing answer with context length: {len(context)} chars")
+            logger.info("Synthesizing answer with context length: %s chars", len(context))
             synthesis_start = time.time()
             try:
                 answer = await synthesis_service.synthesize(
@@ -208,7 +242,7 @@ async def query_documents(request: QueryRequest):
                 )
                 synthesis_time = (time.time() - synthesis_start) * 1000
             except Exception as e:
-                logger.error(f"Synthesis failed: {e}", exc_info=True)
+                logger.error("Synthesis failed: %s", e, exc_info=True)
                 synthesis_time = (time.time() - synthesis_start) * 1000
                 answer = (
                     f"⚠️ Error generating answer: {str(e)}. "
@@ -216,16 +250,6 @@ async def query_documents(request: QueryRequest):
                     f"Please check server logs for details."
                 )
         
-        # Format sources
-        sources = [
-            {
-                "chunk": chunk[:200] + "..." if len(chunk) > 200 else chunk,
-                "similarity": score,
-                "metadata": metadata
-            }
-            for chunk, score, metadata in results
-        ]
-        
         success = True
         total_time = (time.time() - start_time) * 1000
         
@@ -237,18 +261,27 @@ async def query_documents(request: QueryRequest):
             response_time_ms=total_time,
             retrieval_time_ms=retrieval_time,
             synthesis_time_ms=synthesis_time,
-            success=True
+            success=True,
+            metadata={"source_files": sorted({
+                metadata["filename"]
+                for _, _, metadata in results
+                if metadata and metadata.get("filename")
+            })}
         )
         
-        return QueryResponse(
-            answer=answer,
-            sources=sources,
-            query=request.query
-        )
+        # Validate sources once and return the payload directly, skipping
+        # FastAPI's second response_model validation pass
+        return ORJSONResponse(content={
+            "answer": answer,
+            "sources": sources_adapter.dump_python(
+                sources_adapter.validate_python(sources), mode="json"
+            ),
+            "query": request.query
+        })
         
     except Exception as e:
         error_message = str(e)
-        logger.error(f"Error processing query: {e}")
+        logger.error("Error processing query: %s", e)
         total_time = (time.time() - start_time) * 1000
         
         # Log failed query
@@ -280,23 +313,19 @@ async def ingest_documents(request: IngestRequest):
     try:
         if request.file_path:
             # Load from file
-            logger.info(f"Ingesting file: {request.file_path}")
+            logger.info("Ingesting file: %s", request.file_path)
             documents = await ingestion_service.load_file(request.file_path)
             # Extract documents with metadata
             documents_with_metadata = ingestion_service.extract_documents_with_metadata(documents)
             
             # Add filename to all metadata (create copy to avoid mutation)
-            from pathlib import Path
             file_path_obj = Path(request.file_path)
             filename = file_path_obj.name
-            updated_documents = []
-            for text, metadata in documents_with_metadata:
-                # Create a copy of metadata to avoid mutating original
-                metadata_copy = metadata.copy() if metadata else {}
-                metadata_copy['filename'] = filename
-                metadata_copy['source'] = filename  # Also add to source for compatibility
-                updated_documents.append((text, metadata_copy))
-            documents_with_metadata = updated_documents
+            # 'source' is also set for compatibility
+            documents_with_metadata = [
+                (text, {**(metadata or {}), 'filename': filename, 'source': filename})
+                for text, metadata in documents_with_metadata
+            ]
             
             # Chunk documents with metadata preservation
             chunks_with_metadata = chunking_service.chunk_documents_with_metadata(documents_with_metadata)
@@ -321,9 +350,9 @@ async def ingest_documents(request: IngestRequest):
         
         # Add to vector store with metadata
         try:
-            await vector_store_service.add_documents(chunks, metadata=metadata_list)
+            await _add_documents_in_batches(chunks, metadata_list)
         except Exception as e:
-            logger.error(f"Failed to add documents to vector store: {e}")
+            logger.error("Failed to add documents to vector store: %s", e)
             raise HTTPException(
                 status_code=500,
                 detail=f"Failed to generate embeddings and add to vector store: {str(e)}. "
@@ -348,36 +377,34 @@ async def ingest_documents(request: IngestRequest):
         )
         
     except Exception as e:
-        logger.error(f"Error ingesting documents: {e}")
+        logger.error("Error ingesting documents: %s", e)
         raise HTTPException(status_code=500, detail=f"Error ingesting documents: {str(e)}")
 
 
 @router.post("/ingest/upload", response_model=IngestResponse)
-async def upload_and_ingest(file: UploadFile = File(...)):
+async def upload_and_ingest(
+    file: UploadFile = File(...),
+    db: AsyncSession = Depends(get_async_session)
+):
     """Upload and ingest a file.
     
     Args:
         file: Uploaded file
+        db: Request-scoped database session
         
     Returns:
         Status message with chunk counts
     """
     try:
-        # Check file size
-        file_content = await file.read()
-        file_size_mb = len(file_content) / (1024 * 1024)
-        
-        if file_size_mb > settings.MAX_FILE_SIZE_MB:
-            raise HTTPException(
-                status_code=400,
-                detail=f"File size ({file_size_mb:.2f} MB) exceeds maximum ({settings.MAX_FILE_SIZE_MB} MB)"
+        # Copy the spooled upload to disk, enforcing the size limit first
+        try:
+            file_path, file_size_bytes = await ingestion_service.save_uploaded_file(
+                file_obj=file.file,
+                filename=file.filename,
+                max_size_bytes=settings.MAX_FILE_SIZE_MB * 1024 * 1024
             )
-        
-        # Save file
-        file_path = await ingestion_service.save_uploaded_file(
-            file_content=file_content,
-            filename=file.filename
-        )
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
         
         # Load and process
         documents = await ingestion_service.load_file(file_path)
@@ -386,14 +413,11 @@ async def upload_and_ingest(file: UploadFile = File(...)):
         
         # Add filename to all metadata (create copy to avoid mutation)
         filename = file.filename or "unknown"
-        updated_documents = []
-        for text, metadata in documents_with_metadata:
-            # Create a copy of metadata to avoid mutating original
-            metadata_copy = metadata.copy() if metadata else {}
-            metadata_copy['filename'] = filename
-            metadata_copy['source'] = filename  # Also add to source for compatibility
-            updated_documents.append((text, metadata_copy))
-        documents_with_metadata = updated_documents
+        # 'source' is also set for compatibility
+        documents_with_metadata = [
+            (text, {**(metadata or {}), 'filename': filename, 'source': filename})
+            for text, metadata in documents_with_metadata
+        ]
         
         # Chunk documents with metadata preservation
         chunks_with_metadata = chunking_service.chunk_documents_with_metadata(documents_with_metadata)
@@ -408,9 +432,9 @@ async def upload_and_ingest(file: UploadFile = File(...)):
         
         # Add to vector store with metadata
         try:
-            await vector_store_service.add_documents(chunks, metadata=metadata_list)
+            await _add_documents_in_batches(chunks, metadata_list)
         except Exception as e:
-            logger.error(f"Failed to add documents to vector store: {e}")
+            logger.error("Failed to add documents to vector store: %s", e)
             raise HTTPException(
                 status_code=500,
                 detail=f"Failed to generate embeddings and add to vector store: {str(e)}. "
@@ -429,17 +453,17 @@ async def upload_and_ingest(file: UploadFile = File(...)):
             )
         
         # Register document in database
-        from pathlib import Path
         file_path_obj = Path(file_path)
         pages = len(documents) if documents else None
-        doc_id = analytics_service.register_document(
+        doc_id = await analytics_service.register_document(
             filename=file.filename or "unknown",
             file_path=file_path,
-            file_size_bytes=len(file_content),
+            file_size_bytes=file_size_bytes,
             file_type=file_path_obj.suffix.lower() or "unknown",
             pages=pages,
             chunks_count=len(chunks),
-            vectors_count=stats['total_vectors']
+            vectors_count=stats['total_vectors'],
+            db=db
         )
         
         return IngestResponse(
@@ -451,7 +475,7 @@ async def upload_and_ingest(file: UploadFile = File(...)):
     except HTTPException:
         raise
     except Exception as e:
-        logger.error(f"Error uploading and ingesting file: {e}")
+        logger.error("Error uploading and ingesting file: %s", e)
         raise HTTPException(status_code=500, detail=f"Error processing file: {str(e)}")
 
 
@@ -1,6 +1,8 @@
 """Application configuration using Pydantic settings."""
 
 import os
+import re
+from functools import lru_cache
 from typing import Optional
 from pydantic_settings import BaseSettings
 from pydantic import Field
@@ -13,10 +15,18 @@ class Settings(BaseSettings):
     API_TITLE: str = "RAG Document Q&A API"
     API_VERSION: str = "1.0.0"
     DEBUG: bool = Field(default=False, env="DEBUG")
+    ENABLE_ADMIN_ROUTES: bool = Field(
+        default=False,
+        env="ENABLE_ADMIN_ROUTES"
+    )  # Mount diagnostic, migration and fix endpoints
     
     # Server Configuration
     HOST: str = Field(default="0.0.0.0", env="HOST")
     PORT: int = Field(default=8000, env="PORT")
+    API_WORKERS: int = Field(
+        default=1,
+        env="API_WORKERS"
+    )  # Uvicorn worker processes; FAISS threads are split across them
     
     # Database Configuration
     DATABASE_URL: str = Field(
@@ -35,6 +45,18 @@ class Settings(BaseSettings):
     )
     EMBEDDING_DIMENSION: int = Field(default=768, env="EMBEDDING_DIMENSION")
     NOMIC_API_KEY: Optional[str] = Field(default=None, env="NOMIC_API_KEY")
+    NOMIC_API_URL: str = Field(
+        default="https://api-atlas.nomic.ai",
+        env="NOMIC_API_URL"
+    )
+    EMBED_CACHE_DIR: str = Field(
+        default="./data/embedding_cache",
+        env="EMBED_CACHE_DIR"
+    )  # On-disk embedding cache; empty disables it
+    EMBED_CACHE_MAX_ENTRIES: int = Field(
+        default=100_000,
+        env="EMBED_CACHE_MAX_ENTRIES"
+    )  # Least recently used embeddings are evicted past this (~3 KB each)
     
     # Chunking Configuration
     CHUNK_SIZE: int = Field(default=600, env="CHUNK_SIZE")
@@ -51,6 +73,13 @@ class Settings(BaseSettings):
         env="SIMILARITY_THRESHOLD"
     )
     
+    # Reranker Configuration
+    RERANKER_MODEL_DIR: str = Field(
+        default="./models/ms-marco-MiniLM-L-6-v2",
+        env="RERANKER_MODEL_DIR"
+    )  # ONNX cross-encoder (model.onnx) and tokenizer.json
+    RERANKER_MAX_LENGTH: int = Field(default=512, env="RERANKER_MAX_LENGTH")
+    
     # Vector Store Configuration
     VECTOR_STORE_DIR: str = Field(
         default="./data/vector_store",
@@ -60,6 +89,22 @@ class Settings(BaseSettings):
         default="faiss.index",
         env="VECTOR_STORE_INDEX_NAME"
     )
+    VECTOR_STORE_IVF_MIN_VECTORS: int = Field(
+        default=10000,
+        env="VECTOR_STORE_IVF_MIN_VECTORS"
+    )  # Index size at which the exact flat index is replaced by IVF
+    VECTOR_STORE_IVF_CODEC: str = Field(
+        default="sq8",
+        env="VECTOR_STORE_IVF_CODEC"
+    )  # Vector compression in IVF indexes: "sq8" (near-exact scores) or "pq" (smaller, approximate scores)
+    VECTOR_STORE_IVF_NPROBE: int = Field(
+        default=16,
+        env="VECTOR_STORE_IVF_NPROBE"
+    )  # IVF cells scanned per query; higher trades speed for recall
+    INGEST_BATCH_SIZE: int = Field(
+        default=128,
+        env="INGEST_BATCH_SIZE"
+    )  # Chunks embedded and added to the index per batch
     
     # LLM Configuration (for synthesis)
     LLM_PROVIDER: str = Field(
@@ -85,6 +130,12 @@ class Settings(BaseSettings):
         env="CORS_ORIGINS"
     )  # Comma-separated list of origins, or "*" for all
     
+    # Performance Middleware Configuration
+    PERF_MIDDLEWARE_SKIP_PATHS: str = Field(
+        default="/,/docs,/openapi.json,/redoc,/api/v1/health",
+        env="PERF_MIDDLEWARE_SKIP_PATHS"
+    )  # Comma-separated paths served without timing
+    
     # Logging Configuration
     LOG_LEVEL: str = Field(default="INFO", env="LOG_LEVEL")
     LOG_FILE: Optional[str] = Field(default=None, env="LOG_FILE")
@@ -93,16 +144,59 @@ class Settings(BaseSettings):
         env_file = ".env"
         env_file_encoding = "utf-8"
         case_sensitive = False
+        frozen = True  # Read-only after load, so derived values can be cached
 
 
 # Create settings instance
 settings = Settings()
 
 
+def _split_cors_origins() -> list:
+    """Split CORS_ORIGINS on commas, dropping blanks."""
+    return [origin.strip() for origin in settings.CORS_ORIGINS.split(",") if origin.strip()]
+
+
 # Helper function to get CORS origins as list
+@lru_cache(maxsize=1)
 def get_cors_origins() -> list:
-    """Get CORS origins as a list."""
+    """Get exact-match CORS origins as a list.
+    
+    Wildcard entries such as "https://*.example.com" are excluded here and
+    served by get_cors_origin_regex() instead.
+    """
     origins_str = settings.CORS_ORIGINS
     if origins_str == "*":
         return ["*"]
-    return [origin.strip() for origin in origins_str.split(",") if origin.strip()]
+    return [origin for origin in _split_cors_origins() if "*" not in origin]
+
+
+@lru_cache(maxsize=1)
+def get_cors_origin_regex() -> Optional[str]:
+    """Combine wildcard CORS origins into a single regex.
+    
+    Each "*" matches one or more characters other than "/", so
+    "https://*.example.com" allows any subdomain of example.com.
+    
+    Returns:
+        Pattern for CORSMiddleware's allow_origin_regex, or None if there are
+        no wildcard entries
+    """
+    if settings.CORS_ORIGINS == "*":
+        return None
+    patterns = [
+        re.escape(origin).replace(r"\*", "[^/]+")
+        for origin in _split_cors_origins()
+        if "*" in origin
+    ]
+    if not patterns:
+        return None
+    return "(?:" + "|".join(patterns) + ")"
+
+
+def get_worker_cpu_count() -> int:
+    """CPUs available to each API worker process.
+    
+    Thread and process pools are sized with this rather than os.cpu_count(),
+    so API_WORKERS workers together don't oversubscribe the machine.
+    """
+    return max(1, (os.cpu_count() or 1) // max(1, settings.API_WORKERS))
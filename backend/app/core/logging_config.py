@@ -1,45 +1,62 @@
 """Logging configuration."""
 
+import atexit
 import logging
+import queue
 import sys
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
 from pathlib import Path
 
+# Rotate app.log at this size, keeping LOG_BACKUP_COUNT old files
+LOG_MAX_BYTES = 50 * 1024 * 1024
+LOG_BACKUP_COUNT = 5
+
 
 def setup_logging(log_level: str = "INFO") -> None:
     """Configure application logging.
     
+    Log calls merge the message with its arguments and enqueue the record;
+    applying the log format and the stream/file writes happen on a
+    QueueListener thread so request handlers never block on log I/O.
+    
     Args:
         log_level: Logging level (DEBUG, INFO, WARNING, ERROR)
     """
     log_format = "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
     date_format = "%Y-%m-%d %H:%M:%S"
+    formatter = logging.Formatter(log_format, datefmt=date_format)
     
     # Create logs directory if it doesn't exist
     log_dir = Path("./logs")
     log_dir.mkdir(exist_ok=True)
     
+    stream_handler = logging.StreamHandler(sys.stdout)
+    file_handler = RotatingFileHandler(
+        log_dir / "app.log",
+        maxBytes=LOG_MAX_BYTES,
+        backupCount=LOG_BACKUP_COUNT,
+    )
+    for handler in (stream_handler, file_handler):
+        handler.setFormatter(formatter)
+    
+    log_queue: queue.Queue = queue.Queue(-1)
+    listener = QueueListener(
+        log_queue, stream_handler, file_handler, respect_handler_level=True
+    )
+    listener.start()
+    atexit.register(listener.stop)
+    
+    # Records are formatted by the listener's handlers, so the queue handler
+    # only renders the bare message
+    queue_handler = QueueHandler(log_queue)
+    queue_handler.setFormatter(logging.Formatter("%(message)s"))
+    
     # Configure root logger
     logging.basicConfig(
         level=getattr(logging, log_level.upper()),
-        format=log_format,
-        datefmt=date_format,
-        handlers=[
-            logging.StreamHandler(sys.stdout),
-            logging.FileHandler(log_dir / "app.log"),
-        ],
+        handlers=[queue_handler],
     )
     
     # Set specific loggers
     logging.getLogger("uvicorn").setLevel(logging.INFO)
     logging.getLogger("httpx").setLevel(logging.WARNING)
-
-
-
-
-
-
-
-
-
-
-
@@ -1,15 +1,20 @@
 """FastAPI main application."""
 
+import asyncio
 import logging
+import sys
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from app.api.routes import router
+from fastapi.responses import ORJSONResponse
+from app.api.routes import router, analytics_service, ingestion_service, vector_store_service
 from app.api.analytics_routes import router as analytics_router
 from app.api.business_routes import router as business_router
 from app.middleware.performance import PerformanceMiddleware
-from app.core.config import settings, get_cors_origins
+from app.core.config import settings, get_cors_origins, get_cors_origin_regex
 from app.core.logging_config import setup_logging
-from app.models.database import init_db
+from app.models.database import get_async_engine, init_db
+from app.services.business_insights import shutdown_scan_executor
 
 # Setup logging
 setup_logging(log_level="INFO" if not settings.DEBUG else "DEBUG")
@@ -22,11 +27,35 @@ try:
 except Exception as e:
     logger.warning(f"Database initialization warning: {e}")
 
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Application startup/shutdown hooks."""
+    flusher = asyncio.create_task(analytics_service.run_flusher())
+    search_batcher = asyncio.create_task(vector_store_service.run_search_batcher())
+    yield
+    # Stop the background batchers; each finishes what is still queued
+    for task in (search_batcher, flusher):
+        task.cancel()
+        try:
+            await task
+        except asyncio.CancelledError:
+            pass
+    await analytics_service.flush()
+    await vector_store_service.flush_index()
+    await vector_store_service.embedding_service.close()
+    ingestion_service.shutdown()
+    shutdown_scan_executor()
+    await get_async_engine().dispose()
+
+
 # Create FastAPI app
 app = FastAPI(
     title=settings.API_TITLE,
     version=settings.API_VERSION,
     description="Production-ready RAG Document Q&A API with Analytics",
+    lifespan=lifespan,
+    default_response_class=ORJSONResponse,
 )
 
 # Performance tracking middleware
@@ -36,6 +65,7 @@ app.add_middleware(PerformanceMiddleware)
 app.add_middleware(
     CORSMiddleware,
     allow_origins=get_cors_origins(),
+    allow_origin_regex=get_cors_origin_regex(),
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
@@ -46,17 +76,20 @@ app.include_router(router, prefix="/api/v1", tags=["RAG"])
 app.include_router(analytics_router, prefix="/api/v1", tags=["Analytics"])
 app.include_router(business_router, prefix="/api/v1/business", tags=["Business Analysis"])
 
-# Include diagnostic router for debugging
-from app.api.diagnostic_routes import router as diagnostic_router
-app.include_router(diagnostic_router, prefix="/api/v1/diagnostic", tags=["Diagnostics"])
-
-# Include migration router for index fixes
-from app.api.migration_routes import router as migration_router
-app.include_router(migration_router, prefix="/api/v1", tags=["Migration"])
-
-# Include fix router for data consistency
-from app.api.fix_routes import router as fix_router
-app.include_router(fix_router, prefix="/api/v1/fix", tags=["Data Fixes"])
+# Diagnostic, migration and fix routers are opt-in; importing them only
+# when enabled keeps them out of production startup
+if settings.ENABLE_ADMIN_ROUTES:
+    # Include diagnostic router for debugging
+    from app.api.diagnostic_routes import router as diagnostic_router
+    app.include_router(diagnostic_router, prefix="/api/v1/diagnostic", tags=["Diagnostics"])
+    
+    # Include migration router for index fixes
+    from app.api.migration_routes import router as migration_router
+    app.include_router(migration_router, prefix="/api/v1", tags=["Migration"])
+    
+    # Include fix router for data consistency
+    from app.api.fix_routes import router as fix_router
+    app.include_router(fix_router, prefix="/api/v1/fix", tags=["Data Fixes"])
 
 
 @app.get("/")
@@ -71,10 +104,14 @@ async def root():
 
 if __name__ == "__main__":
     import uvicorn
+    # uvloop and httptools ship with uvicorn[standard]; uvloop has no Windows build
     uvicorn.run(
         "app.main:app",
-        host="0.0.0.0",
-        port=8000,
+        host=settings.HOST,
+        port=settings.PORT,
+        workers=settings.API_WORKERS,
+        loop="asyncio" if sys.platform == "win32" else "uvloop",
+        http="httptools",
         reload=settings.DEBUG,
     )
 
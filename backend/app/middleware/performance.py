@@ -2,42 +2,57 @@
 
 import time
 import logging
-from typing import Callable
-from fastapi import Request, Response
-from starlette.middleware.base import BaseHTTPMiddleware
+from typing import Iterable, Optional
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.config import settings
 
 logger = logging.getLogger(__name__)
 
 
-class PerformanceMiddleware(BaseHTTPMiddleware):
-    """Middleware to track request performance."""
+class PerformanceMiddleware:
+    """Middleware to track request performance.
     
-    async def dispatch(self, request: Request, call_next: Callable) -> Response:
-        """Track request timing."""
-        start_time = time.time()
-        
-        response = await call_next(request)
+    Implemented as plain ASGI rather than BaseHTTPMiddleware to avoid the
+    per-request task group and response stream wrapping.
+    """
+    
+    def __init__(self, app: ASGIApp, skip_paths: Optional[Iterable[str]] = None):
+        """Initialize middleware.
         
-        process_time = time.time() - start_time
-        process_time_ms = process_time * 1000
+        Args:
+            app: Downstream ASGI application
+            skip_paths: Paths passed straight through without timing
+                (default: from settings)
+        """
+        self.app = app
+        if skip_paths is None:
+            skip_paths = settings.PERF_MIDDLEWARE_SKIP_PATHS.split(",")
+        self._skip = frozenset(path.strip() for path in skip_paths if path.strip())
+    
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        """Track request timing."""
+        if scope["type"] != "http" or scope["path"] in self._skip:
+            await self.app(scope, receive, send)
+            return
         
-        # Add timing header
-        response.headers["X-Process-Time"] = str(process_time_ms)
+        start_ns = time.perf_counter_ns()
         
-        # Log slow requests
-        if process_time_ms > 1000:
-            logger.warning(
-                f"Slow request: {request.method} {request.url.path} "
-                f"took {process_time_ms:.2f}ms"
-            )
+        async def send_with_timing(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                process_time_ms = (time.perf_counter_ns() - start_ns) / 1_000_000
+                
+                # Add timing header
+                headers = list(message.get("headers", []))
+                headers.append((b"x-process-time", f"{process_time_ms:.2f}".encode()))
+                message["headers"] = headers
+                
+                # Log slow requests
+                if process_time_ms > 1000:
+                    logger.warning(
+                        "Slow request: %s %s took %.2fms",
+                        scope["method"], scope["path"], process_time_ms
+                    )
+            await send(message)
         
-        return response
-
-
-
-
-
-
-
-
-
+        await self.app(scope, receive, send_with_timing)
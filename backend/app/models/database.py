@@ -1,11 +1,14 @@
 """Database models using SQLAlchemy."""
 
 from datetime import datetime
-from typing import Optional
-from sqlalchemy import create_engine, Column, Integer, String, Float, DateTime, Text, JSON, Boolean, Date
+from typing import AsyncIterator, Optional
+from sqlalchemy import create_engine, event, Column, Integer, String, Float, DateTime, Text, JSON, Boolean, Date, Index
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker, Session
-from contextlib import contextmanager
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+from contextlib import asynccontextmanager, contextmanager
+from functools import lru_cache
 import os
 
 Base = declarative_base()
@@ -14,6 +17,14 @@ Base = declarative_base()
 class Query(Base):
     """Model for storing query history."""
     __tablename__ = "queries"
+    # Business insight views scan successful, answered queries by date; on
+    # PostgreSQL a partial index serves that directly:
+    #   CREATE INDEX ix_queries_answered_created ON queries (created_at DESC)
+    #   WHERE success AND answer IS NOT NULL
+    __table_args__ = (
+        Index("ix_queries_created_success", "created_at", "success"),
+        Index("ix_queries_query_text", "query_text"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     query_text = Column(Text, nullable=False)
@@ -32,6 +43,9 @@ class Query(Base):
 class Document(Base):
     """Model for storing document metadata."""
     __tablename__ = "documents"
+    __table_args__ = (
+        Index("ix_documents_upload_date", "upload_date"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     filename = Column(String(255), nullable=False)
@@ -61,9 +75,12 @@ class Metric(Base):
 class ChunkMetadata(Base):
     """Model for storing chunk metadata mapped to FAISS index IDs."""
     __tablename__ = "chunk_metadata"
+    __table_args__ = (
+        Index("ix_chunk_metadata_faiss_id", "faiss_id", unique=True),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
-    faiss_id = Column(Integer, nullable=False, unique=True, index=True)  # FAISS index ID
+    faiss_id = Column(Integer, nullable=False)  # FAISS index ID
     chunk_text = Column(Text, nullable=False)
     extra_metadata = Column(JSON, nullable=True)  # Additional metadata (page, source, etc.) - renamed from 'metadata' (reserved in SQLAlchemy)
     created_at = Column(DateTime, default=datetime.utcnow)
@@ -77,18 +94,91 @@ try:
 except ImportError:
     DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///./data/app.db")
 
+_is_sqlite = DATABASE_URL.startswith("sqlite")
+
+# Pool sized for concurrent admin + query traffic; in-memory SQLite uses a
+# single-connection pool that doesn't accept these options
+_is_memory_db = DATABASE_URL in ("sqlite://", "sqlite:///:memory:")
+pool_kwargs = {} if _is_memory_db else {
+    "pool_size": 20,
+    "max_overflow": 40,
+    "pool_recycle": 3600,
+    "pool_pre_ping": True,
+}
+
 engine = create_engine(
     DATABASE_URL,
-    connect_args={"check_same_thread": False} if "sqlite" in DATABASE_URL else {},
-    echo=False
+    connect_args={"check_same_thread": False} if _is_sqlite else {},
+    echo=False,
+    **pool_kwargs
 )
 
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# aiosqlite file databases default to NullPool (a new connection, thread and
+# set of pragmas per session); pool them like the sync engine instead
+async_pool_kwargs = dict(pool_kwargs)
+if _is_sqlite and pool_kwargs:
+    async_pool_kwargs["poolclass"] = AsyncAdaptedQueuePool
+
+
+def _set_sqlite_pragmas(dbapi_connection, connection_record) -> None:
+    """Tune each new SQLite connection for concurrent reads and cheap commits.
+    
+    WAL lets readers run alongside the writer, and synchronous=NORMAL skips
+    the per-commit fsync that is redundant under WAL.
+    """
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA journal_mode=WAL")
+    cursor.execute("PRAGMA synchronous=NORMAL")
+    cursor.execute("PRAGMA busy_timeout=5000")
+    cursor.execute("PRAGMA temp_store=MEMORY")
+    cursor.execute("PRAGMA mmap_size=268435456")
+    cursor.close()
+
+
+if _is_sqlite:
+    event.listen(engine, "connect", _set_sqlite_pragmas)
+
+
+def _async_database_url(url: str) -> str:
+    """Map a sync database URL onto its asyncio driver."""
+    if url.startswith("sqlite://"):
+        return url.replace("sqlite://", "sqlite+aiosqlite://", 1)
+    for prefix in ("postgresql://", "postgres://"):
+        if url.startswith(prefix):
+            return url.replace(prefix, "postgresql+asyncpg://", 1)
+    return url
+
+
+@lru_cache(maxsize=1)
+def get_async_engine() -> AsyncEngine:
+    """Create the asyncio engine on first use and reuse it afterwards."""
+    async_engine = create_async_engine(
+        _async_database_url(DATABASE_URL),
+        echo=False,
+        **async_pool_kwargs
+    )
+    if _is_sqlite:
+        event.listen(async_engine.sync_engine, "connect", _set_sqlite_pragmas)
+    return async_engine
+
+
+@lru_cache(maxsize=1)
+def _async_session_factory() -> async_sessionmaker:
+    """Session factory bound to the shared asyncio engine."""
+    return async_sessionmaker(get_async_engine(), expire_on_commit=False)
+
 
 def init_db():
     """Initialize database tables."""
     Base.metadata.create_all(bind=engine)
+    
+    # create_all skips tables that already exist, so make sure indexes
+    # declared after a database was created are applied as well
+    for table in Base.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(bind=engine, checkfirst=True)
     print("Database initialized")
 
 
@@ -105,3 +195,29 @@ def get_db():
     finally:
         db.close()
 
+
+@asynccontextmanager
+async def get_async_db():
+    """Async database session context manager.
+    
+    Used by async services so queries don't block the event loop.
+    """
+    db: AsyncSession = _async_session_factory()()
+    try:
+        yield db
+        await db.commit()
+    except Exception:
+        await db.rollback()
+        raise
+    finally:
+        await db.close()
+
+
+async def get_async_session() -> AsyncIterator[AsyncSession]:
+    """FastAPI dependency providing one async session per request.
+    
+    Service methods that accept a db argument reuse it instead of checking
+    out their own connection and transaction.
+    """
+    async with get_async_db() as db:
+        yield db
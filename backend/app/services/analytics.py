@@ -1,19 +1,57 @@
 """Analytics service for tracking queries and metrics."""
 
+import asyncio
 import logging
+import time
+from collections import Counter
 from datetime import datetime, timedelta
-from typing import List, Dict, Optional
-from sqlalchemy import func, desc
-from sqlalchemy.orm import Session
+from typing import Any, AsyncIterator, Awaitable, Callable, List, Dict, Hashable, Optional, Tuple
+from contextlib import asynccontextmanager
+from sqlalchemy import bindparam, case, func, desc, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.models.database import Query, Document, Metric, get_db
+from app.models.database import Query, Document, Metric, get_async_db
 
 logger = logging.getLogger(__name__)
 
+# Query log batching: queued rows are written together by run_flusher()
+LOG_QUEUE_MAXSIZE = 10_000
+LOG_BATCH_SIZE = 500
+LOG_FLUSH_INTERVAL_SECONDS = 1.0
+
+# How long read results are served before being refreshed in the background
+ANALYTICS_CACHE_TTL_SECONDS = 30.0
+DOCUMENTS_CACHE_TTL_SECONDS = 5.0
+
+
+@asynccontextmanager
+async def _session(db: Optional[AsyncSession]) -> AsyncIterator[AsyncSession]:
+    """Use the caller's request-scoped session if given, else open one."""
+    if db is not None:
+        try:
+            yield db
+        except Exception:
+            # Leave the shared session usable for the rest of the request
+            await db.rollback()
+            raise
+    else:
+        async with get_async_db() as new_db:
+            yield new_db
+
 
 class AnalyticsService:
     """Service for tracking and retrieving analytics."""
     
+    def __init__(self):
+        """Initialize analytics service."""
+        # Query log rows waiting for the background flusher
+        self._log_queue: asyncio.Queue = asyncio.Queue(maxsize=LOG_QUEUE_MAXSIZE)
+        
+        # key -> (loaded_at, value) for get_analytics()/get_documents()
+        self._cache: Dict[Hashable, Tuple[float, Any]] = {}
+        self._cache_generation = 0
+        self._refresh_tasks: Dict[Hashable, asyncio.Task] = {}
+    
     def log_query(
         self,
         query_text: str,
@@ -27,7 +65,10 @@ class AnalyticsService:
         error_message: Optional[str] = None,
         metadata: Optional[Dict] = None
     ) -> None:
-        """Log a query to the database.
+        """Queue a query for logging to the database.
+        
+        Rows are written in batches by run_flusher(); when the queue is full
+        the entry is dropped with a warning rather than delaying the caller.
         
         Args:
             query_text: The query text
@@ -42,36 +83,117 @@ class AnalyticsService:
             metadata: Additional metadata
         """
         try:
-            with get_db() as db:
-                query = Query(
-                    query_text=query_text,
-                    answer=answer,
-                    sources_count=sources_count,
-                    response_time_ms=response_time_ms,
-                    embedding_time_ms=embedding_time_ms,
-                    retrieval_time_ms=retrieval_time_ms,
-                    synthesis_time_ms=synthesis_time_ms,
-                    success=success,
-                    error_message=error_message,
-                    extra_metadata=metadata or {}
-                )
-                db.add(query)
-                db.commit()
+            self._log_queue.put_nowait({
+                "query_text": query_text,
+                "answer": answer,
+                "sources_count": sources_count,
+                "response_time_ms": response_time_ms,
+                "embedding_time_ms": embedding_time_ms,
+                "retrieval_time_ms": retrieval_time_ms,
+                "synthesis_time_ms": synthesis_time_ms,
+                "success": success,
+                "error_message": error_message,
+                "extra_metadata": metadata or {},
+                # Stamped now, not when the batch is flushed
+                "created_at": datetime.utcnow()
+            })
+        except asyncio.QueueFull:
+            logger.warning("Analytics queue full, dropping query log entry")
+    
+    async def run_flusher(self) -> None:
+        """Write queued query logs in batches until cancelled.
+        
+        A batch is written once LOG_BATCH_SIZE rows are queued or
+        LOG_FLUSH_INTERVAL_SECONDS have passed since its first row.
+        """
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self._log_queue.get()]
+            try:
+                deadline = loop.time() + LOG_FLUSH_INTERVAL_SECONDS
+                while len(batch) < LOG_BATCH_SIZE:
+                    timeout = deadline - loop.time()
+                    if timeout <= 0:
+                        break
+                    try:
+                        batch.append(await asyncio.wait_for(self._log_queue.get(), timeout))
+                    except asyncio.TimeoutError:
+                        break
+            except asyncio.CancelledError:
+                await self._write_query_batch(batch)
+                raise
+            await self._write_query_batch(batch)
+    
+    async def flush(self) -> None:
+        """Write every queued query log immediately (used at shutdown)."""
+        while not self._log_queue.empty():
+            batch = []
+            while len(batch) < LOG_BATCH_SIZE and not self._log_queue.empty():
+                batch.append(self._log_queue.get_nowait())
+            await self._write_query_batch(batch)
+    
+    async def _write_query_batch(self, batch: List[Dict]) -> None:
+        """Insert a batch of query log rows in one transaction.
+        
+        Document.query_count is bumped in the same transaction with a single
+        executemany UPDATE keyed by the filenames in each row's source_files.
+        
+        Args:
+            batch: Column values for each Query row
+        """
+        # Each query counts once against every document it drew sources from
+        doc_hits = Counter(
+            filename
+            for row in batch
+            for filename in (row["extra_metadata"] or {}).get("source_files", [])
+        )
+        try:
+            async with get_async_db() as db:
+                db.add_all([Query(**row) for row in batch])
+                if doc_hits:
+                    documents = Document.__table__
+                    await db.execute(
+                        update(documents)
+                        .where(documents.c.filename == bindparam("b_filename"))
+                        .values(query_count=documents.c.query_count + bindparam("b_delta")),
+                        [
+                            {"b_filename": filename, "b_delta": delta}
+                            for filename, delta in doc_hits.items()
+                        ]
+                    )
+                await db.commit()
         except Exception as e:
-            logger.error(f"Error logging query: {e}")
+            logger.error(f"Error logging {len(batch)} queries: {e}")
     
-    def get_query_history(self, limit: int = 50) -> List[Dict]:
+    async def get_query_history(
+        self,
+        limit: int = 50,
+        db: Optional[AsyncSession] = None
+    ) -> List[Dict]:
         """Get recent query history.
         
         Args:
             limit: Maximum number of queries to return
+            db: Optional request-scoped session to reuse
             
         Returns:
             List of query dictionaries
         """
         try:
-            with get_db() as db:
-                queries = db.query(Query).order_by(desc(Query.created_at)).limit(limit).all()
+            async with _session(db) as db:
+                # Project only the listed columns and fetch one character
+                # past the preview length, so long answers never leave the DB
+                result = await db.execute(
+                    select(
+                        Query.id,
+                        Query.query_text,
+                        func.substr(Query.answer, 1, 201).label("answer"),
+                        Query.sources_count,
+                        Query.response_time_ms,
+                        Query.success,
+                        Query.created_at
+                    ).order_by(desc(Query.created_at)).limit(limit)
+                )
                 return [
                     {
                         "id": q.id,
@@ -80,17 +202,20 @@ class AnalyticsService:
                         "sources_count": q.sources_count,
                         "response_time_ms": q.response_time_ms,
                         "success": q.success,
-                        "created_at": q.created_at.isoformat() if q.created_at else None
+                        "created_at": q.created_at
                     }
-                    for q in queries
+                    for q in result
                 ]
         except Exception as e:
             logger.error(f"Error getting query history: {e}")
             return []
     
-    def get_analytics(self, days: int = 30) -> Dict:
+    async def get_analytics(self, days: int = 30) -> Dict:
         """Get analytics for the specified time period.
         
+        Results are cached per days value for ANALYTICS_CACHE_TTL_SECONDS;
+        stale entries are returned immediately and refreshed in the background.
+        
         Args:
             days: Number of days to analyze
             
@@ -98,102 +223,130 @@ class AnalyticsService:
             Dictionary with analytics data
         """
         try:
-            with get_db() as db:
-                cutoff_date = datetime.utcnow() - timedelta(days=days)
-                
-                # Total queries
-                total_queries = db.query(Query).filter(Query.created_at >= cutoff_date).count()
-                
-                # Successful queries
-                successful_queries = db.query(Query).filter(
-                    Query.created_at >= cutoff_date,
-                    Query.success == True
-                ).count()
-                
-                # Average response time
-                avg_response_time = db.query(func.avg(Query.response_time_ms)).filter(
-                    Query.created_at >= cutoff_date,
-                    Query.response_time_ms.isnot(None)
-                ).scalar() or 0
-                
-                # Queries per day (handle SQLite vs PostgreSQL)
-                try:
-                    # Try PostgreSQL/MySQL date function
-                    queries_per_day = db.query(
+            return await self._cached(
+                ("analytics", days),
+                ANALYTICS_CACHE_TTL_SECONDS,
+                lambda: self._compute_analytics(days)
+            )
+        except Exception as e:
+            logger.error(f"Error getting analytics: {e}")
+            return {}
+    
+    async def _compute_analytics(self, days: int) -> Dict:
+        """Run the analytics queries for get_analytics()."""
+        cutoff_date = datetime.utcnow() - timedelta(days=days)
+        
+        # Scalar aggregates share one round-trip; the grouped queries use
+        # their own sessions so all three run concurrently
+        totals, queries_per_day, top_queries = await asyncio.gather(
+            self._aggregate_totals(cutoff_date),
+            self._queries_per_day(cutoff_date),
+            self._top_queries(cutoff_date)
+        )
+        (
+            total_queries,
+            successful_queries,
+            avg_response_time,
+            avg_embedding_time,
+            avg_retrieval_time,
+            avg_synthesis_time,
+            avg_sources
+        ) = totals
+        
+        return {
+            "total_queries": total_queries,
+            "successful_queries": successful_queries,
+            "failed_queries": total_queries - successful_queries,
+            "success_rate": (successful_queries / total_queries * 100) if total_queries > 0 else 0,
+            "avg_response_time_ms": round(avg_response_time, 2),
+            "avg_embedding_time_ms": round(avg_embedding_time, 2),
+            "avg_retrieval_time_ms": round(avg_retrieval_time, 2),
+            "avg_synthesis_time_ms": round(avg_synthesis_time, 2),
+            "avg_sources_per_query": round(avg_sources, 2),
+            "queries_per_day": [
+                {"date": str(date), "count": count}
+                for date, count in queries_per_day
+            ],
+            "top_queries": [
+                {"query": query, "count": count}
+                for query, count in top_queries
+            ]
+        }
+    
+    async def _aggregate_totals(self, cutoff_date: datetime) -> tuple:
+        """Compute every scalar query aggregate in a single statement.
+        
+        AVG skips NULLs, so the timing averages need no extra filters and the
+        CASE without ELSE limits the sources average to queries with sources.
+        
+        Args:
+            cutoff_date: Only queries created at or after this time count
+            
+        Returns:
+            Tuple of (total, successful, avg response, avg embedding,
+            avg retrieval, avg synthesis, avg sources), with 0 for empty sets
+        """
+        async with get_async_db() as db:
+            result = await db.execute(
+                select(
+                    func.count(Query.id),
+                    func.sum(case((Query.success == True, 1), else_=0)),
+                    func.avg(Query.response_time_ms),
+                    func.avg(Query.embedding_time_ms),
+                    func.avg(Query.retrieval_time_ms),
+                    func.avg(Query.synthesis_time_ms),
+                    func.avg(case((Query.sources_count > 0, Query.sources_count)))
+                ).where(Query.created_at >= cutoff_date)
+            )
+            return tuple(value or 0 for value in result.one())
+    
+    async def _queries_per_day(self, cutoff_date: datetime) -> List:
+        """Count queries per calendar day since cutoff_date."""
+        async with get_async_db() as db:
+            # Queries per day (handle SQLite vs PostgreSQL)
+            try:
+                # Try PostgreSQL/MySQL date function
+                result = await db.execute(
+                    select(
                         func.date(Query.created_at).label('date'),
                         func.count(Query.id).label('count')
-                    ).filter(
+                    ).where(
                         Query.created_at >= cutoff_date
                     ).group_by(
                         func.date(Query.created_at)
-                    ).all()
-                except Exception:
-                    # Fallback for SQLite - use strftime
-                    queries_per_day = db.query(
+                    )
+                )
+            except Exception:
+                # Fallback for SQLite - use strftime
+                await db.rollback()
+                result = await db.execute(
+                    select(
                         func.strftime('%Y-%m-%d', Query.created_at).label('date'),
                         func.count(Query.id).label('count')
-                    ).filter(
+                    ).where(
                         Query.created_at >= cutoff_date
                     ).group_by(
                         func.strftime('%Y-%m-%d', Query.created_at)
-                    ).all()
-                
-                # Most common queries
-                top_queries = db.query(
+                    )
+                )
+            return result.all()
+    
+    async def _top_queries(self, cutoff_date: datetime, limit: int = 10) -> List:
+        """Most frequently asked query texts since cutoff_date."""
+        async with get_async_db() as db:
+            result = await db.execute(
+                select(
                     Query.query_text,
                     func.count(Query.id).label('count')
-                ).filter(
+                ).where(
                     Query.created_at >= cutoff_date
                 ).group_by(
                     Query.query_text
-                ).order_by(desc('count')).limit(10).all()
-                
-                # Average sources per query
-                avg_sources = db.query(func.avg(Query.sources_count)).filter(
-                    Query.created_at >= cutoff_date,
-                    Query.sources_count > 0
-                ).scalar() or 0
-                
-                # Time breakdown averages
-                avg_embedding_time = db.query(func.avg(Query.embedding_time_ms)).filter(
-                    Query.created_at >= cutoff_date,
-                    Query.embedding_time_ms.isnot(None)
-                ).scalar() or 0
-                
-                avg_retrieval_time = db.query(func.avg(Query.retrieval_time_ms)).filter(
-                    Query.created_at >= cutoff_date,
-                    Query.retrieval_time_ms.isnot(None)
-                ).scalar() or 0
-                
-                avg_synthesis_time = db.query(func.avg(Query.synthesis_time_ms)).filter(
-                    Query.created_at >= cutoff_date,
-                    Query.synthesis_time_ms.isnot(None)
-                ).scalar() or 0
-                
-                return {
-                    "total_queries": total_queries,
-                    "successful_queries": successful_queries,
-                    "failed_queries": total_queries - successful_queries,
-                    "success_rate": (successful_queries / total_queries * 100) if total_queries > 0 else 0,
-                    "avg_response_time_ms": round(avg_response_time, 2),
-                    "avg_embedding_time_ms": round(avg_embedding_time, 2),
-                    "avg_retrieval_time_ms": round(avg_retrieval_time, 2),
-                    "avg_synthesis_time_ms": round(avg_synthesis_time, 2),
-                    "avg_sources_per_query": round(avg_sources, 2),
-                    "queries_per_day": [
-                        {"date": str(date), "count": count}
-                        for date, count in queries_per_day
-                    ],
-                    "top_queries": [
-                        {"query": query, "count": count}
-                        for query, count in top_queries
-                    ]
-                }
-        except Exception as e:
-            logger.error(f"Error getting analytics: {e}")
-            return {}
+                ).order_by(desc('count')).limit(limit)
+            )
+            return result.all()
     
-    def register_document(
+    async def register_document(
         self,
         filename: str,
         file_path: str,
@@ -202,7 +355,8 @@ class AnalyticsService:
         pages: Optional[int] = None,
         chunks_count: int = 0,
         vectors_count: int = 0,
-        metadata: Optional[Dict] = None
+        metadata: Optional[Dict] = None,
+        db: Optional[AsyncSession] = None
     ) -> int:
         """Register a document in the database.
         
@@ -215,12 +369,13 @@ class AnalyticsService:
             chunks_count: Number of chunks created
             vectors_count: Number of vectors added
             metadata: Additional metadata
+            db: Optional request-scoped session to reuse
             
         Returns:
             Document ID
         """
         try:
-            with get_db() as db:
+            async with _session(db) as db:
                 doc = Document(
                     filename=filename,
                     file_path=file_path,
@@ -232,60 +387,138 @@ class AnalyticsService:
                     extra_metadata=metadata or {}
                 )
                 db.add(doc)
-                db.commit()
-                db.refresh(doc)
-                return doc.id
+                # The primary key is populated by the INSERT on flush, so no
+                # follow-up SELECT is needed
+                await db.flush()
+                doc_id = doc.id
+                await db.commit()
+            self.invalidate_cache()
+            return doc_id
         except Exception as e:
             logger.error(f"Error registering document: {e}")
             return -1
     
-    def get_documents(self) -> List[Dict]:
+    async def get_documents(self) -> List[Dict]:
         """Get all documents.
         
+        Cached for DOCUMENTS_CACHE_TTL_SECONDS in the same way as
+        get_analytics(); registering or deleting a document invalidates it.
+        
         Returns:
             List of document dictionaries
         """
         try:
-            with get_db() as db:
-                docs = db.query(Document).order_by(desc(Document.upload_date)).all()
-                return [
-                    {
-                        "id": d.id,
-                        "filename": d.filename,
-                        "file_size_bytes": d.file_size_bytes,
-                        "file_size_mb": round(d.file_size_bytes / (1024 * 1024), 2),
-                        "file_type": d.file_type,
-                        "pages": d.pages,
-                        "chunks_count": d.chunks_count,
-                        "vectors_count": d.vectors_count,
-                        "upload_date": d.upload_date.isoformat() if d.upload_date else None,
-                        "status": d.status,
-                        "query_count": d.query_count
-                    }
-                    for d in docs
-                ]
+            return await self._cached(
+                "documents", DOCUMENTS_CACHE_TTL_SECONDS, self._load_documents
+            )
         except Exception as e:
             logger.error(f"Error getting documents: {e}")
             return []
     
-    def delete_document(self, document_id: int) -> bool:
+    async def _load_documents(self) -> List[Dict]:
+        """Query all documents for get_documents()."""
+        async with get_async_db() as db:
+            result = await db.execute(
+                select(Document).order_by(desc(Document.upload_date))
+            )
+            docs = result.scalars().all()
+            return [
+                {
+                    "id": d.id,
+                    "filename": d.filename,
+                    "file_size_bytes": d.file_size_bytes,
+                    "file_size_mb": round(d.file_size_bytes / (1024 * 1024), 2),
+                    "file_type": d.file_type,
+                    "pages": d.pages,
+                    "chunks_count": d.chunks_count,
+                    "vectors_count": d.vectors_count,
+                    "upload_date": d.upload_date,
+                    "status": d.status,
+                    "query_count": d.query_count
+                }
+                for d in docs
+            ]
+    
+    async def delete_document(
+        self,
+        document_id: int,
+        db: Optional[AsyncSession] = None
+    ) -> bool:
         """Delete a document record.
         
         Args:
             document_id: Document ID to delete
+            db: Optional request-scoped session to reuse
             
         Returns:
             True if deleted successfully
         """
         try:
-            with get_db() as db:
-                doc = db.query(Document).filter(Document.id == document_id).first()
-                if doc:
-                    db.delete(doc)
-                    db.commit()
-                    return True
-                return False
+            async with _session(db) as db:
+                doc = await db.get(Document, document_id)
+                if not doc:
+                    return False
+                await db.delete(doc)
+                await db.commit()
+            self.invalidate_cache()
+            return True
         except Exception as e:
             logger.error(f"Error deleting document: {e}")
             return False
-
+    
+    def invalidate_cache(self) -> None:
+        """Drop cached analytics and document lists."""
+        self._cache.clear()
+        self._cache_generation += 1
+    
+    async def _cached(
+        self,
+        key: Hashable,
+        ttl: float,
+        loader: Callable[[], Awaitable[Any]]
+    ) -> Any:
+        """Return a cached value, loading it on a miss.
+        
+        Entries older than ttl are still returned, with a single background
+        refresh scheduled so callers never wait on a stale hit.
+        
+        Args:
+            key: Cache key
+            ttl: Seconds before an entry is considered stale
+            loader: Coroutine function producing a fresh value
+            
+        Returns:
+            Cached or freshly loaded value
+        """
+        entry = self._cache.get(key)
+        if entry is None:
+            return await self._load_into_cache(key, loader)
+        
+        if time.monotonic() - entry[0] >= ttl and key not in self._refresh_tasks:
+            task = asyncio.create_task(self._refresh_in_background(key, loader))
+            self._refresh_tasks[key] = task
+            task.add_done_callback(lambda _: self._refresh_tasks.pop(key, None))
+        return entry[1]
+    
+    async def _load_into_cache(
+        self,
+        key: Hashable,
+        loader: Callable[[], Awaitable[Any]]
+    ) -> Any:
+        """Load a value and cache it unless the cache was invalidated meanwhile."""
+        generation = self._cache_generation
+        value = await loader()
+        if generation == self._cache_generation:
+            self._cache[key] = (time.monotonic(), value)
+        return value
+    
+    async def _refresh_in_background(
+        self,
+        key: Hashable,
+        loader: Callable[[], Awaitable[Any]]
+    ) -> None:
+        """Refresh a stale entry, keeping the old value if loading fails."""
+        try:
+            await self._load_into_cache(key, loader)
+        except Exception as e:
+            logger.warning(f"Background refresh of {key!r} failed: {e}")
@@ -1,17 +1,218 @@
 """Business insights service for extracting business intelligence from queries and documents."""
 
+import asyncio
 import logging
 import re
-from typing import List, Dict, Optional
+import threading
+import time
+from typing import Dict, FrozenSet, Iterable, List, Optional, Pattern, Tuple
 from collections import Counter, defaultdict
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
-from sqlalchemy import func, desc
+from functools import lru_cache
+from sqlalchemy import and_, case, func, desc, select
 from sqlalchemy.orm import Session
 
+from app.core.config import get_worker_cpu_count
 from app.models.database import Query, Document, get_db
+from app.services.analytics import AnalyticsService
+
+# RE2 runs the numeric extraction scan as a linear-time automaton; the
+# patterns only use features it shares with re, so fall back when missing.
+# Hyperscan would scan faster still, but it reports only match offsets (no
+# capture groups, and every end offset of a lazy .*? span), so each hit would
+# need a second regex pass to recover the figures and pick the right span.
+try:
+    import re2 as numeric_re
+except ImportError:
+    numeric_re = re
 
 logger = logging.getLogger(__name__)
 
+# RE2 releases the GIL while matching, so with it numeric extraction fans
+# distinct answers out over threads once there are at least this many
+PARALLEL_SCAN_MIN_ANSWERS = 256
+
+# Shared by every extract_numerical_data() call; see _get_scan_executor()
+_scan_executor: Optional[ThreadPoolExecutor] = None
+_scan_executor_lock = threading.Lock()
+
+
+def _get_scan_executor() -> ThreadPoolExecutor:
+    """Return the numeric scan thread pool, starting it on first use.
+    
+    Returns:
+        Thread pool sized to this worker's share of the CPUs
+    """
+    global _scan_executor
+    with _scan_executor_lock:
+        if _scan_executor is None:
+            _scan_executor = ThreadPoolExecutor(
+                max_workers=get_worker_cpu_count(),
+                thread_name_prefix="numeric-scan",
+            )
+        return _scan_executor
+
+
+def shutdown_scan_executor() -> None:
+    """Stop the numeric scan threads (used at shutdown)."""
+    global _scan_executor
+    with _scan_executor_lock:
+        if _scan_executor is not None:
+            _scan_executor.shutdown(cancel_futures=True)
+            _scan_executor = None
+
+
+def _build_keyword_scanner(keywords: Iterable[str]) -> Tuple[Pattern, Dict[str, FrozenSet[str]]]:
+    """Build a one-pass scanner reporting which keywords occur in a text.
+    
+    The returned pattern is a zero-width lookahead over all keywords, longest
+    first, so finditer() visits every position and reports the longest keyword
+    starting there. Any shorter keyword starting at the same position is a
+    substring of that match, which the closure map accounts for.
+    
+    Args:
+        keywords: Lowercase keywords to look for
+        
+    Returns:
+        Tuple of (compiled pattern, keyword -> all keywords contained in it)
+    """
+    unique = sorted(set(keywords), key=len, reverse=True)
+    pattern = re.compile("(?=(" + "|".join(re.escape(kw) for kw in unique) + "))")
+    closure = {
+        kw: frozenset(other for other in unique if other in kw)
+        for kw in unique
+    }
+    return pattern, closure
+
+
+# Non-ASCII characters Python's re treats as whitespace. Byte-level scans
+# (and RE2 in any mode) only match ASCII whitespace with \s, so these are
+# mapped to a plain space first; PDF text is full of non-breaking spaces
+_UNICODE_SPACES = str.maketrans(dict.fromkeys(
+    "\u0085\u00a0\u1680\u2000\u2001\u2002\u2003\u2004\u2005\u2006"
+    "\u2007\u2008\u2009\u200a\u2028\u2029\u202f\u205f\u3000",
+    " "
+))
+
+
+def _scan_bytes(text: str) -> bytes:
+    """UTF-8 encode text for byte-level regex scanning.
+    
+    Args:
+        text: Input text
+        
+    Returns:
+        Encoded text with Unicode whitespace replaced by ASCII spaces
+    """
+    if text.isascii():
+        return text.encode("ascii")
+    return text.translate(_UNICODE_SPACES).encode("utf-8")
+
+
+def _index_keywords(keyword_lists: Iterable[List[str]]) -> Dict[str, Tuple[int, ...]]:
+    """Map each keyword to the positions of the lists containing it.
+    
+    Args:
+        keyword_lists: Keyword lists, e.g. one per category
+        
+    Returns:
+        Dictionary of keyword -> list indices, repeated once per occurrence
+    """
+    indices = defaultdict(list)
+    for index, keywords in enumerate(keyword_lists):
+        for keyword in keywords:
+            indices[keyword].append(index)
+    return {keyword: tuple(positions) for keyword, positions in indices.items()}
+
+
+def _build_alternation(
+    named_patterns: Iterable[Tuple[str, str, str]]
+) -> Tuple[Pattern, Dict[str, Tuple[str, Tuple[int, ...], bool]]]:
+    """Fuse several patterns into one case-insensitive alternation.
+    
+    Each pattern is wrapped in a named group so a match can be dispatched on
+    ``match.lastgroup``; its own capture groups keep their relative order and
+    are reported as absolute group numbers in the fused pattern. The result
+    is a bytes pattern compiled with ``numeric_re`` and matches UTF-8 text.
+    
+    Args:
+        named_patterns: (group name, kind, pattern) tuples in priority order
+        
+    Returns:
+        Tuple of (compiled pattern, group name -> (kind, capture group
+        numbers, whether the pattern starts with a digit rather than a keyword))
+    """
+    parts = []
+    groups = {}
+    next_group = 1
+    for name, kind, pattern in named_patterns:
+        inner_count = re.compile(pattern).groups
+        captures = tuple(range(next_group + 1, next_group + 1 + inner_count))
+        groups[name] = (kind, captures, pattern.startswith("(\\d"))
+        parts.append(f"(?P<{name}>{pattern})")
+        next_group += 1 + inner_count
+    # Inline flag rather than re.IGNORECASE, which re2.compile() doesn't take
+    fused = ("(?i)" + "|".join(parts)).encode("utf-8")
+    return numeric_re.compile(fused), groups
+
+
+# Answer windows and category counts are cached per (days, time bucket) so
+# the views built for one dashboard load share a single fetch
+WINDOW_CACHE_SECONDS = 60
+
+# days -> (time bucket, answer window); one slot per window length, replaced
+# once its bucket expires, so at most one copy of each window is held
+_answer_windows: Dict[int, Tuple[int, Tuple[Tuple[str, ...], Tuple[str, ...]]]] = {}
+
+
+def _load_answer_window(days: int) -> Tuple[Tuple[str, ...], Tuple[str, ...]]:
+    """Fetch queries and answers of successful, answered queries in a window.
+    
+    Args:
+        days: Number of days to look back
+        
+    Returns:
+        Tuple of (query texts, non-empty answer texts)
+    """
+    queries, answers = [], []
+    with get_db() as db:
+        cutoff_date = datetime.utcnow() - timedelta(days=days)
+        stmt = select(Query.query_text, Query.answer).where(
+            Query.created_at >= cutoff_date,
+            Query.success == True,
+            Query.answer.isnot(None)
+        ).execution_options(yield_per=1000)
+        
+        # Fetch in batches of 1000 rows; the texts themselves are all kept
+        for query_text, answer in db.execute(stmt):
+            queries.append(query_text)
+            if answer:
+                answers.append(answer)
+    
+    return tuple(queries), tuple(answers)
+
+
+def _answer_window(days: int) -> Tuple[Tuple[str, ...], Tuple[str, ...]]:
+    """Cached queries and answers of the last ``days`` days.
+    
+    Args:
+        days: Number of days to look back
+        
+    Returns:
+        Tuple of (query texts, non-empty answer texts)
+    """
+    bucket = int(time.time() // WINDOW_CACHE_SECONDS)
+    cached = _answer_windows.get(days)
+    if cached is not None and cached[0] == bucket:
+        return cached[1]
+    
+    # Drop the stale window before loading so two copies aren't held at once
+    _answer_windows.pop(days, None)
+    window = _load_answer_window(days)
+    _answer_windows[days] = (bucket, window)
+    return window
+
 
 class BusinessInsightsService:
     """Service for extracting business insights from queries and documents."""
@@ -27,6 +228,20 @@ class BusinessInsightsService:
         "Risk & Compliance": ["risk", "compliance", "regulation", "legal", "audit", "security", "governance"]
     }
     
+    # Lowercased CATEGORY_KEYWORDS and a scanner that finds them in one pass
+    CATEGORY_KEYWORDS_LOWER = {
+        category: [keyword.lower() for keyword in keywords]
+        for category, keywords in CATEGORY_KEYWORDS.items()
+    }
+    CATEGORY_KEYWORD_REGEX, CATEGORY_KEYWORD_CLOSURE = _build_keyword_scanner(
+        keyword for keywords in CATEGORY_KEYWORDS_LOWER.values() for keyword in keywords
+    )
+    
+    # Category names by index, and keyword -> index of every category listing
+    # it, so categorize_query() tallies into a plain list
+    CATEGORY_NAMES = tuple(CATEGORY_KEYWORDS_LOWER)
+    KEYWORD_CATEGORY_INDICES = _index_keywords(CATEGORY_KEYWORDS_LOWER.values())
+    
     # Business metric patterns
     METRIC_PATTERNS = {
         "revenue": r"(?:revenue|sales|income).*?(?:€|\$|million|billion|thousand)[\s\d.,]+",
@@ -36,9 +251,103 @@ class BusinessInsightsService:
         "employees": r"(?:\d+[\s,]*)?(?:employees|staff|workforce|personnel)"
     }
     
-    def categorize_query(self, query_text: str) -> str:
+    # Compiled METRIC_PATTERNS, keyed the same way; they match UTF-8 bytes
+    METRIC_REGEXES = {
+        name: re.compile(pattern.encode("utf-8"), re.IGNORECASE)
+        for name, pattern in METRIC_PATTERNS.items()
+    }
+    
+    # Keywords every METRIC_PATTERNS match is anchored on, scanned in a single
+    # pass so each full pattern only runs from its metric's first keyword hit
+    METRIC_ANCHOR_REGEX = re.compile(
+        rb"(?P<revenue>revenue|sales|income)"
+        rb"|(?P<growth>growth|increase|decrease|change)"
+        rb"|(?P<profit>profit|margin|earnings)"
+        rb"|(?P<customers>customers|clients|users|contracts)"
+        rb"|(?P<employees>employees|staff|workforce|personnel)"
+    )
+    
+    # METRIC_PATTERNS name -> extract_business_metrics() counter
+    METRIC_MENTION_KEYS = {
+        "revenue": "revenue_mentions",
+        "growth": "growth_mentions",
+        "profit": "profit_mentions",
+        "customers": "customer_mentions",
+        "employees": "employee_mentions"
+    }
+    
+    # extract_numerical_data() patterns as (group name, metric kind, pattern),
+    # fused into one alternation. At any position the first listed pattern
+    # that matches wins, so the more specific variant of each metric comes first
+    NUMERIC_PATTERNS = [
+        # EBITDA values (e.g., "€2.5 billion", "Euro 2.7 billion")
+        ("ebitda_range", "ebitda", r"ebitda.*?(?:between|to|of)\s*(?:€|euro|\$)?\s*([\d.,]+)\s*(?:and|to)\s*(?:€|euro|\$)?\s*([\d.,]+)\s*(?:billion|million)"),
+        ("ebitda_currency", "ebitda", r"ebitda.*?(?:€|euro|\$)\s*([\d.,]+)\s*(?:billion|million|thousand)"),
+        ("ebitda_value", "ebitda", r"ebitda.*?([\d.,]+)\s*(?:billion|million|thousand)"),
+        # Revenue values
+        ("revenue_currency", "revenue", r"revenue.*?(?:€|euro|\$)\s*([\d.,]+)\s*(?:billion|million|thousand)"),
+        ("revenue_value", "revenue", r"revenue.*?([\d.,]+)\s*(?:billion|million|thousand)"),
+        ("sales_currency", "revenue", r"sales.*?(?:€|euro|\$)\s*([\d.,]+)\s*(?:billion|million|thousand)"),
+        # Profit/earnings
+        ("profit_currency", "profit", r"(?:profit|earnings|ebit).*?(?:€|euro|\$)\s*([\d.,]+)\s*(?:billion|million|thousand)"),
+        ("profit_value", "profit", r"(?:profit|earnings|ebit).*?([\d.,]+)\s*(?:billion|million|thousand)"),
+        # Percentages, single or a range like "38-40%"; growth rates and
+        # margins are told apart by the text just before the number
+        ("percentage", "percentage", r"(\d+\.?\d*)(?:\s*-\s*(\d+\.?\d*))?\s*%"),
+        # Employee counts
+        ("employees_before", "employees", r"(\d+[\d,]*)\s*(?:employees|staff|workforce|personnel)"),
+        ("employees_after", "employees", r"(?:employees|staff|workforce).*?(\d+[\d,]*)"),
+        # Customer counts
+        ("customers_before", "customers", r"(\d+[\d,]*)\s*(?:customers|clients|users|contracts)"),
+        ("customers_after", "customers", r"(?:customers|clients|users|contracts).*?(\d+[\d,]*)")
+    ]
+    
+    NUMERIC_REGEX, NUMERIC_GROUPS = _build_alternation(NUMERIC_PATTERNS)
+    
+    # Bytes before a percentage searched for margin/growth wording
+    PERCENT_CONTEXT_BYTES = 40
+    
+    # Context word -> numerical_data list a percentage after it belongs to
+    PERCENT_CONTEXT_KEYS = {
+        **dict.fromkeys(("margin", "margins"), "margins"),
+        **dict.fromkeys(
+            ("growth", "increase", "increases", "increased",
+             "decrease", "decreases", "decreased"),
+            "growth_percentages"
+        )
+    }
+    WORD_REGEX = re.compile(r"[a-z]+")
+    
+    # Common business terms counted by extract_topics()
+    BUSINESS_TERMS = (
+        "revenue", "growth", "profit", "sales", "market", "customer",
+        "product", "service", "strategy", "financial", "operation",
+        "technology", "innovation", "competition", "performance",
+        "efficiency", "quality", "brand", "marketing", "investment"
+    )
+    
+    # Query words extract_topics() never reports as topics
+    TOPIC_STOPWORDS = frozenset(["what", "which", "where", "when", "about", "question"])
+    
+    # Percent figures listed as key numbers by extract_business_metrics()
+    KEY_NUMBER_REGEX = re.compile(r'\d+\.?\d*\s*%')
+    
+    def __init__(self, analytics_service: Optional[AnalyticsService] = None):
+        """Initialize business insights service.
+        
+        Args:
+            analytics_service: Analytics service whose cached results to reuse
+                (default: a new one kept for the service's lifetime)
+        """
+        self.analytics_service = analytics_service or AnalyticsService()
+    
+    @classmethod
+    @lru_cache(maxsize=4096)
+    def categorize_query(cls, query_text: str) -> str:
         """Categorize a query into business categories.
         
+        Results are memoized, since the same questions are asked repeatedly.
+        
         Args:
             query_text: The query text
             
@@ -46,16 +355,22 @@ class BusinessInsightsService:
             Category name
         """
         query_lower = query_text.lower()
-        category_scores = defaultdict(int)
         
-        for category, keywords in self.CATEGORY_KEYWORDS.items():
-            for keyword in keywords:
-                if keyword.lower() in query_lower:
-                    category_scores[category] += 1
+        # Collect every keyword present in a single scan of the query
+        found = set()
+        for match in cls.CATEGORY_KEYWORD_REGEX.finditer(query_lower):
+            found.update(cls.CATEGORY_KEYWORD_CLOSURE[match.group(1)])
+        
+        if not found:
+            return "General"
         
-        if category_scores:
-            return max(category_scores.items(), key=lambda x: x[1])[0]
-        return "General"
+        category_scores = [0] * len(cls.CATEGORY_NAMES)
+        for keyword in found:
+            for index in cls.KEYWORD_CATEGORY_INDICES[keyword]:
+                category_scores[index] += 1
+        
+        # Ties go to the earlier category
+        return cls.CATEGORY_NAMES[category_scores.index(max(category_scores))]
     
     def extract_topics(self, queries: List[str], answers: List[str]) -> List[Dict]:
         """Extract topics from queries and answers.
@@ -70,16 +385,10 @@ class BusinessInsightsService:
         # Combine queries and answers
         all_text = " ".join(queries + answers).lower()
         
-        # Extract common business terms
-        business_terms = [
-            "revenue", "growth", "profit", "sales", "market", "customer", 
-            "product", "service", "strategy", "financial", "operation",
-            "technology", "innovation", "competition", "performance",
-            "efficiency", "quality", "brand", "marketing", "investment"
-        ]
-        
+        # Extract common business terms. str.count() runs each search in C
+        # and beats a single regex pass over all terms on the same text
         topic_counts = Counter()
-        for term in business_terms:
+        for term in self.BUSINESS_TERMS:
             count = all_text.count(term)
             if count > 0:
                 topic_counts[term] = count
@@ -89,7 +398,7 @@ class BusinessInsightsService:
             words = query.lower().split()
             # Extract key nouns/phrases (simple heuristic)
             for i, word in enumerate(words):
-                if len(word) > 5 and word not in ["what", "which", "where", "when", "about", "question"]:
+                if len(word) > 5 and word not in self.TOPIC_STOPWORDS:
                     topic_counts[word] += 1
         
         # Return top topics
@@ -98,11 +407,11 @@ class BusinessInsightsService:
             for topic, count in topic_counts.most_common(10)
         ]
     
-    def extract_business_metrics(self, answers: List[str]) -> Dict:
+    def extract_business_metrics(self, answers: Iterable[str]) -> Dict:
         """Extract business metrics from answers.
         
         Args:
-            answers: List of answer texts
+            answers: Answer texts
             
         Returns:
             Dictionary of extracted metrics
@@ -116,25 +425,31 @@ class BusinessInsightsService:
             "key_numbers": []
         }
         
-        combined_text = " ".join(answers)
+        key_numbers = metrics["key_numbers"]
         
         # Count metric mentions
         for answer in answers:
-            answer_lower = answer.lower()
-            if re.search(self.METRIC_PATTERNS["revenue"], answer_lower, re.IGNORECASE):
-                metrics["revenue_mentions"] += 1
-            if re.search(self.METRIC_PATTERNS["growth"], answer_lower, re.IGNORECASE):
-                metrics["growth_mentions"] += 1
-            if re.search(self.METRIC_PATTERNS["profit"], answer_lower, re.IGNORECASE):
-                metrics["profit_mentions"] += 1
-            if re.search(self.METRIC_PATTERNS["customers"], answer_lower, re.IGNORECASE):
-                metrics["customer_mentions"] += 1
-            if re.search(self.METRIC_PATTERNS["employees"], answer_lower, re.IGNORECASE):
-                metrics["employee_mentions"] += 1
-        
-        # Extract key numbers (percentages, large numbers)
-        numbers = re.findall(r'\d+\.?\d*\s*%', combined_text)
-        metrics["key_numbers"] = numbers[:10]  # Top 10 numbers
+            answer_lower = _scan_bytes(answer).lower()
+            
+            # One keyword pass finds where each metric could first match;
+            # metrics with no keyword hit are skipped without a regex search
+            first_hits = {}
+            for hit in self.METRIC_ANCHOR_REGEX.finditer(answer_lower):
+                first_hits.setdefault(hit.lastgroup, hit.start())
+                if len(first_hits) == len(self.METRIC_MENTION_KEYS):
+                    break
+            
+            for name, start in first_hits.items():
+                if self.METRIC_REGEXES[name].search(answer_lower, start):
+                    metrics[self.METRIC_MENTION_KEYS[name]] += 1
+            
+            # Extract key numbers (percentages, large numbers), top 10 only.
+            # Key numbers end in '%', so a substring check rules most answers out
+            if len(key_numbers) < 10 and '%' in answer:
+                for number in self.KEY_NUMBER_REGEX.finditer(answer):
+                    key_numbers.append(number.group(0))
+                    if len(key_numbers) == 10:
+                        break
         
         return metrics
     
@@ -148,26 +463,65 @@ class BusinessInsightsService:
             List of categories with counts
         """
         try:
-            with get_db() as db:
-                cutoff_date = datetime.utcnow() - timedelta(days=days)
-                queries = db.query(Query.query_text).filter(
-                    Query.created_at >= cutoff_date,
-                    Query.success == True
-                ).all()
-                
-                categories = Counter()
-                for (query_text,) in queries:
-                    category = self.categorize_query(query_text)
-                    categories[category] += 1
-                
-                return [
-                    {"category": cat, "count": count}
-                    for cat, count in categories.most_common()
-                ]
+            bucket = int(time.time() // WINDOW_CACHE_SECONDS)
+            return [
+                {"category": cat, "count": count}
+                for cat, count in self._load_query_categories(days, bucket)
+            ]
         except Exception as e:
             logger.error(f"Error getting query categories: {e}")
             return []
     
+    @classmethod
+    @lru_cache(maxsize=8)
+    def _load_query_categories(cls, days: int, bucket: int) -> Tuple[Tuple[str, int], ...]:
+        """Count successful queries per category in a window.
+        
+        Args:
+            days: Number of days to look back
+            bucket: Time bucket the result is cached under (only part of the key)
+            
+        Returns:
+            (category, count) pairs, most common first
+        """
+        with get_db() as db:
+            cutoff_date = datetime.utcnow() - timedelta(days=days)
+            
+            # Same scoring as categorize_query(), evaluated by the database
+            # so only one row per category comes back
+            lowered = func.lower(Query.query_text)
+            scores = select(*[
+                sum(
+                    case((lowered.contains(keyword, autoescape=True), 1), else_=0)
+                    for keyword in keywords
+                ).label(f"score_{i}")
+                for i, keywords in enumerate(cls.CATEGORY_KEYWORDS_LOWER.values())
+            ]).where(
+                Query.created_at >= cutoff_date,
+                Query.success == True
+            ).subquery()
+            
+            # Highest score wins, ties going to the earlier category
+            columns = list(scores.c)
+            categories = list(cls.CATEGORY_KEYWORDS_LOWER)
+            whens = [(and_(*[column == 0 for column in columns]), "General")]
+            for i, category in enumerate(categories[:-1]):
+                whens.append((
+                    and_(*[columns[i] >= other for other in columns[i + 1:]]),
+                    category
+                ))
+            labeled = select(
+                case(*whens, else_=categories[-1]).label("category")
+            ).subquery()
+            
+            rows = db.execute(
+                select(labeled.c.category, func.count().label("count"))
+                .group_by(labeled.c.category)
+                .order_by(desc("count"))
+            ).all()
+            
+            return tuple((cat, count) for cat, count in rows)
+    
     def get_business_topics(self, days: int = 30) -> List[Dict]:
         """Get business topics from queries and answers.
         
@@ -178,18 +532,8 @@ class BusinessInsightsService:
             List of topics with counts
         """
         try:
-            with get_db() as db:
-                cutoff_date = datetime.utcnow() - timedelta(days=days)
-                queries_data = db.query(Query.query_text, Query.answer).filter(
-                    Query.created_at >= cutoff_date,
-                    Query.success == True,
-                    Query.answer.isnot(None)
-                ).all()
-                
-                queries = [q[0] for q in queries_data]
-                answers = [q[1] for q in queries_data if q[1]]
-                
-                return self.extract_topics(queries, answers)
+            queries, answers = _answer_window(days)
+            return self.extract_topics(list(queries), list(answers))
         except Exception as e:
             logger.error(f"Error getting business topics: {e}")
             return []
@@ -204,25 +548,17 @@ class BusinessInsightsService:
             Dictionary of business metrics
         """
         try:
-            with get_db() as db:
-                cutoff_date = datetime.utcnow() - timedelta(days=days)
-                answers = db.query(Query.answer).filter(
-                    Query.created_at >= cutoff_date,
-                    Query.success == True,
-                    Query.answer.isnot(None)
-                ).all()
-                
-                answer_texts = [a[0] for a in answers]
-                return self.extract_business_metrics(answer_texts)
+            _, answers = _answer_window(days)
+            return self.extract_business_metrics(answers)
         except Exception as e:
             logger.error(f"Error getting business metrics: {e}")
             return {}
     
-    def extract_numerical_data(self, answers: List[str]) -> Dict:
+    def extract_numerical_data(self, answers: Iterable[str]) -> Dict:
         """Extract actual numerical values from answers for visualization.
         
         Args:
-            answers: List of answer texts
+            answers: Answer texts
             
         Returns:
             Dictionary with extracted numerical data organized by metric type
@@ -239,172 +575,138 @@ class BusinessInsightsService:
             "customer_counts": []
         }
         
-        combined_text = " ".join(answers)
+        # Identical answers (the same question asked again) are scanned once
+        answers = list(answers)
+        unique_answers = list(dict.fromkeys(answers))
+        if numeric_re is not re and len(unique_answers) >= PARALLEL_SCAN_MIN_ANSWERS:
+            results = list(_get_scan_executor().map(
+                self._scan_numerical_data, unique_answers, chunksize=64
+            ))
+        else:
+            results = [self._scan_numerical_data(answer) for answer in unique_answers]
+        scanned = dict(zip(unique_answers, results))
         
-        # Extract EBITDA values (e.g., "€2.5 billion", "Euro 2.7 billion")
-        ebitda_patterns = [
-            r"ebitda.*?(?:€|euro|\$)\s*([\d.,]+)\s*(?:billion|million|thousand)",
-            r"ebitda.*?([\d.,]+)\s*(?:billion|million|thousand)",
-            r"ebitda.*?(?:between|to|of)\s*(?:€|euro|\$)?\s*([\d.,]+)\s*(?:and|to)\s*(?:€|euro|\$)?\s*([\d.,]+)\s*(?:billion|million)"
-        ]
-        
-        for pattern in ebitda_patterns:
-            matches = re.finditer(pattern, combined_text, re.IGNORECASE)
-            for match in matches:
-                try:
-                    groups = match.groups()
-                    values = [v.replace(',', '') for v in groups if v is not None and v.strip()]
-                    for val in values:
-                        try:
-                            num_val = float(val)
-                            match_text = match.group(0).lower()
-                            if 'billion' in match_text:
-                                num_val *= 1000  # Convert to millions for consistency
-                            numerical_data["ebitda"].append({
-                                "value": num_val,
-                                "unit": "million",
-                                "text": match.group(0)
-                            })
-                        except (ValueError, AttributeError):
-                            pass
-                except (AttributeError, IndexError):
-                    pass
-        
-        # Extract Revenue values
-        revenue_patterns = [
-            r"revenue.*?(?:€|euro|\$)\s*([\d.,]+)\s*(?:billion|million|thousand)",
-            r"revenue.*?([\d.,]+)\s*(?:billion|million|thousand)",
-            r"sales.*?(?:€|euro|\$)\s*([\d.,]+)\s*(?:billion|million|thousand)"
-        ]
-        
-        for pattern in revenue_patterns:
-            matches = re.finditer(pattern, combined_text, re.IGNORECASE)
-            for match in matches:
-                try:
-                    if match.groups() and match.group(1):
-                        val = match.group(1).replace(',', '')
-                        num_val = float(val)
-                        match_text = match.group(0).lower()
-                        if 'billion' in match_text:
-                            num_val *= 1000
-                        numerical_data["revenue"].append({
-                            "value": num_val,
-                            "unit": "million",
-                            "text": match.group(0)
-                        })
-                except (ValueError, AttributeError, IndexError):
-                    pass
-        
-        # Extract percentages (growth rates, margins)
-        percentage_patterns = [
-            r"(\d+\.?\d*)\s*%",  # Simple percentage
-            r"(?:growth|increase|decrease|margin|rate).*?(\d+\.?\d*)\s*%",
-            r"(\d+\.?\d*)\s*-\s*(\d+\.?\d*)\s*%"  # Range like "38%-40%"
-        ]
-        
-        for pattern in percentage_patterns:
-            matches = re.finditer(pattern, combined_text, re.IGNORECASE)
-            for match in matches:
-                try:
-                    groups = match.groups()
-                    if groups and len(groups) == 2 and groups[0] and groups[1]:  # Range
-                        try:
-                            val1 = float(match.group(1))
-                            val2 = float(match.group(2))
-                            numerical_data["percentages"].append({
-                                "value": (val1 + val2) / 2,  # Average
-                                "range": [val1, val2],
-                                "text": match.group(0)
-                            })
-                        except (ValueError, AttributeError):
-                            pass
-                    elif groups and groups[0]:
-                        try:
-                            val = float(match.group(1))
-                            context = match.group(0).lower()
-                            if 'margin' in context or 'ebitda margin' in context:
-                                numerical_data["margins"].append({
-                                    "value": val,
-                                    "text": match.group(0)
-                                })
-                            elif 'growth' in context or 'increase' in context or 'decrease' in context:
-                                numerical_data["growth_percentages"].append({
-                                    "value": val,
-                                    "text": match.group(0)
-                                })
-                            else:
-                                numerical_data["percentages"].append({
-                                    "value": val,
-                                    "text": match.group(0)
-                                })
-                        except (ValueError, AttributeError, IndexError):
-                            pass
-                except (AttributeError, IndexError):
-                    pass
-        
-        # Extract profit/earnings
-        profit_patterns = [
-            r"(?:profit|earnings|ebit).*?(?:€|euro|\$)\s*([\d.,]+)\s*(?:billion|million|thousand)",
-            r"(?:profit|earnings|ebit).*?([\d.,]+)\s*(?:billion|million|thousand)"
-        ]
+        for answer in answers:
+            for key, entries in scanned[answer].items():
+                numerical_data[key].extend(entries)
         
-        for pattern in profit_patterns:
-            matches = re.finditer(pattern, combined_text, re.IGNORECASE)
-            for match in matches:
-                try:
-                    if match.groups() and match.group(1):
-                        val = match.group(1).replace(',', '')
-                        num_val = float(val)
-                        match_text = match.group(0).lower()
-                        if 'billion' in match_text:
-                            num_val *= 1000
-                        numerical_data["profit"].append({
-                            "value": num_val,
-                            "unit": "million",
-                            "text": match.group(0)
-                        })
-                except (ValueError, AttributeError, IndexError):
-                    pass
-        
-        # Extract employee counts
-        employee_patterns = [
-            r"(\d+[\d,]*)\s*(?:employees|staff|workforce|personnel)",
-            r"(?:employees|staff|workforce).*?(\d+[\d,]*)"
-        ]
+        return numerical_data
+    
+    def _scan_numerical_data(self, answer: str) -> Dict[str, List[Dict]]:
+        """Run the fused NUMERIC_REGEX over one answer.
         
-        for pattern in employee_patterns:
-            matches = re.finditer(pattern, combined_text, re.IGNORECASE)
-            for match in matches:
-                try:
-                    if match.groups() and match.group(1):
-                        val = match.group(1).replace(',', '')
-                        numerical_data["employee_counts"].append({
-                            "value": int(float(val)),
-                            "text": match.group(0)
-                        })
-                except (ValueError, AttributeError, IndexError):
-                    pass
-        
-        # Extract customer counts
-        customer_patterns = [
-            r"(\d+[\d,]*)\s*(?:customers|clients|users|contracts)",
-            r"(?:customers|clients|users|contracts).*?(\d+[\d,]*)"
-        ]
+        Args:
+            answer: Answer text
+            
+        Returns:
+            Entries found in the answer, keyed like extract_numerical_data()
+        """
+        found = defaultdict(list)
+        
+        # Scan bytes so re2 doesn't re-encode the text on every search()
+        data = _scan_bytes(answer)
+        # (kind, capture offsets) already recorded; see the resume note below
+        seen = set()
+        pos = 0
+        while True:
+            match = self.NUMERIC_REGEX.search(data, pos)
+            if match is None:
+                break
+            kind, captures, starts_with_number = self.NUMERIC_GROUPS[match.lastgroup]
+            
+            # Keyword-led matches can span other figures (the "5%" in "revenue
+            # grew 5% to €2 billion"), so resume just past their start;
+            # number-led matches resume at their end like finditer()
+            pos = match.end() if starts_with_number else match.start() + 1
+            
+            # Resuming inside a keyword-led span can match the same figures
+            # again from a later keyword ("EBITDA margin of 20% and EBITDA
+            # between €2.5 and 2.7 billion")
+            key = (kind, tuple(match.start(i) for i in captures))
+            if key in seen:
+                continue
+            seen.add(key)
+            
+            # Captured numbers are ASCII, which float() parses straight from bytes
+            values = [match.group(i) for i in captures]
+            context = ""
+            if kind == "percentage":
+                start = match.start()
+                window = data[max(0, start - self.PERCENT_CONTEXT_BYTES):start]
+                context = window.decode("utf-8", "ignore")
+            self._record_numerical_match(
+                kind, values, match.group(0).decode("utf-8"), found, context
+            )
+        
+        return found
+    
+    def _record_numerical_match(
+        self,
+        kind: str,
+        values: List[Optional[bytes]],
+        text: str,
+        numerical_data: Dict,
+        context: str = ""
+    ) -> None:
+        """Append one NUMERIC_REGEX match to the extracted numerical data.
         
-        for pattern in customer_patterns:
-            matches = re.finditer(pattern, combined_text, re.IGNORECASE)
-            for match in matches:
-                try:
-                    if match.groups() and match.group(1):
-                        val = match.group(1).replace(',', '')
-                        numerical_data["customer_counts"].append({
-                            "value": int(float(val)),
-                            "text": match.group(0)
-                        })
-                except (ValueError, AttributeError, IndexError):
-                    pass
+        Args:
+            kind: Metric kind from NUMERIC_PATTERNS
+            values: Captured numbers as bytes (None for groups that didn't match)
+            text: Full matched text
+            numerical_data: Entries being collected for the current answer
+            context: Text just before a percentage, used to classify it
+        """
+        values = [v for v in values if v is not None and v.strip()]
+        if not values:
+            return
+        text_lower = text.lower()
         
-        return numerical_data
+        try:
+            if kind in ("ebitda", "revenue", "profit"):
+                for val in values:
+                    try:
+                        num_val = float(val.replace(b',', b''))
+                    except ValueError:
+                        continue
+                    if 'billion' in text_lower:
+                        num_val *= 1000  # Convert to millions for consistency
+                    numerical_data[kind].append({
+                        "value": num_val,
+                        "unit": "million",
+                        "text": text
+                    })
+            
+            elif kind == "percentage":
+                # The context word closest to the number decides
+                key = "percentages"
+                for word in reversed(self.WORD_REGEX.findall(context.lower())):
+                    if word in self.PERCENT_CONTEXT_KEYS:
+                        key = self.PERCENT_CONTEXT_KEYS[word]
+                        break
+                
+                if len(values) == 2:  # Range
+                    val1 = float(values[0])
+                    val2 = float(values[1])
+                    numerical_data[key].append({
+                        "value": (val1 + val2) / 2,  # Average
+                        "range": [val1, val2],
+                        "text": text
+                    })
+                else:
+                    numerical_data[key].append({
+                        "value": float(values[0]),
+                        "text": text
+                    })
+            
+            elif kind in ("employees", "customers"):
+                key = "employee_counts" if kind == "employees" else "customer_counts"
+                numerical_data[key].append({
+                    "value": int(float(values[0].replace(b',', b''))),
+                    "text": text
+                })
+        except ValueError:
+            pass
     
     def get_numerical_data(self, days: int = 30) -> Dict:
         """Get numerical data extracted from answers.
@@ -416,21 +718,13 @@ class BusinessInsightsService:
             Dictionary with numerical data organized by metric type
         """
         try:
-            with get_db() as db:
-                cutoff_date = datetime.utcnow() - timedelta(days=days)
-                answers = db.query(Query.answer).filter(
-                    Query.created_at >= cutoff_date,
-                    Query.success == True,
-                    Query.answer.isnot(None)
-                ).all()
-                
-                answer_texts = [a[0] for a in answers]
-                return self.extract_numerical_data(answer_texts)
+            _, answers = _answer_window(days)
+            return self.extract_numerical_data(answers)
         except Exception as e:
             logger.error(f"Error getting numerical data: {e}")
             return {}
     
-    def get_key_insights(self, days: int = 30) -> List[str]:
+    async def get_key_insights(self, days: int = 30) -> List[str]:
         """Generate key business insights.
         
         Args:
@@ -442,16 +736,14 @@ class BusinessInsightsService:
         insights = []
         
         try:
-            # Get analytics
-            from app.services.analytics import AnalyticsService
-            analytics_service = AnalyticsService()
-            analytics = analytics_service.get_analytics(days=days)
-            
-            # Get categories
-            categories = self.get_query_categories(days=days)
-            
-            # Get metrics
-            metrics = self.get_business_metrics_summary(days=days)
+            # Analytics, categories, metrics and documents are independent,
+            # so fetch them concurrently
+            analytics, categories, metrics, documents = await asyncio.gather(
+                self.analytics_service.get_analytics(days=days),
+                asyncio.to_thread(self.get_query_categories, days=days),
+                asyncio.to_thread(self.get_business_metrics_summary, days=days),
+                self.analytics_service.get_documents()
+            )
             
             # Generate insights
             if analytics.get("total_queries", 0) > 0:
@@ -471,7 +763,6 @@ class BusinessInsightsService:
                 insights.append(f"High query success rate: {analytics['success_rate']:.1f}%")
             
             # Document coverage
-            documents = analytics_service.get_documents()
             if documents:
                 total_chunks = sum(d.get("chunks_count", 0) for d in documents)
                 insights.append(f"Knowledge base contains {len(documents)} documents with {total_chunks} total chunks")
@@ -1,15 +1,23 @@
 """Document chunking service."""
 
+import copy
 import logging
 from typing import List, Tuple, Dict, Optional
 import tiktoken
 from langchain_text_splitters import RecursiveCharacterTextSplitter
-from langchain_core.documents import Document
 
-from app.core.config import settings
+from app.core.config import settings, get_worker_cpu_count
 
 logger = logging.getLogger(__name__)
 
+# Rough characters per token for English text under cl100k_base; used to size
+# the fast character-based splitter before token counts are checked
+CHARS_PER_TOKEN = 4
+
+# Threads per batched tiktoken call; tiktoken starts a fresh pool each call
+# and the batches are small, so a few threads are plenty
+TOKEN_COUNT_THREADS = min(4, get_worker_cpu_count())
+
 
 class ChunkingService:
     """Service for splitting documents into chunks using token-aware splitting."""
@@ -38,8 +46,18 @@ class ChunkingService:
             logger.warning(f"Failed to load tokenizer {self.tokenizer_name}: {e}. Falling back to cl100k_base")
             self.tokenizer = tiktoken.get_encoding("cl100k_base")
         
-        # Token-aware text splitter
+        # Character-based splitter sized to roughly chunk_size tokens; it
+        # measures candidates with len() instead of encoding each one
         self.text_splitter = RecursiveCharacterTextSplitter(
+            chunk_size=self.chunk_size * CHARS_PER_TOKEN,
+            chunk_overlap=self.chunk_overlap * CHARS_PER_TOKEN,
+            length_function=len,
+            separators=["\n\n", "\n", ". ", " ", ""],
+        )
+        
+        # Token-aware splitter, only used to re-split chunks that end up over
+        # chunk_size tokens
+        self.token_splitter = RecursiveCharacterTextSplitter(
             chunk_size=self.chunk_size,
             chunk_overlap=self.chunk_overlap,
             length_function=self._count_tokens,
@@ -65,6 +83,50 @@ class ChunkingService:
             logger.warning(f"Error counting tokens: {e}. Falling back to character count")
             return len(text)
     
+    def _count_tokens_batch(self, texts: List[str]) -> List[int]:
+        """Count tokens for many texts with one batched tiktoken call.
+        
+        Args:
+            texts: Input texts
+            
+        Returns:
+            Number of tokens for each text, in order
+        """
+        try:
+            token_lists = self.tokenizer.encode_ordinary_batch(
+                texts, num_threads=TOKEN_COUNT_THREADS
+            )
+            return [len(tokens) for tokens in token_lists]
+        except Exception as e:
+            logger.warning(f"Error counting tokens: {e}. Falling back to character count")
+            return [len(text) for text in texts]
+    
+    def _split(self, text: str) -> Tuple[List[str], List[int]]:
+        """Split text into chunks of at most chunk_size tokens.
+        
+        Args:
+            text: Input text
+            
+        Returns:
+            Tuple of (chunks, token count of each chunk)
+        """
+        chunks = self.text_splitter.split_text(text)
+        token_counts = self._count_tokens_batch(chunks)
+        if all(count <= self.chunk_size for count in token_counts):
+            return chunks, token_counts
+        
+        # Dense text (numbers, tables) can run past the character estimate
+        result, result_counts = [], []
+        for chunk, count in zip(chunks, token_counts):
+            if count <= self.chunk_size:
+                result.append(chunk)
+                result_counts.append(count)
+            else:
+                pieces = self.token_splitter.split_text(chunk)
+                result.extend(pieces)
+                result_counts.extend(self._count_tokens_batch(pieces))
+        return result, result_counts
+    
     def chunk_text(self, text: str) -> List[str]:
         """Split text into chunks.
         
@@ -75,12 +137,11 @@ class ChunkingService:
             List of text chunks (filtered to remove empty/short chunks)
         """
         try:
-            chunks = self.text_splitter.split_text(text)
+            chunks, token_counts = self._split(text)
             
             # Filter out empty or very short chunks (less than 10 tokens)
             filtered_chunks = []
-            for chunk in chunks:
-                token_count = self._count_tokens(chunk)
+            for chunk, token_count in zip(chunks, token_counts):
                 if token_count >= 10:  # Minimum 10 tokens
                     filtered_chunks.append(chunk)
                 else:
@@ -121,13 +182,11 @@ class ChunkingService:
         """
         all_chunks = []
         for text, metadata in documents:
-            # Create Document object for LangChain splitter
-            doc = Document(page_content=text, metadata=metadata)
-            chunks = self.text_splitter.split_documents([doc])
+            chunks, _ = self._split(text)
             
             for chunk in chunks:
                 # Preserve original metadata and add chunk info
-                chunk_metadata = chunk.metadata.copy()
+                chunk_metadata = copy.deepcopy(metadata)
                 # Ensure page number is preserved
                 if 'page' in chunk_metadata:
                     chunk_metadata['page_number'] = chunk_metadata['page']
@@ -137,7 +196,7 @@ class ChunkingService:
                     # If source contains page info, extract it
                     pass
                 
-                all_chunks.append((chunk.page_content, chunk_metadata))
+                all_chunks.append((chunk, chunk_metadata))
         
         logger.info(f"Split {len(documents)} documents into {len(all_chunks)} chunks with metadata")
         return all_chunks
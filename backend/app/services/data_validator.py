@@ -1,11 +1,15 @@
 """Data validation service for cross-checking and validating extracted financial data."""
 
 import logging
+import sys
 from typing import Dict, List, Optional, Any, Tuple
 from collections import defaultdict
 
 logger = logging.getLogger(__name__)
 
+# Cross-reference statuses that count against the consistency score
+ISSUE_STATUSES = frozenset({"warning", "error"})
+
 
 class DataValidator:
     """Service for validating and cross-checking extracted financial data."""
@@ -39,15 +43,20 @@ class DataValidator:
         
         try:
             # Validate revenue data
-            revenue_validation = self._validate_revenue(kpis.get("revenue", []), content)
+            revenue_validation = self._validate_metric(
+                kpis.get("revenue", ()),
+                "revenue",
+                required=True,
+                checks=("duplicate_period", "negative")
+            )
             validation_results["validated_metrics"]["revenue"] = revenue_validation
             
             # Validate EBITDA data
-            ebitda_validation = self._validate_ebitda(kpis.get("ebitda", []), content)
+            ebitda_validation = self._validate_metric(kpis.get("ebitda", ()), "EBITDA")
             validation_results["validated_metrics"]["ebitda"] = ebitda_validation
             
             # Validate profit data
-            profit_validation = self._validate_profit(kpis.get("profit", []), content)
+            profit_validation = self._validate_metric(kpis.get("profit", ()), "profit")
             validation_results["validated_metrics"]["profit"] = profit_validation
             
             # Cross-check relationships
@@ -86,47 +95,57 @@ class DataValidator:
         
         return validation_results
     
-    def _validate_revenue(
+    def _validate_metric(
         self,
-        revenue_list: List[Dict],
-        content: List[Tuple[str, float, Dict]]
+        items: List[Dict],
+        label: str,
+        required: bool = False,
+        checks: Tuple[str, ...] = ()
     ) -> Dict[str, Any]:
-        """Validate revenue data.
+        """Validate the entries extracted for one metric.
         
         Args:
-            revenue_list: List of revenue KPIs
-            content: Content chunks for cross-reference
+            items: List of KPI entries for the metric
+            label: Metric name used in warnings (e.g. "revenue", "EBITDA")
+            required: Whether missing data makes the metric invalid
+            checks: Extra checks to run: "duplicate_period", "negative"
             
         Returns:
             Validation result dictionary
         """
         validation = {
-            "count": len(revenue_list),
+            "count": len(items),
             "values": [],
             "periods": [],
             "warnings": [],
             "is_valid": True
         }
         
-        if not revenue_list:
-            validation["warnings"].append("No revenue data found")
-            validation["is_valid"] = False
+        if not items:
+            validation["warnings"].append(f"No {label} data found")
+            if required:
+                validation["is_valid"] = False
             return validation
         
-        # Extract values and check for consistency
+        entry_label = label[:1].upper() + label[1:]
+        check_duplicates = "duplicate_period" in checks
         seen_periods = set()
-        for revenue in revenue_list:
-            if not isinstance(revenue, dict):
+        for item in items:
+            if not isinstance(item, dict):
                 continue
             
-            value = revenue.get("value")
-            period = revenue.get("period")
+            value = item.get("value")
+            period = item.get("period")
+            # The same few period labels ("FY2023", "Q1 2024") recur across
+            # entries and metrics; interning shares one copy of each
+            if isinstance(period, str):
+                period = sys.intern(period)
             
             if value is None:
-                validation["warnings"].append(f"Revenue entry missing value: {revenue}")
+                validation["warnings"].append(f"{entry_label} entry missing value: {item}")
                 continue
             
-            if period:
+            if check_duplicates and period:
                 if period in seen_periods:
                     validation["warnings"].append(f"Duplicate period found: {period}")
                 seen_periods.add(period)
@@ -134,94 +153,11 @@ class DataValidator:
             validation["values"].append(value)
             validation["periods"].append(period)
         
-        # Check for reasonable values (revenue should be positive)
-        negative_values = [v for v in validation["values"] if v < 0]
-        if negative_values:
-            validation["warnings"].append(f"Found {len(negative_values)} negative revenue values")
-        
-        return validation
-    
-    def _validate_ebitda(
-        self,
-        ebitda_list: List[Dict],
-        content: List[Tuple[str, float, Dict]]
-    ) -> Dict[str, Any]:
-        """Validate EBITDA data.
-        
-        Args:
-            ebitda_list: List of EBITDA KPIs
-            content: Content chunks for cross-reference
-            
-        Returns:
-            Validation result dictionary
-        """
-        validation = {
-            "count": len(ebitda_list),
-            "values": [],
-            "periods": [],
-            "warnings": [],
-            "is_valid": True
-        }
-        
-        if not ebitda_list:
-            validation["warnings"].append("No EBITDA data found")
-            return validation
-        
-        for ebitda in ebitda_list:
-            if not isinstance(ebitda, dict):
-                continue
-            
-            value = ebitda.get("value")
-            period = ebitda.get("period")
-            
-            if value is None:
-                validation["warnings"].append(f"EBITDA entry missing value: {ebitda}")
-                continue
-            
-            validation["values"].append(value)
-            validation["periods"].append(period)
-        
-        return validation
-    
-    def _validate_profit(
-        self,
-        profit_list: List[Dict],
-        content: List[Tuple[str, float, Dict]]
-    ) -> Dict[str, Any]:
-        """Validate profit/net income data.
-        
-        Args:
-            profit_list: List of profit KPIs
-            content: Content chunks for cross-reference
-            
-        Returns:
-            Validation result dictionary
-        """
-        validation = {
-            "count": len(profit_list),
-            "values": [],
-            "periods": [],
-            "warnings": [],
-            "is_valid": True
-        }
-        
-        if not profit_list:
-            validation["warnings"].append("No profit data found")
-            return validation
-        
-        for profit in profit_list:
-            if not isinstance(profit, dict):
-                continue
-            
-            value = profit.get("value")
-            period = profit.get("period")
-            
-            if value is None:
-                validation["warnings"].append(f"Profit entry missing value: {profit}")
-                continue
-            
-            validation["values"].append(value)
-            validation["periods"].append(period)
+        # Check for reasonable values (e.g. revenue should be positive)
+        if "negative" in checks:
+            negative_count = sum(1 for v in validation["values"] if v < 0)
+            if negative_count:
+                validation["warnings"].append(f"Found {negative_count} negative {label} values")
         
         return validation
     
@@ -239,77 +175,78 @@ class DataValidator:
         """
         checks = []
         
-        revenues = kpis.get("revenue", [])
-        ebitda_list = kpis.get("ebitda", [])
-        profit_list = kpis.get("profit", [])
+        # Relationships are judged on the most recent value of each metric
+        latest_revenue = self._latest_value(kpis.get("revenue"))
+        latest_ebitda = self._latest_value(kpis.get("ebitda"))
+        latest_profit = self._latest_value(kpis.get("profit"))
         
         # Check: EBITDA should generally be less than Revenue
-        if revenues and ebitda_list:
-            latest_revenue = revenues[-1].get("value") if revenues else None
-            latest_ebitda = ebitda_list[-1].get("value") if ebitda_list else None
-            
-            if latest_revenue and latest_ebitda:
-                if latest_ebitda > latest_revenue:
-                    checks.append({
-                        "type": "relationship_check",
-                        "metric": "EBITDA vs Revenue",
-                        "status": "warning",
-                        "message": f"EBITDA ({latest_ebitda}) exceeds Revenue ({latest_revenue}) - unusual but possible",
-                        "value1": latest_ebitda,
-                        "value2": latest_revenue
-                    })
-                elif latest_ebitda < 0 and latest_revenue > 0:
-                    checks.append({
-                        "type": "relationship_check",
-                        "metric": "EBITDA vs Revenue",
-                        "status": "warning",
-                        "message": "Negative EBITDA with positive Revenue - may indicate operational issues",
-                        "value1": latest_ebitda,
-                        "value2": latest_revenue
-                    })
+        if latest_revenue and latest_ebitda:
+            if latest_ebitda > latest_revenue:
+                checks.append({
+                    "type": "relationship_check",
+                    "metric": "EBITDA vs Revenue",
+                    "status": "warning",
+                    "message": f"EBITDA ({latest_ebitda}) exceeds Revenue ({latest_revenue}) - unusual but possible",
+                    "value1": latest_ebitda,
+                    "value2": latest_revenue
+                })
+            elif latest_ebitda < 0 and latest_revenue > 0:
+                checks.append({
+                    "type": "relationship_check",
+                    "metric": "EBITDA vs Revenue",
+                    "status": "warning",
+                    "message": "Negative EBITDA with positive Revenue - may indicate operational issues",
+                    "value1": latest_ebitda,
+                    "value2": latest_revenue
+                })
         
         # Check: Profit should generally be less than EBITDA
-        if ebitda_list and profit_list:
-            latest_ebitda = ebitda_list[-1].get("value") if ebitda_list else None
-            latest_profit = profit_list[-1].get("value") if profit_list else None
-            
-            if latest_ebitda and latest_profit:
-                if latest_profit > latest_ebitda:
-                    checks.append({
-                        "type": "relationship_check",
-                        "metric": "Profit vs EBITDA",
-                        "status": "info",
-                        "message": f"Profit ({latest_profit}) exceeds EBITDA ({latest_ebitda}) - unusual but possible with non-operating income",
-                        "value1": latest_profit,
-                        "value2": latest_ebitda
-                    })
+        if latest_ebitda and latest_profit:
+            if latest_profit > latest_ebitda:
+                checks.append({
+                    "type": "relationship_check",
+                    "metric": "Profit vs EBITDA",
+                    "status": "info",
+                    "message": f"Profit ({latest_profit}) exceeds EBITDA ({latest_ebitda}) - unusual but possible with non-operating income",
+                    "value1": latest_profit,
+                    "value2": latest_ebitda
+                })
         
         # Check margins consistency
         margins = kpis.get("margins", {})
         if margins:
-            ebitda_margins = margins.get("ebitda_margin", [])
-            if ebitda_margins and revenues and ebitda_list:
-                latest_revenue = revenues[-1].get("value") if revenues else None
-                latest_ebitda = ebitda_list[-1].get("value") if ebitda_list else None
-                latest_margin = ebitda_margins[-1].get("value") if ebitda_margins else None
+            latest_margin = self._latest_value(margins.get("ebitda_margin"))
+            
+            if latest_revenue and latest_ebitda and latest_margin:
+                calculated_margin = (latest_ebitda / latest_revenue) * 100 if latest_revenue > 0 else 0
+                margin_diff = abs(calculated_margin - latest_margin)
                 
-                if latest_revenue and latest_ebitda and latest_margin:
-                    calculated_margin = (latest_ebitda / latest_revenue) * 100 if latest_revenue > 0 else 0
-                    margin_diff = abs(calculated_margin - latest_margin)
-                    
-                    if margin_diff > 5:  # More than 5% difference
-                        checks.append({
-                            "type": "consistency_check",
-                            "metric": "EBITDA Margin",
-                            "status": "warning",
-                            "message": f"Calculated margin ({calculated_margin:.2f}%) differs from reported margin ({latest_margin:.2f}%)",
-                            "calculated": calculated_margin,
-                            "reported": latest_margin,
-                            "difference": margin_diff
-                        })
+                if margin_diff > 5:  # More than 5% difference
+                    checks.append({
+                        "type": "consistency_check",
+                        "metric": "EBITDA Margin",
+                        "status": "warning",
+                        "message": f"Calculated margin ({calculated_margin:.2f}%) differs from reported margin ({latest_margin:.2f}%)",
+                        "calculated": calculated_margin,
+                        "reported": latest_margin,
+                        "difference": margin_diff
+                    })
         
         return checks
     
+    @staticmethod
+    def _latest_value(items: Optional[List[Dict[str, Any]]]) -> Optional[float]:
+        """Return the value of the most recent entry in a KPI list.
+        
+        Args:
+            items: KPI entries, oldest first
+            
+        Returns:
+            Value of the last entry, or None if there are no entries
+        """
+        return items[-1].get("value") if items else None
+    
     def _detect_contradictions(
         self,
         kpis: Dict[str, Any],
@@ -327,52 +264,66 @@ class DataValidator:
         contradictions = []
         
         # Check for duplicate periods with different values
-        revenue_by_period = defaultdict(list)
-        for revenue in kpis.get("revenue", []):
-            if isinstance(revenue, dict):
-                period = revenue.get("period")
-                value = revenue.get("value")
-                if period and value is not None:
-                    revenue_by_period[period].append(value)
-        
-        for period, values in revenue_by_period.items():
-            if len(values) > 1:
-                unique_values = set(values)
-                if len(unique_values) > 1:
-                    max_diff = max(values) - min(values)
-                    if max_diff > max(values) * 0.1:  # More than 10% difference
-                        contradictions.append({
-                            "type": "contradiction",
-                            "metric": "revenue",
-                            "period": period,
-                            "values": values,
-                            "message": f"Contradicting revenue values for {period}: {values}",
-                            "severity": "high" if max_diff > max(values) * 0.2 else "medium"
-                        })
+        contradictions.extend(
+            self._find_period_contradictions(kpis.get("revenue", ()), "revenue", "revenue")
+        )
         
         # Similar check for EBITDA
-        ebitda_by_period = defaultdict(list)
-        for ebitda in kpis.get("ebitda", []):
-            if isinstance(ebitda, dict):
-                period = ebitda.get("period")
-                value = ebitda.get("value")
+        contradictions.extend(
+            self._find_period_contradictions(kpis.get("ebitda", ()), "ebitda", "EBITDA")
+        )
+        
+        return contradictions
+    
+    def _find_period_contradictions(
+        self,
+        items: List[Dict],
+        metric: str,
+        label: str
+    ) -> List[Dict[str, Any]]:
+        """Find periods reported with materially different values.
+        
+        Args:
+            items: KPI entries for one metric
+            metric: Metric key used in the result
+            label: Metric name used in the message
+            
+        Returns:
+            List of detected contradictions
+        """
+        contradictions = []
+        
+        values_by_period = defaultdict(list)
+        for item in items:
+            if isinstance(item, dict):
+                period = item.get("period")
+                value = item.get("value")
+                if isinstance(period, str):
+                    period = sys.intern(period)
                 if period and value is not None:
-                    ebitda_by_period[period].append(value)
-        
-        for period, values in ebitda_by_period.items():
-            if len(values) > 1:
-                unique_values = set(values)
-                if len(unique_values) > 1:
-                    max_diff = max(values) - min(values)
-                    if max_diff > max(values) * 0.1:
-                        contradictions.append({
-                            "type": "contradiction",
-                            "metric": "ebitda",
-                            "period": period,
-                            "values": values,
-                            "message": f"Contradicting EBITDA values for {period}: {values}",
-                            "severity": "high" if max_diff > max(values) * 0.2 else "medium"
-                        })
+                    values_by_period[period].append(value)
+        
+        for period, values in values_by_period.items():
+            if len(values) < 2:
+                continue
+            
+            if len(values) == 2:
+                # The common case: one period reported in two chunks
+                first, second = values
+                max_value, min_value = (first, second) if first >= second else (second, first)
+            else:
+                max_value, min_value = max(values), min(values)
+            max_diff = max_value - min_value
+            # max_diff > 0 means the values aren't all equal
+            if max_diff > 0 and max_diff > max_value * 0.1:  # More than 10% difference
+                contradictions.append({
+                    "type": "contradiction",
+                    "metric": metric,
+                    "period": period,
+                    "values": values,
+                    "message": f"Contradicting {label} values for {period}: {values}",
+                    "severity": "high" if max_diff > max_value * 0.2 else "medium"
+                })
         
         return contradictions
     
@@ -435,24 +386,22 @@ class DataValidator:
         score = 1.0
         
         # Deduct for errors
-        error_count = len(validation_results.get("errors", []))
+        error_count = len(validation_results.get("errors", ()))
         score -= error_count * 0.2
         
         # Deduct for warnings
-        warning_count = len(validation_results.get("warnings", []))
+        warning_count = len(validation_results.get("warnings", ()))
         score -= warning_count * 0.05
         
         # Deduct for cross-reference issues
-        cross_ref_issues = [
-            ref for ref in validation_results.get("cross_references", [])
-            if ref.get("status") in ["warning", "error"]
-        ]
-        score -= len(cross_ref_issues) * 0.1
+        cross_ref_issue_count = sum(
+            1 for ref in validation_results.get("cross_references", ())
+            if ref.get("status") in ISSUE_STATUSES
+        )
+        score -= cross_ref_issue_count * 0.1
         
         # Ensure score is between 0 and 1
-        score = max(0.0, min(1.0, score))
-        
-        return score
+        return 0.0 if score < 0.0 else (1.0 if score > 1.0 else score)
 
 
 
@@ -1,16 +1,53 @@
 """Embedding service using nomic-embed-text-v1."""
 
+import asyncio
+import hashlib
+import itertools
 import logging
 import os
-from typing import List, Optional
+import tempfile
+import threading
+from pathlib import Path
+from typing import Dict, List, Optional
+import httpx
 import numpy as np
-from langchain_nomic import NomicEmbeddings
-from langchain_core.embeddings import Embeddings
 
 from app.core.config import settings
 
 logger = logging.getLogger(__name__)
 
+# Texts per embedding request and how many requests may be in flight at once
+EMBED_BATCH_SIZE = 64
+EMBED_CONCURRENCY = 8
+
+# Estimated tokens per request; a full batch of full-size chunks fits, while
+# batches of unusually long texts are split into smaller requests. Token
+# counts are estimated from length (same ratio as the chunker's) so that
+# importing this module doesn't load a tokenizer
+EMBED_CHARS_PER_TOKEN = 4
+EMBED_BATCH_TOKENS = EMBED_BATCH_SIZE * settings.CHUNK_SIZE
+
+# Context length of nomic-embed-text-v1; the API truncates longer texts
+EMBED_MAX_TEXT_TOKENS = 8192
+
+# Attempts per batch; waits double from EMBED_RETRY_DELAY_SECONDS between them
+EMBED_MAX_ATTEMPTS = 3
+EMBED_RETRY_DELAY_SECONDS = 0.5
+
+EMBED_REQUEST_TIMEOUT_SECONDS = 60.0
+
+# Once the embedding cache exceeds EMBED_CACHE_MAX_ENTRIES it is pruned to
+# this fraction of the limit, so pruning doesn't run on every write
+EMBED_CACHE_PRUNE_TO = 0.9
+
+# Nomic task types; queries and documents are embedded with different prefixes
+QUERY_TASK = "search_query"
+DOCUMENT_TASK = "search_document"
+
+
+class EmbeddingAuthError(RuntimeError):
+    """Raised when the Nomic API rejects the configured API key."""
+
 
 class EmbeddingService:
     """Service for generating embeddings using nomic-embed-text-v1."""
@@ -22,34 +59,105 @@ class EmbeddingService:
             model_name: Optional model name override
         """
         self.model_name = model_name or settings.EMBEDDING_MODEL
-        self.embeddings: Optional[Embeddings] = None
+        self.api_url = f"{settings.NOMIC_API_URL.rstrip('/')}/v1/embedding/text"
+        self.api_key: Optional[str] = None
+        self._client: Optional[httpx.AsyncClient] = None
         self._initialize_embeddings()
+        
+        # Content-addressed cache of document embeddings, so re-ingesting
+        # unchanged chunks doesn't call the model again. Hits refresh a
+        # file's mtime, and the least recently used files are evicted
+        # once there are more than EMBED_CACHE_MAX_ENTRIES
+        self.cache_dir: Optional[Path] = None
+        self._cache_entries = 0
+        # _store_cached() runs in worker threads; guards the entry count
+        self._cache_lock = threading.Lock()
+        if settings.EMBED_CACHE_DIR:
+            self.cache_dir = Path(settings.EMBED_CACHE_DIR)
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            self._cache_entries = sum(1 for _ in self.cache_dir.glob("*.npy"))
     
     def _initialize_embeddings(self) -> None:
-        """Initialize the embedding model."""
-        try:
-            # Set NOMIC_API_KEY environment variable if available in settings
-            # NomicEmbeddings reads from NOMIC_API_KEY environment variable
-            if settings.NOMIC_API_KEY:
-                os.environ["NOMIC_API_KEY"] = settings.NOMIC_API_KEY
-                logger.info("NOMIC_API_KEY set from configuration")
-            elif not os.environ.get("NOMIC_API_KEY"):
-                logger.warning(
-                    "NOMIC_API_KEY not found in settings or environment. "
-                    "NomicEmbeddings may fail. Please add NOMIC_API_KEY to your .env file."
-                )
+        """Resolve the Nomic API key for the embedding model."""
+        self.api_key = settings.NOMIC_API_KEY or os.environ.get("NOMIC_API_KEY")
+        if settings.NOMIC_API_KEY:
+            logger.info("NOMIC_API_KEY set from configuration")
+        elif not self.api_key:
+            logger.warning(
+                "NOMIC_API_KEY not found in settings or environment. "
+                "Embedding requests will fail. Please add NOMIC_API_KEY to your .env file."
+            )
+        
+        logger.info(f"Initializing embedding model: {self.model_name}")
+        logger.info("Embedding model initialized successfully")
+    
+    def _get_client(self) -> httpx.AsyncClient:
+        """Return the shared HTTP client, creating it on first use.
+        
+        One pooled HTTP/2 client serves every request, so concurrent batches
+        are multiplexed over kept-alive connections instead of paying a TCP
+        and TLS handshake each.
+        
+        Returns:
+            The service's AsyncClient
+        """
+        if self._client is None or self._client.is_closed:
+            self._client = httpx.AsyncClient(
+                http2=True,
+                timeout=EMBED_REQUEST_TIMEOUT_SECONDS,
+                limits=httpx.Limits(
+                    max_connections=EMBED_CONCURRENCY,
+                    max_keepalive_connections=EMBED_CONCURRENCY,
+                ),
+            )
+        return self._client
+    
+    async def close(self) -> None:
+        """Close the shared HTTP client (used at shutdown)."""
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+    
+    async def _request_embeddings(
+        self,
+        texts: List[str],
+        task_type: str
+    ) -> List[List[float]]:
+        """Embed texts with one call to the Nomic embedding API.
+        
+        Args:
+            texts: Texts to embed
+            task_type: Nomic task type, QUERY_TASK or DOCUMENT_TASK
             
-            logger.info(f"Initializing embedding model: {self.model_name}")
-            self.embeddings = NomicEmbeddings(model=self.model_name)
-            logger.info("Embedding model initialized successfully")
-        except Exception as e:
-            logger.error(f"Failed to initialize embedding model: {e}")
-            if not settings.NOMIC_API_KEY and not os.environ.get("NOMIC_API_KEY"):
-                logger.error(
-                    "NOMIC_API_KEY is required. Please add it to your .env file: "
-                    "NOMIC_API_KEY=your_api_key_here"
-                )
-            raise
+        Returns:
+            Embedding vector for each text, in order
+            
+        Raises:
+            EmbeddingAuthError: If the API key is missing or rejected
+            httpx.HTTPError: If the request fails
+        """
+        if not self.api_key:
+            raise EmbeddingAuthError(
+                "NOMIC_API_KEY is required but not set. "
+                "Please add NOMIC_API_KEY to your .env file."
+            )
+        
+        headers: Dict[str, str] = {"Authorization": f"Bearer {self.api_key}"}
+        response = await self._get_client().post(
+            self.api_url,
+            headers=headers,
+            json={
+                "texts": texts,
+                "model": self.model_name,
+                "task_type": task_type,
+            },
+        )
+        if response.status_code in (401, 403):
+            raise EmbeddingAuthError(
+                f"Nomic API rejected the API key ({response.status_code}): {response.text}"
+            )
+        response.raise_for_status()
+        return response.json()["embeddings"]
     
     async def embed_text(self, text: str) -> List[float]:
         """Generate embedding for a single text.
@@ -60,12 +168,9 @@ class EmbeddingService:
         Returns:
             List of embedding values
         """
-        if not self.embeddings:
-            raise RuntimeError("Embedding model not initialized")
-        
         try:
-            embedding = await self.embeddings.aembed_query(text)
-            return embedding
+            embeddings = await self._request_embeddings([text], QUERY_TASK)
+            return embeddings[0]
         except Exception as e:
             logger.error(f"Error embedding text: {e}")
             raise
@@ -78,21 +183,28 @@ class EmbeddingService:
             
         Returns:
             List of embedding vectors
+        """
+        embeddings = await self.embed_documents_array(texts)
+        return embeddings.tolist()
+    
+    async def embed_documents_array(self, texts: List[str]) -> np.ndarray:
+        """Generate embeddings for multiple texts as one float32 array.
+        
+        Callers that hand vectors to FAISS should use this rather than
+        embed_documents(), which boxes every value in a Python float.
+        
+        Args:
+            texts: List of texts to embed
+            
+        Returns:
+            Array of shape (len(texts), dimension), one row per text
             
         Raises:
-            RuntimeError: If embedding model is not initialized
+            ValueError: If NOMIC_API_KEY is not configured
             Exception: If embedding generation fails
         """
-        if not self.embeddings:
-            error_msg = (
-                "Embedding model not initialized. "
-                "Please check your NOMIC_API_KEY configuration."
-            )
-            logger.error(error_msg)
-            raise RuntimeError(error_msg)
-        
         # Verify API key is set
-        if not settings.NOMIC_API_KEY and not os.environ.get("NOMIC_API_KEY"):
+        if not self.api_key:
             error_msg = (
                 "NOMIC_API_KEY is required but not set. "
                 "Please add NOMIC_API_KEY to your .env file."
@@ -101,21 +213,55 @@ class EmbeddingService:
             raise ValueError(error_msg)
         
         try:
-            logger.info(f"Generating embeddings for {len(texts)} texts...")
-            embeddings = await self.embeddings.aembed_documents(texts)
+            # Only texts without a cached embedding go to the model
+            keys = [self._cache_key("document", text) for text in texts]
+            embeddings = await asyncio.to_thread(self._load_cached, keys)
+            missing = [i for i, embedding in enumerate(embeddings) if embedding is None]
+            missing_texts = [texts[i] for i in missing]
             
-            if not embeddings:
+            logger.info(
+                f"Generating embeddings for {len(missing_texts)} texts "
+                f"({len(texts) - len(missing_texts)} cached)..."
+            )
+            
+            # Token-bounded batches keep request bodies bounded; a semaphore
+            # caps how many are sent concurrently
+            semaphore = asyncio.Semaphore(EMBED_CONCURRENCY)
+            batches = self._pack_batches(missing_texts)
+            
+            async def embed_batch(batch: List[str]) -> List[List[float]]:
+                async with semaphore:
+                    return await self._embed_batch_with_retry(batch)
+            
+            results = await asyncio.gather(
+                *(embed_batch(batch) for batch in batches),
+                return_exceptions=True
+            )
+            for result in results:
+                if isinstance(result, BaseException):
+                    raise result
+            computed = np.asarray(
+                list(itertools.chain.from_iterable(results)), dtype=np.float32
+            )
+            
+            for i, embedding in zip(missing, computed):
+                embeddings[i] = embedding
+            await asyncio.to_thread(
+                self._store_cached, [keys[i] for i in missing], computed
+            )
+            
+            if not embeddings or any(embedding is None for embedding in embeddings):
                 raise ValueError("No embeddings returned from model")
             
             logger.info(f"Successfully generated {len(embeddings)} embeddings")
-            return embeddings
+            return np.vstack(embeddings)
             
         except Exception as e:
             error_msg = f"Error embedding documents: {e}"
             logger.error(error_msg)
             
             # Provide helpful error message for common issues
-            if "Nomic API token" in str(e) or "nomic login" in str(e).lower():
+            if isinstance(e, EmbeddingAuthError):
                 error_msg += (
                     "\nPlease ensure NOMIC_API_KEY is set in your .env file: "
                     "NOMIC_API_KEY=your_api_key_here"
@@ -123,6 +269,177 @@ class EmbeddingService:
             
             raise Exception(error_msg) from e
     
+    def _pack_batches(self, texts: List[str]) -> List[List[str]]:
+        """Group texts into request batches, preserving order.
+        
+        A batch is closed once it holds EMBED_BATCH_SIZE texts or adding the
+        next text would push its estimated token count past
+        EMBED_BATCH_TOKENS.
+        
+        Args:
+            texts: Texts to embed
+            
+        Returns:
+            Consecutive batches covering texts
+        """
+        batches: List[List[str]] = []
+        batch: List[str] = []
+        batch_tokens = 0
+        for text in texts:
+            tokens = len(text) // EMBED_CHARS_PER_TOKEN
+            if tokens > EMBED_MAX_TEXT_TOKENS:
+                logger.warning(
+                    f"Text of ~{tokens} tokens exceeds the model's "
+                    f"{EMBED_MAX_TEXT_TOKENS}-token context and will be truncated"
+                )
+            
+            if batch and (
+                len(batch) >= EMBED_BATCH_SIZE
+                or batch_tokens + tokens > EMBED_BATCH_TOKENS
+            ):
+                batches.append(batch)
+                batch, batch_tokens = [], 0
+            batch.append(text)
+            batch_tokens += tokens
+        
+        if batch:
+            batches.append(batch)
+        return batches
+    
+    def _cache_key(self, kind: str, text: str) -> str:
+        """Cache key for an embedding of text by this model.
+        
+        Args:
+            kind: Embedding task, e.g. "document"; tasks embed differently
+            text: Embedded text
+            
+        Returns:
+            Hex digest identifying the embedding
+        """
+        digest = hashlib.blake2b(digest_size=16)
+        for part in (self.model_name, kind, text):
+            digest.update(part.encode("utf-8"))
+            digest.update(b"\0")
+        return digest.hexdigest()
+    
+    def _load_cached(self, keys: List[str]) -> List[Optional[np.ndarray]]:
+        """Load cached embeddings.
+        
+        Args:
+            keys: Cache keys from _cache_key()
+            
+        Returns:
+            Embedding for each key, or None where it isn't cached
+        """
+        if self.cache_dir is None:
+            return [None] * len(keys)
+        
+        embeddings = []
+        for key in keys:
+            path = self.cache_dir / f"{key}.npy"
+            try:
+                embeddings.append(np.load(path))
+                # Mark as recently used for _prune_cache()
+                os.utime(path)
+            except FileNotFoundError:
+                embeddings.append(None)
+            except Exception as e:
+                logger.warning(f"Ignoring unreadable cached embedding {path}: {e}")
+                embeddings.append(None)
+        return embeddings
+    
+    def _store_cached(self, keys: List[str], embeddings: np.ndarray) -> None:
+        """Write embeddings to the cache.
+        
+        Args:
+            keys: Cache keys from _cache_key()
+            embeddings: Embedding for each key, one per row
+        """
+        if self.cache_dir is None:
+            return
+        
+        added = 0
+        for key, embedding in zip(keys, embeddings):
+            path = self.cache_dir / f"{key}.npy"
+            # Keys are content hashes, so an existing file already holds
+            # this embedding (e.g. written by a concurrent miss)
+            if path.exists():
+                continue
+            try:
+                # Write to a unique temp file, then rename, so readers never
+                # see a partial file and concurrent writers don't collide
+                with tempfile.NamedTemporaryFile(
+                    dir=self.cache_dir, suffix=".tmp", delete=False
+                ) as f:
+                    np.save(f, embedding)
+                os.replace(f.name, path)
+                added += 1
+            except OSError as e:
+                logger.warning(f"Could not cache embedding {path}: {e}")
+        
+        with self._cache_lock:
+            self._cache_entries += added
+            if self._cache_entries > settings.EMBED_CACHE_MAX_ENTRIES:
+                self._prune_cache()
+    
+    def _prune_cache(self) -> None:
+        """Delete the least recently used cached embeddings.
+        
+        Keeps the newest EMBED_CACHE_PRUNE_TO of EMBED_CACHE_MAX_ENTRIES
+        files by mtime.
+        """
+        entries = []
+        for entry in os.scandir(self.cache_dir):
+            if entry.name.endswith(".npy"):
+                try:
+                    entries.append((entry.stat().st_mtime, entry.path))
+                except FileNotFoundError:
+                    continue
+        
+        keep = int(settings.EMBED_CACHE_MAX_ENTRIES * EMBED_CACHE_PRUNE_TO)
+        entries.sort(reverse=True)
+        for _, path in entries[keep:]:
+            try:
+                os.unlink(path)
+            except FileNotFoundError:
+                pass
+        self._cache_entries = min(len(entries), keep)
+        logger.info(f"Pruned {max(0, len(entries) - keep)} cached embeddings")
+    
+    async def _embed_batch_with_retry(self, batch: List[str]) -> List[List[float]]:
+        """Embed one batch, retrying failures with exponential backoff.
+        
+        Args:
+            batch: Texts to embed in a single request
+            
+        Returns:
+            Embedding vectors for the batch
+        """
+        delay = EMBED_RETRY_DELAY_SECONDS
+        for attempt in range(1, EMBED_MAX_ATTEMPTS + 1):
+            try:
+                return await self._request_embeddings(batch, DOCUMENT_TASK)
+            except Exception as e:
+                # Authentication and other client errors won't resolve on
+                # their own; rate limiting (429) will
+                client_error = (
+                    isinstance(e, httpx.HTTPStatusError)
+                    and 400 <= e.response.status_code < 500
+                    and e.response.status_code != 429
+                )
+                if (
+                    attempt == EMBED_MAX_ATTEMPTS
+                    or isinstance(e, EmbeddingAuthError)
+                    or client_error
+                ):
+                    raise
+                logger.warning(
+                    f"Embedding batch of {len(batch)} failed (attempt {attempt}/"
+                    f"{EMBED_MAX_ATTEMPTS}): {e}. Retrying in {delay:.1f}s"
+                )
+                await asyncio.sleep(delay)
+                delay *= 2
+    
     def get_embedding_dimension(self) -> int:
         """Get the dimension of embeddings.
         
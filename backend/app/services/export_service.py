@@ -1,12 +1,68 @@
 """Export service for generating reports in various formats."""
 
+import csv
+import io
 import logging
 import json
-from typing import Dict, Any, Optional
+import math
+import re
+from pathlib import Path
+from typing import Dict, Any, Iterator, List, Optional, Union
 from datetime import datetime
 
+import numpy as np
+import orjson
+
 logger = logging.getLogger(__name__)
 
+ORJSON_OPTIONS = (
+    orjson.OPT_INDENT_2
+    | orjson.OPT_NON_STR_KEYS
+    | orjson.OPT_SERIALIZE_NUMPY
+)
+
+MARKDOWN_HEADER = "# Business Analysis Report\nGenerated: {generated}\n\n"
+
+# Characters that make csv.writer quote a field under the default dialect
+CSV_NEEDS_QUOTING = re.compile(r'[,"\r\n]')
+
+
+def _json_default(obj: Any) -> Any:
+    """Fallback encoder for values JSON has no native type for.
+    
+    Args:
+        obj: Value the encoder could not serialize
+        
+    Returns:
+        A JSON-serializable stand-in for obj
+    """
+    if isinstance(obj, (bytes, bytearray)):
+        return obj.decode("utf-8", errors="replace")
+    # Matches orjson's native datetime and numpy output on the stdlib path
+    if hasattr(obj, "isoformat"):
+        return obj.isoformat()
+    if hasattr(obj, "tolist"):
+        return _finite_or_none(obj.tolist())
+    return str(obj)
+
+
+def _finite_or_none(obj: Any) -> Any:
+    """Replace NaN and infinite floats with None, as orjson writes them.
+    
+    Args:
+        obj: Value about to be JSON-encoded
+        
+    Returns:
+        obj with non-finite floats in nested dicts and lists set to None
+    """
+    if isinstance(obj, float):
+        return obj if math.isfinite(obj) else None
+    if isinstance(obj, dict):
+        return {key: _finite_or_none(value) for key, value in obj.items()}
+    if isinstance(obj, (list, tuple)):
+        return [_finite_or_none(value) for value in obj]
+    return obj
+
 
 class ExportService:
     """Service for exporting analysis results to various formats."""
@@ -29,25 +85,49 @@ class ExportService:
         Returns:
             JSON string
         """
-        return json.dumps(analysis_data, indent=2, default=str)
+        return orjson.dumps(
+            analysis_data, default=_json_default, option=ORJSON_OPTIONS
+        ).decode()
+    
+    def iter_json(self, analysis_data: Dict[str, Any]) -> Iterator[str]:
+        """Export analysis to JSON format piece by piece.
+        
+        Suitable for a StreamingResponse, so large reports are sent without
+        first building the whole document in memory. Parses to the same data
+        as export_to_json() (NaN and infinity become null), though some
+        floats are spelled differently (1e+16 rather than 1e16).
+        
+        Args:
+            analysis_data: Analysis data dictionary
+            
+        Yields:
+            Consecutive fragments of the JSON document
+        """
+        encoder = json.JSONEncoder(
+            indent=2, ensure_ascii=False, allow_nan=False, default=_json_default
+        )
+        yield from encoder.iterencode(_finite_or_none(analysis_data))
     
     def export_to_markdown(
         self,
         analysis_data: Dict[str, Any],
-        filename: Optional[str] = None
+        filename: Optional[str] = None,
+        generated_at: Optional[datetime] = None
     ) -> str:
         """Export analysis to Markdown format.
         
         Args:
             analysis_data: Analysis data dictionary
             filename: Optional filename
+            generated_at: Report timestamp (default: now)
             
         Returns:
             Markdown string
         """
-        md = []
-        md.append("# Business Analysis Report\n")
-        md.append(f"Generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n\n")
+        generated_at = generated_at or datetime.now()
+        md = [MARKDOWN_HEADER.format(
+            generated=generated_at.strftime('%Y-%m-%d %H:%M:%S')
+        )]
         
         # Executive Summary
         if "executive_summary" in analysis_data:
@@ -55,22 +135,21 @@ class ExportService:
             md.append(analysis_data["executive_summary"])
             md.append("\n\n")
         
-        # KPIs
         if "json_output" in analysis_data:
             json_output = analysis_data["json_output"]
             kpis = json_output.get("kpis", {})
             
+            # KPIs
             if kpis.get("revenue"):
-                md.append("## Key Performance Indicators\n\n")
-                md.append("### Revenue\n\n")
-                for revenue in kpis["revenue"][:5]:
-                    if isinstance(revenue, dict):
-                        md.append(f"- **{revenue.get('period', 'Period')}**: {revenue.get('value', 0)}M\n")
+                md.append("## Key Performance Indicators\n\n### Revenue\n\n")
+                md.extend(
+                    f"- **{revenue.get('period', 'Period')}**: {revenue.get('value', 0)}M\n"
+                    for revenue in kpis["revenue"][:5]
+                    if isinstance(revenue, dict)
+                )
                 md.append("\n")
-        
-        # Financial Ratios
-        if "json_output" in analysis_data:
-            json_output = analysis_data["json_output"]
+            
+            # Financial Ratios
             if "financial_ratios" in json_output:
                 md.append("## Financial Ratios\n\n")
                 ratios = json_output["financial_ratios"]
@@ -83,6 +162,24 @@ class ExportService:
         
         return "".join(md)
     
+    def export_all(self, analysis_data: Dict[str, Any]) -> Dict[str, str]:
+        """Export analysis to every supported format.
+        
+        The report is stamped once, so all formats carry the same timestamp.
+        
+        Args:
+            analysis_data: Analysis data dictionary
+            
+        Returns:
+            Mapping of format name ("json", "markdown", "csv") to content
+        """
+        generated_at = datetime.now()
+        return {
+            "json": self.export_to_json(analysis_data),
+            "markdown": self.export_to_markdown(analysis_data, generated_at=generated_at),
+            "csv": self.export_to_csv(analysis_data),
+        }
+    
     def export_to_csv(
         self,
         analysis_data: Dict[str, Any],
@@ -97,27 +194,91 @@ class ExportService:
         Returns:
             CSV string
         """
-        import csv
-        import io
+        return "".join(self.iter_csv(analysis_data))
+    
+    def iter_csv(self, analysis_data: Dict[str, Any]) -> Iterator[str]:
+        """Export KPIs to CSV format row by row.
         
-        output = io.StringIO()
-        writer = csv.writer(output)
+        Suitable for a StreamingResponse, so large reports are sent without
+        first building the whole document in memory.
         
-        # Write KPIs
-        if "json_output" in analysis_data:
-            json_output = analysis_data["json_output"]
-            kpis = json_output.get("kpis", {})
+        Args:
+            analysis_data: Analysis data dictionary
             
-            writer.writerow(["Metric", "Period", "Value", "Unit"])
+        Yields:
+            One CSV-formatted line per row
+        """
+        if "json_output" not in analysis_data:
+            return
+        
+        # KPI fields are almost always plain numbers and labels, so rows are
+        # joined directly; csv.writer (through a small buffer drained after
+        # every line) only handles rows with fields that need quoting
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        
+        def format_row(row: List[Any]) -> str:
+            fields = ["" if value is None else str(value) for value in row]
+            if not any(map(CSV_NEEDS_QUOTING.search, fields)):
+                return ",".join(fields) + "\r\n"
+            writer.writerow(fields)
+            line = buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+            return line
+        
+        # Write KPIs
+        json_output = analysis_data["json_output"]
+        kpis = json_output.get("kpis", {})
+        
+        yield "Metric,Period,Value,Unit\r\n"
+        
+        for revenue in kpis.get("revenue", []):
+            if isinstance(revenue, dict):
+                yield format_row([
+                    "Revenue",
+                    revenue.get("period", ""),
+                    revenue.get("value", ""),
+                    revenue.get("unit", "")
+                ])
+    
+    def export_embeddings_to_npz(
+        self,
+        path: Union[str, Path],
+        vectors: np.ndarray,
+        ids: List[str],
+        dtype: np.dtype = np.float16
+    ) -> Path:
+        """Export embedding vectors to a compressed NumPy archive.
+        
+        Vectors are stored as a binary array rather than JSON number lists,
+        which keeps artifacts an order of magnitude smaller.
+        
+        Args:
+            path: Destination file; ".npz" is appended if missing
+            vectors: Embedding matrix of shape (n, dimension)
+            ids: Identifier for each row of vectors
+            dtype: Storage dtype for the vectors (default: float16)
             
-            for revenue in kpis.get("revenue", []):
-                if isinstance(revenue, dict):
-                    writer.writerow([
-                        "Revenue",
-                        revenue.get("period", ""),
-                        revenue.get("value", ""),
-                        revenue.get("unit", "")
-                    ])
-        
-        return output.getvalue()
-
+        Returns:
+            Path of the written archive
+        """
+        vectors = np.asarray(vectors)
+        if vectors.ndim != 2 or len(ids) != vectors.shape[0]:
+            raise ValueError(
+                f"Expected one id per embedding row, got {len(ids)} ids "
+                f"for vectors of shape {vectors.shape}"
+            )
+        
+        path = Path(path)
+        if path.suffix != ".npz":
+            path = path.with_name(path.name + ".npz")
+        path.parent.mkdir(parents=True, exist_ok=True)
+        
+        np.savez_compressed(
+            path,
+            vectors=vectors.astype(dtype, copy=False),
+            ids=np.asarray(ids, dtype=str)
+        )
+        logger.info(f"Exported {vectors.shape[0]} embeddings to {path}")
+        return path
@@ -1,11 +1,54 @@
 """Financial ratio calculator service for comprehensive financial analysis."""
 
 import logging
-from typing import Dict, List, Optional, Any
+from bisect import bisect_left, bisect_right
+from functools import lru_cache
+from typing import Dict, List, Optional, Any, Tuple
 from datetime import datetime
+import numpy as np
 
 logger = logging.getLogger(__name__)
 
+# Interpretation bands: a value above the i-th threshold (ascending) gets at
+# least the (i + 1)-th label
+MARGIN_BANDS = {
+    "EBITDA": ((5, 10, 20), (
+        "Low - May indicate operational challenges",
+        "Moderate - Acceptable operational margins",
+        "Good - Healthy operational margins",
+        "Excellent - Strong operational efficiency",
+    )),
+    "Net Profit": ((5, 10, 15), (
+        "Low - Thin profit margins",
+        "Moderate - Reasonable profitability",
+        "Good - Strong profitability",
+        "Excellent - Very profitable",
+    )),
+}
+DEFAULT_MARGIN_BANDS = ((20, 30, 40), ("Low", "Moderate", "Good", "Excellent"))
+GROWTH_BANDS = ((0, 5, 10, 20), (
+    "Declining - Negative growth",
+    "Slow - Minimal growth",
+    "Moderate - Steady growth",
+    "Good - Healthy growth",
+    "Excellent - Strong growth trajectory",
+))
+# P/E bands are bounded from above: a ratio below the i-th threshold gets
+# the i-th label
+PE_RATIO_BANDS = ((10, 20, 30), (
+    "Potentially undervalued or high risk",
+    "Reasonable valuation",
+    "Moderately overvalued",
+    "Potentially overvalued",
+))
+
+
+@lru_cache(maxsize=None)
+def _margin_band_arrays(margin_type: str) -> Tuple[np.ndarray, np.ndarray]:
+    """NumPy copies of a margin type's (thresholds, labels) bands."""
+    thresholds, labels = MARGIN_BANDS.get(margin_type, DEFAULT_MARGIN_BANDS)
+    return np.asarray(thresholds, dtype=np.float64), np.asarray(labels, dtype=object)
+
 
 class FinancialRatioCalculator:
     """Service for calculating financial ratios from extracted KPIs."""
@@ -84,6 +127,17 @@ class FinancialRatioCalculator:
         Returns:
             List of numeric values
         """
+        entries = [
+            metric["value"] for metric in metric_list
+            if isinstance(metric, dict) and "value" in metric
+        ]
+        try:
+            # Values are normally numbers already; convert them in one pass
+            return [float(value) for value in entries]
+        except (ValueError, TypeError):
+            pass
+        
+        # Skip the entries that don't convert
         values = []
         for metric in metric_list:
             if isinstance(metric, dict) and "value" in metric:
@@ -114,29 +168,31 @@ class FinancialRatioCalculator:
         """
         ratios = {}
         
+        latest_revenue = revenues[-1] if revenues else None
+        latest_ebitda = ebitda_values[-1] if ebitda_values else None
+        latest_profit = profit_values[-1] if profit_values else None
+        has_revenue = bool(latest_revenue) and latest_revenue > 0
+        
         # EBITDA Margin
-        if ebitda_values and revenues:
-            latest_ebitda = ebitda_values[-1] if ebitda_values else None
-            latest_revenue = revenues[-1] if revenues else None
-            if latest_ebitda and latest_revenue and latest_revenue > 0:
-                ratios["ebitda_margin"] = {
-                    "value": (latest_ebitda / latest_revenue) * 100,
-                    "unit": "percentage",
-                    "description": "EBITDA Margin = EBITDA / Revenue",
-                    "interpretation": self._interpret_margin((latest_ebitda / latest_revenue) * 100, "EBITDA")
-                }
+        if latest_ebitda and has_revenue:
+            ebitda_margin = (latest_ebitda / latest_revenue) * 100
+            ratios["ebitda_margin"] = {
+                "value": ebitda_margin,
+                "unit": "percentage",
+                "description": "EBITDA Margin = EBITDA / Revenue",
+                "interpretation": self._interpret_margin(ebitda_margin, "EBITDA")
+            }
         
         # Net Profit Margin
-        if profit_values and revenues:
-            latest_profit = profit_values[-1] if profit_values else None
-            latest_revenue = revenues[-1] if revenues else None
-            if latest_profit and latest_revenue and latest_revenue > 0:
-                ratios["net_profit_margin"] = {
-                    "value": (latest_profit / latest_revenue) * 100,
-                    "unit": "percentage",
-                    "description": "Net Profit Margin = Net Income / Revenue",
-                    "interpretation": self._interpret_margin((latest_profit / latest_revenue) * 100, "Net Profit")
-                }
+        net_profit_margin = None
+        if latest_profit and has_revenue:
+            net_profit_margin = (latest_profit / latest_revenue) * 100
+            ratios["net_profit_margin"] = {
+                "value": net_profit_margin,
+                "unit": "percentage",
+                "description": "Net Profit Margin = Net Income / Revenue",
+                "interpretation": self._interpret_margin(net_profit_margin, "Net Profit")
+            }
         
         # Gross Margin (if available)
         gross_margins = margins.get("gross_margin", [])
@@ -150,16 +206,13 @@ class FinancialRatioCalculator:
                     "interpretation": self._interpret_margin(latest_gross, "Gross")
                 }
         
-        # Return on Revenue (ROR)
-        if profit_values and revenues:
-            latest_profit = profit_values[-1] if profit_values else None
-            latest_revenue = revenues[-1] if revenues else None
-            if latest_profit and latest_revenue and latest_revenue > 0:
-                ratios["return_on_revenue"] = {
-                    "value": (latest_profit / latest_revenue) * 100,
-                    "unit": "percentage",
-                    "description": "Return on Revenue = Net Income / Revenue"
-                }
+        # Return on Revenue (ROR) is the net profit margin under another name
+        if net_profit_margin is not None:
+            ratios["return_on_revenue"] = {
+                "value": net_profit_margin,
+                "unit": "percentage",
+                "description": "Return on Revenue = Net Income / Revenue"
+            }
         
         return ratios
     
@@ -183,43 +236,19 @@ class FinancialRatioCalculator:
         """
         ratios = {}
         
-        # Revenue Growth Rate (YoY if we have multiple periods)
-        if len(revenues) >= 2:
-            current_revenue = revenues[-1]
-            previous_revenue = revenues[-2]
-            if previous_revenue > 0:
-                revenue_growth = ((current_revenue - previous_revenue) / previous_revenue) * 100
-                ratios["revenue_growth_rate"] = {
-                    "value": revenue_growth,
-                    "unit": "percentage",
-                    "description": "Revenue Growth Rate (YoY)",
-                    "interpretation": self._interpret_growth(revenue_growth)
-                }
-        
-        # EBITDA Growth Rate
-        if len(ebitda_values) >= 2:
-            current_ebitda = ebitda_values[-1]
-            previous_ebitda = ebitda_values[-2]
-            if previous_ebitda > 0:
-                ebitda_growth = ((current_ebitda - previous_ebitda) / previous_ebitda) * 100
-                ratios["ebitda_growth_rate"] = {
-                    "value": ebitda_growth,
+        # Period-over-period growth (YoY if we have multiple periods)
+        for key, values, label in (
+            ("revenue_growth_rate", revenues, "Revenue"),
+            ("ebitda_growth_rate", ebitda_values, "EBITDA"),
+            ("profit_growth_rate", profit_values, "Profit"),
+        ):
+            growth_rate = self._latest_growth_rate(values)
+            if growth_rate is not None:
+                ratios[key] = {
+                    "value": growth_rate,
                     "unit": "percentage",
-                    "description": "EBITDA Growth Rate (YoY)",
-                    "interpretation": self._interpret_growth(ebitda_growth)
-                }
-        
-        # Profit Growth Rate
-        if len(profit_values) >= 2:
-            current_profit = profit_values[-1]
-            previous_profit = profit_values[-2]
-            if previous_profit > 0:
-                profit_growth = ((current_profit - previous_profit) / previous_profit) * 100
-                ratios["profit_growth_rate"] = {
-                    "value": profit_growth,
-                    "unit": "percentage",
-                    "description": "Profit Growth Rate (YoY)",
-                    "interpretation": self._interpret_growth(profit_growth)
+                    "description": f"{label} Growth Rate (YoY)",
+                    "interpretation": self._interpret_growth(growth_rate)
                 }
         
         # CAGR (Compound Annual Growth Rate) if we have 3+ periods
@@ -238,6 +267,24 @@ class FinancialRatioCalculator:
         
         return ratios
     
+    @staticmethod
+    def _latest_growth_rate(values: List[float]) -> Optional[float]:
+        """Growth of the latest value over the one before it.
+        
+        Args:
+            values: Metric values, oldest first
+            
+        Returns:
+            Growth percentage, or None without two periods or a positive base
+        """
+        if len(values) < 2:
+            return None
+        previous, current = values[-2], values[-1]
+        # Written this way round so a NaN base is rejected too
+        if not previous > 0:
+            return None
+        return ((current - previous) / previous) * 100
+    
     def _calculate_efficiency_ratios(
         self,
         revenues: List[float],
@@ -322,33 +369,27 @@ class FinancialRatioCalculator:
         Returns:
             Interpretation string
         """
-        if margin_type == "EBITDA":
-            if margin > 20:
-                return "Excellent - Strong operational efficiency"
-            elif margin > 10:
-                return "Good - Healthy operational margins"
-            elif margin > 5:
-                return "Moderate - Acceptable operational margins"
-            else:
-                return "Low - May indicate operational challenges"
-        elif margin_type == "Net Profit":
-            if margin > 15:
-                return "Excellent - Very profitable"
-            elif margin > 10:
-                return "Good - Strong profitability"
-            elif margin > 5:
-                return "Moderate - Reasonable profitability"
-            else:
-                return "Low - Thin profit margins"
-        else:
-            if margin > 40:
-                return "Excellent"
-            elif margin > 30:
-                return "Good"
-            elif margin > 20:
-                return "Moderate"
-            else:
-                return "Low"
+        thresholds, labels = MARGIN_BANDS.get(margin_type, DEFAULT_MARGIN_BANDS)
+        return labels[bisect_left(thresholds, margin)]
+    
+    def bulk_interpret_margins(self, margins: np.ndarray, margin_type: str) -> np.ndarray:
+        """Interpret many margin values of one type at once.
+        
+        Gives the same labels as _interpret_margin, element-wise.
+        
+        Args:
+            margins: Margin percentages
+            margin_type: Type of margin (EBITDA, Gross, Net Profit)
+            
+        Returns:
+            Array of interpretation strings, same shape as margins
+        """
+        margins = np.asarray(margins, dtype=np.float64)
+        thresholds, labels = _margin_band_arrays(margin_type)
+        # right=True counts thresholds strictly below each value, matching
+        # bisect_left; NaN compares false against every band, so it's "Low"
+        indices = np.digitize(margins, thresholds, right=True)
+        return labels[np.where(np.isnan(margins), 0, indices)]
     
     def _interpret_growth(self, growth_rate: float) -> str:
         """Interpret growth rate.
@@ -359,16 +400,8 @@ class FinancialRatioCalculator:
         Returns:
             Interpretation string
         """
-        if growth_rate > 20:
-            return "Excellent - Strong growth trajectory"
-        elif growth_rate > 10:
-            return "Good - Healthy growth"
-        elif growth_rate > 5:
-            return "Moderate - Steady growth"
-        elif growth_rate > 0:
-            return "Slow - Minimal growth"
-        else:
-            return "Declining - Negative growth"
+        thresholds, labels = GROWTH_BANDS
+        return labels[bisect_left(thresholds, growth_rate)]
     
     def _interpret_pe_ratio(self, pe_ratio: float) -> str:
         """Interpret P/E ratio.
@@ -379,14 +412,8 @@ class FinancialRatioCalculator:
         Returns:
             Interpretation string
         """
-        if pe_ratio < 10:
-            return "Potentially undervalued or high risk"
-        elif pe_ratio < 20:
-            return "Reasonable valuation"
-        elif pe_ratio < 30:
-            return "Moderately overvalued"
-        else:
-            return "Potentially overvalued"
+        thresholds, labels = PE_RATIO_BANDS
+        return labels[bisect_right(thresholds, pe_ratio)]
     
     def calculate_industry_benchmarks(
         self,
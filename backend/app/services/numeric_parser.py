@@ -2,11 +2,18 @@
 
 import logging
 import re
+from functools import lru_cache
 from typing import Optional, Tuple, Dict, List
 from enum import Enum
 
 logger = logging.getLogger(__name__)
 
+# Every number pattern needs at least one digit to produce a value
+DIGIT_PATTERN = re.compile(r'\d')
+
+# Sentence-ish boundaries parse_all_numbers splits text on
+SEGMENT_SPLIT_PATTERN = re.compile(r'[.;]\s+')
+
 
 class Unit(Enum):
     """Numeric unit types."""
@@ -17,6 +24,11 @@ class Unit(Enum):
     BASE = ("", "", 1)
 
 
+# Base-unit multiplier of each unit, resolved once instead of indexing the
+# enum value tuple on every conversion
+UNIT_MULTIPLIERS: Dict[Unit, float] = {unit: unit.value[-1] for unit in Unit}
+
+
 class Currency(Enum):
     """Currency symbols."""
     EURO = ("€", "euro", "EUR")
@@ -25,73 +37,118 @@ class Currency(Enum):
     YEN = ("¥", "yen", "JPY")
 
 
+# Currency named by each single-character symbol
+CURRENCY_BY_SYMBOL: Dict[str, Currency] = {
+    currency.value[0]: currency for currency in Currency
+}
+
+
+def _build_unit_patterns() -> Dict[Unit, re.Pattern]:
+    """Build regex patterns for unit detection."""
+    patterns = {}
+    for unit in Unit:
+        if unit == Unit.BASE:
+            continue
+        # Create pattern for all unit variants
+        variants = "|".join([re.escape(v) for v in unit.value[:-1]])
+        patterns[unit] = re.compile(
+            rf'\b({variants})\b',
+            re.IGNORECASE
+        )
+    return patterns
+
+
+def _build_unit_lookup() -> Dict[str, Unit]:
+    """Map each upper-cased unit variant to its unit."""
+    lookup = {}
+    for unit in Unit:
+        if unit == Unit.BASE:
+            continue
+        for variant in unit.value[:-1]:
+            lookup.setdefault(variant.upper(), unit)
+    return lookup
+
+
+def _build_currency_patterns() -> Dict[Currency, re.Pattern]:
+    """Build regex patterns for currency detection."""
+    patterns = {}
+    for currency in Currency:
+        variants = "|".join([re.escape(v) for v in currency.value])
+        patterns[currency] = re.compile(
+            rf'({variants})',
+            re.IGNORECASE
+        )
+    return patterns
+
+
+def _build_number_patterns() -> List[re.Pattern]:
+    """Build regex patterns for number extraction."""
+    patterns = [
+        # Pattern 1: Currency symbol + number + unit (e.g., €2.5B, $100M)
+        re.compile(
+            r'[€$£¥]\s*([\d.,]+)\s*([BMK]?)\b',
+            re.IGNORECASE
+        ),
+        # Pattern 2: Number + unit + currency (e.g., 2.5 billion €)
+        # Patterns 2 and 5 only start at the beginning of a digit run: whether
+        # they match depends only on what follows the run, so retrying from
+        # inside it can't succeed and is quadratic on long runs
+        re.compile(
+            r'(?<![\d.,])([\d.,]+)\s*([BMK]|billion|million|thousand)\s*([€$£¥]?)\b',
+            re.IGNORECASE
+        ),
+        # Pattern 3: Number with parentheses for negatives (e.g., (2.5) = -2.5)
+        re.compile(
+            r'\(([\d.,]+)\)',
+            re.IGNORECASE
+        ),
+        # Pattern 4: Number with commas and decimals (e.g., 1,234.56)
+        re.compile(
+            r'([\d,]+\.?\d*)',
+            re.IGNORECASE
+        ),
+        # Pattern 5: Number with footnotes (e.g., 2.5B¹, 100M*)
+        re.compile(
+            r'(?<![\d.,])([\d.,]+)\s*([BMK]?)\s*[¹²³*†‡]',
+            re.IGNORECASE
+        ),
+    ]
+    return patterns
+
+
+# Characters each number pattern cannot match without (None: no cheap
+# requirement). Checking them is a plain membership scan, so patterns that
+# can't apply are skipped without running the regex engine
+NUMBER_PATTERN_REQUIREMENTS: List[Optional[frozenset]] = [
+    frozenset("€$£¥"),  # Pattern 1 starts with a currency symbol
+    None,
+    frozenset("("),  # Pattern 3 needs an opening parenthesis
+    None,
+    None,
+]
+
+
+@lru_cache(maxsize=128)
+def _number_template(unit: Unit, currency: Optional[Currency], decimals: int) -> str:
+    """Format template for numbers displayed with a unit, currency and precision."""
+    currency_str = currency.value[0] if currency else ""
+    unit_str = unit.value[0] if unit != Unit.BASE else ""
+    return f"{currency_str}{{:,.{decimals}f}}{unit_str}"
+
+
 class NumericParser:
     """Service for parsing and normalizing numeric values from text."""
     
+    # Patterns are compiled once at import and shared by every instance
+    UNIT_PATTERNS = _build_unit_patterns()
+    UNIT_LOOKUP = _build_unit_lookup()
+    CURRENCY_PATTERNS = _build_currency_patterns()
+    NUMBER_PATTERNS = _build_number_patterns()
+    
     def __init__(self):
         """Initialize numeric parser."""
-        # Build regex patterns
-        self.unit_patterns = self._build_unit_patterns()
-        self.currency_patterns = self._build_currency_patterns()
-        self.number_patterns = self._build_number_patterns()
         logger.info("Numeric parser initialized")
     
-    def _build_unit_patterns(self) -> Dict[Unit, re.Pattern]:
-        """Build regex patterns for unit detection."""
-        patterns = {}
-        for unit in Unit:
-            if unit == Unit.BASE:
-                continue
-            # Create pattern for all unit variants
-            variants = "|".join([re.escape(v) for v in unit.value[:-1]])
-            patterns[unit] = re.compile(
-                rf'\b({variants})\b',
-                re.IGNORECASE
-            )
-        return patterns
-    
-    def _build_currency_patterns(self) -> Dict[Currency, re.Pattern]:
-        """Build regex patterns for currency detection."""
-        patterns = {}
-        for currency in Currency:
-            variants = "|".join([re.escape(v) for v in currency.value])
-            patterns[currency] = re.compile(
-                rf'({variants})',
-                re.IGNORECASE
-            )
-        return patterns
-    
-    def _build_number_patterns(self) -> List[re.Pattern]:
-        """Build regex patterns for number extraction."""
-        patterns = [
-            # Pattern 1: Currency symbol + number + unit (e.g., €2.5B, $100M)
-            re.compile(
-                r'[€$£¥]\s*([\d.,]+)\s*([BMK]?)\b',
-                re.IGNORECASE
-            ),
-            # Pattern 2: Number + unit + currency (e.g., 2.5 billion €)
-            re.compile(
-                r'([\d.,]+)\s*([BMK]|billion|million|thousand)\s*([€$£¥]?)\b',
-                re.IGNORECASE
-            ),
-            # Pattern 3: Number with parentheses for negatives (e.g., (2.5) = -2.5)
-            re.compile(
-                r'\(([\d.,]+)\)',
-                re.IGNORECASE
-            ),
-            # Pattern 4: Number with commas and decimals (e.g., 1,234.56)
-            re.compile(
-                r'([\d,]+\.?\d*)',
-                re.IGNORECASE
-            ),
-            # Pattern 5: Number with footnotes (e.g., 2.5B¹, 100M*)
-            re.compile(
-                r'([\d.,]+)\s*([BMK]?)\s*[¹²³*†‡]',
-                re.IGNORECASE
-            ),
-        ]
-        return patterns
-    
     def parse_number(
         self,
         text: str,
@@ -114,8 +171,13 @@ class NumericParser:
         
         text = text.strip()
         
-        # Try each pattern
-        for pattern in self.number_patterns:
+        # Try each pattern; patterns are in priority order, so the first
+        # pattern that matches anywhere wins. Text without digits can't
+        # yield a number, so skip the scans entirely
+        number_patterns = self.NUMBER_PATTERNS if DIGIT_PATTERN.search(text) else ()
+        for pattern, required in zip(number_patterns, NUMBER_PATTERN_REQUIREMENTS):
+            if required is not None and required.isdisjoint(text):
+                continue
             match = pattern.search(text)
             if match:
                 try:
@@ -145,7 +207,13 @@ class NumericParser:
                     normalized = self._normalize_to_unit(number, unit, target_unit)
                     
                     # Extract currency if present
-                    currency = self._extract_currency(text)
+                    # A symbol inside the match already names a currency
+                    matched_symbol = next(
+                        (c for c in match.group(0) if c in CURRENCY_BY_SYMBOL), None
+                    )
+                    currency = self._extract_currency(
+                        text, CURRENCY_BY_SYMBOL.get(matched_symbol)
+                    )
                     
                     metadata = {
                         'original_text': text,
@@ -188,11 +256,12 @@ class NumericParser:
         """
         results = []
         
-        # Split text into potential number-containing segments
-        # Look for patterns that might contain numbers
-        segments = re.split(r'[.;]\s+', text)
-        
-        for segment in segments:
+        # Split text into potential number-containing segments; segments
+        # without a digit can't hold a number, so they aren't parsed (or
+        # logged as ambiguous)
+        for segment in SEGMENT_SPLIT_PATTERN.split(text):
+            if not DIGIT_PATTERN.search(segment):
+                continue
             parsed = self.parse_number(segment, target_unit, return_metadata=True)
             if parsed and parsed[0] is not None:
                 results.append(parsed)
@@ -211,15 +280,7 @@ class NumericParser:
         if not unit_str:
             return Unit.BASE
         
-        unit_str = unit_str.upper().strip()
-        
-        for unit in Unit:
-            if unit == Unit.BASE:
-                continue
-            if unit_str in [v.upper() for v in unit.value[:-1]]:
-                return unit
-        
-        return Unit.BASE
+        return self.UNIT_LOOKUP.get(unit_str.upper().strip(), Unit.BASE)
     
     def _normalize_to_unit(
         self,
@@ -238,25 +299,26 @@ class NumericParser:
             Normalized value
         """
         # Convert to base units first
-        source_multiplier = source_unit.value[-1]
-        target_multiplier = target_unit.value[-1]
-        
-        base_value = value * source_multiplier
-        normalized = base_value / target_multiplier
-        
-        return normalized
+        return value * UNIT_MULTIPLIERS[source_unit] / UNIT_MULTIPLIERS[target_unit]
     
-    def _extract_currency(self, text: str) -> Optional[Currency]:
+    def _extract_currency(
+        self,
+        text: str,
+        known: Optional[Currency] = None
+    ) -> Optional[Currency]:
         """Extract currency from text.
         
         Args:
             text: Input text
+            known: Currency already known to occur in text, if any
             
         Returns:
             Currency enum or None
         """
-        for currency, pattern in self.currency_patterns.items():
-            if pattern.search(text):
+        for currency, pattern in self.CURRENCY_PATTERNS.items():
+            # Currencies are checked in order, so a known currency only needs
+            # the ones before it scanned
+            if currency is known or pattern.search(text):
                 return currency
         return None
     
@@ -294,17 +356,7 @@ class NumericParser:
         Returns:
             Formatted string
         """
-        currency_str = currency.value[0] if currency else ""
-        unit_str = unit.value[0] if unit != Unit.BASE else ""
-        
-        formatted = f"{value:,.{decimals}f}"
-        if unit_str:
-            formatted += unit_str
-        
-        if currency_str:
-            formatted = f"{currency_str}{formatted}"
-        
-        return formatted
+        return _number_template(unit, currency, decimals).format(value)
 
 
 
@@ -1 +1,144 @@
+"""Reranking service using a local cross-encoder model."""
 
+import asyncio
+import logging
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+# ONNX Runtime and tokenizers are optional; without them the reranker can't
+# be created and retrieval falls back to FAISS ordering
+try:
+    import onnxruntime as ort
+    from tokenizers import Tokenizer
+except ImportError:
+    ort = None
+    Tokenizer = None
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Files expected in RERANKER_MODEL_DIR, e.g. an int8-quantized ONNX export of
+# cross-encoder/ms-marco-MiniLM-L-6-v2 and its Hugging Face tokenizer
+RERANKER_MODEL_FILE = "model.onnx"
+RERANKER_TOKENIZER_FILE = "tokenizer.json"
+
+# Pairs per forward pass; each batch is padded only to its own longest pair
+RERANK_BATCH_SIZE = 32
+
+
+class RerankerService:
+    """Service for reranking retrieved chunks with a cross-encoder."""
+    
+    def __init__(
+        self,
+        model_dir: Optional[str] = None,
+        max_length: Optional[int] = None
+    ):
+        """Initialize reranker service.
+        
+        Args:
+            model_dir: Directory holding model.onnx and tokenizer.json
+                (default: from settings)
+            max_length: Maximum tokens per (query, chunk) pair (default: from settings)
+        
+        Raises:
+            ValueError: If the runtime dependencies or model files are missing
+        """
+        if ort is None or Tokenizer is None:
+            raise ValueError("onnxruntime and tokenizers are required for reranking")
+        
+        model_dir = Path(model_dir or settings.RERANKER_MODEL_DIR)
+        model_path = model_dir / RERANKER_MODEL_FILE
+        tokenizer_path = model_dir / RERANKER_TOKENIZER_FILE
+        if not model_path.exists() or not tokenizer_path.exists():
+            raise ValueError(
+                f"Reranker model not found: expected {RERANKER_MODEL_FILE} and "
+                f"{RERANKER_TOKENIZER_FILE} in {model_dir}"
+            )
+        
+        self.tokenizer = Tokenizer.from_file(str(tokenizer_path))
+        self.tokenizer.enable_truncation(max_length=max_length or settings.RERANKER_MAX_LENGTH)
+        self.tokenizer.enable_padding()
+        
+        options = ort.SessionOptions()
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        self.session = ort.InferenceSession(
+            str(model_path), options, providers=["CPUExecutionProvider"]
+        )
+        # BERT-style exports take token_type_ids, others don't
+        self.input_names = {model_input.name for model_input in self.session.get_inputs()}
+        
+        logger.info(f"Reranker initialized with cross-encoder from {model_dir}")
+    
+    def _score(self, query: str, chunks: List[str]) -> np.ndarray:
+        """Score every (query, chunk) pair, RERANK_BATCH_SIZE pairs per model run.
+        
+        Args:
+            query: User query
+            chunks: Candidate chunk texts
+        
+        Returns:
+            Relevance score in [0, 1] for each chunk
+        """
+        return np.concatenate([
+            self._score_batch(query, chunks[start:start + RERANK_BATCH_SIZE])
+            for start in range(0, len(chunks), RERANK_BATCH_SIZE)
+        ])
+    
+    def _score_batch(self, query: str, chunks: List[str]) -> np.ndarray:
+        """Score (query, chunk) pairs in a single forward pass.
+        
+        Args:
+            query: User query
+            chunks: Candidate chunk texts
+        
+        Returns:
+            Relevance score in [0, 1] for each chunk
+        """
+        encodings = self.tokenizer.encode_batch([(query, chunk) for chunk in chunks])
+        inputs = {
+            "input_ids": np.array([e.ids for e in encodings], dtype=np.int64),
+            "attention_mask": np.array([e.attention_mask for e in encodings], dtype=np.int64),
+            "token_type_ids": np.array([e.type_ids for e in encodings], dtype=np.int64),
+        }
+        logits = self.session.run(
+            None, {name: value for name, value in inputs.items() if name in self.input_names}
+        )[0]
+        
+        # One relevance logit per pair; sigmoid maps it onto [0, 1]
+        return 1.0 / (1.0 + np.exp(-logits.reshape(len(chunks), -1)[:, 0]))
+    
+    async def rerank(
+        self,
+        query: str,
+        results: List[Tuple[str, float, Dict[str, Any]]],
+        top_k: Optional[int] = None
+    ) -> List[Tuple[str, float, Dict[str, Any]]]:
+        """Reorder retrieved chunks by cross-encoder relevance.
+        
+        Args:
+            query: User query
+            results: List of tuples (chunk_text, similarity_score, metadata)
+            top_k: Number of results to keep (default: all)
+        
+        Returns:
+            List of tuples (chunk_text, rerank_score, metadata), best first
+        """
+        if not results:
+            return []
+        
+        # Inference is CPU-bound; keep it off the event loop
+        scores = await asyncio.to_thread(
+            self._score, query, [chunk for chunk, _, _ in results]
+        )
+        order = np.argsort(-scores, kind="stable")
+        if top_k:
+            order = order[:top_k]
+        
+        return [
+            (results[i][0], float(scores[i]), results[i][2])
+            for i in order.tolist()
+        ]
@@ -1,12 +1,168 @@
 """Retrieval service for RAG pipeline."""
 
 import logging
-from typing import List, Tuple, Optional
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, List, Tuple, Optional
+import numpy as np
+from app.core.config import settings
 from app.services.vector_store import VectorStoreService
 from app.services.reranker import RerankerService
 
 logger = logging.getLogger(__name__)
 
+# Semantic query cache: a query reuses the results of a cached query whose
+# embedding has at least QUERY_CACHE_MIN_SIMILARITY cosine similarity
+QUERY_CACHE_SIZE = 1024
+QUERY_CACHE_MIN_SIMILARITY = 0.95
+QUERY_CACHE_TTL_SECONDS = 300.0
+
+
+def preview_text(text: str, max_len: int = 200) -> str:
+    """Truncate text for display, appending "..." when it was cut."""
+    return text if len(text) <= max_len else f"{text[:max_len]}..."
+
+
+def _page_citation(metadata: Optional[Dict[str, Any]]) -> str:
+    """Return the " - Page N" context suffix for a chunk's metadata.
+    
+    Args:
+        metadata: Chunk metadata
+        
+    Returns:
+        The suffix, or "" when the metadata has no usable page number
+    """
+    if not metadata:
+        return ""
+    
+    # The chunker stores "page" and "page_number"; "pageNumber" is accepted
+    # for metadata from other loaders
+    page_num = metadata.get('page') or metadata.get('page_number') or metadata.get('pageNumber')
+    if page_num is None:
+        return ""
+    try:
+        page_num = int(page_num)
+    except (ValueError, TypeError):
+        return ""
+    return f" - Page {page_num}" if page_num else ""
+
+
+class SemanticQueryCache:
+    """Retrieval results keyed by query embedding similarity.
+    
+    Rephrasings of a recent query embed close to it, so their results can be
+    reused without searching or reranking again. Embeddings live in a
+    preallocated matrix, making a lookup one matrix-vector product.
+    """
+    
+    def __init__(
+        self,
+        dimension: int,
+        max_entries: int = QUERY_CACHE_SIZE,
+        min_similarity: float = QUERY_CACHE_MIN_SIMILARITY,
+        ttl_seconds: float = QUERY_CACHE_TTL_SECONDS
+    ):
+        """Initialize the cache.
+        
+        Args:
+            dimension: Embedding dimension
+            max_entries: Maximum cached queries; the least recently used is evicted
+            min_similarity: Cosine similarity a query needs to reuse an entry
+            ttl_seconds: How long an entry is served after being stored
+        """
+        self.min_similarity = min_similarity
+        self.ttl_seconds = ttl_seconds
+        
+        # Row i holds the normalized embedding of the entry in slot i; free
+        # rows are zero, so they never reach min_similarity
+        self._vectors = np.zeros((max_entries, dimension), dtype=np.float32)
+        self._free_slots = list(range(max_entries - 1, -1, -1))
+        
+        # slot -> (stored_at, key, results), least recently used first
+        self._entries: "OrderedDict[int, Tuple[float, Hashable, List]]" = OrderedDict()
+        
+        # Vector store generation the entries were computed against
+        self._generation: Optional[int] = None
+    
+    @staticmethod
+    def _normalize(embedding: List[float]) -> np.ndarray:
+        """Return embedding as a unit-length float32 vector."""
+        vector = np.asarray(embedding, dtype=np.float32)
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
+    
+    def _sync_generation(self, generation: int) -> None:
+        """Drop every entry if the vector store changed since they were stored."""
+        if generation != self._generation:
+            self.clear()
+            self._generation = generation
+    
+    def _remove(self, slot: int) -> None:
+        """Free the slot of an entry."""
+        del self._entries[slot]
+        self._vectors[slot] = 0
+        self._free_slots.append(slot)
+    
+    def get(
+        self,
+        embedding: List[float],
+        key: Hashable,
+        generation: int
+    ) -> Optional[List]:
+        """Return results cached for a query similar to embedding.
+        
+        Args:
+            embedding: Query embedding
+            key: Retrieval parameters the results must have been computed with
+            generation: Current vector store generation
+            
+        Returns:
+            Cached results, or None on a miss
+        """
+        self._sync_generation(generation)
+        if not self._entries:
+            return None
+        
+        scores = self._vectors @ self._normalize(embedding)
+        candidates = np.flatnonzero(scores >= self.min_similarity)
+        now = time.monotonic()
+        for slot in candidates[np.argsort(-scores[candidates])].tolist():
+            stored_at, entry_key, results = self._entries[slot]
+            if now - stored_at >= self.ttl_seconds:
+                self._remove(slot)
+            elif entry_key == key:
+                self._entries.move_to_end(slot)
+                return list(results)
+        return None
+    
+    def put(
+        self,
+        embedding: List[float],
+        key: Hashable,
+        generation: int,
+        results: List
+    ) -> None:
+        """Cache the results retrieved for a query.
+        
+        Args:
+            embedding: Query embedding
+            key: Retrieval parameters the results were computed with
+            generation: Vector store generation the results came from
+            results: Retrieved results
+        """
+        self._sync_generation(generation)
+        if not self._free_slots:
+            self._remove(next(iter(self._entries)))
+        
+        slot = self._free_slots.pop()
+        self._vectors[slot] = self._normalize(embedding)
+        self._entries[slot] = (time.monotonic(), key, list(results))
+    
+    def clear(self) -> None:
+        """Drop all entries."""
+        for slot in list(self._entries):
+            self._remove(slot)
+
 
 class RetrievalService:
     """Service for retrieving relevant documents from vector store."""
@@ -41,6 +197,8 @@ class RetrievalService:
         else:
             self.reranker = None
             self.use_reranker = False
+        
+        self.query_cache = SemanticQueryCache(self.vector_store.embedding_dim)
             
         logger.info(f"Retrieval service initialized (reranker: {'enabled' if self.use_reranker else 'disabled'})")
     
@@ -49,7 +207,8 @@ class RetrievalService:
         query: str,
         top_k: Optional[int] = None,
         threshold: Optional[float] = None,
-        rerank_top_k: Optional[int] = None
+        rerank_top_k: Optional[int] = None,
+        fallback_threshold: Optional[float] = None
     ) -> List[Tuple[str, float, dict]]:
         """Retrieve relevant chunks for a query.
         
@@ -58,6 +217,8 @@ class RetrievalService:
             top_k: Number of results to retrieve from FAISS (before reranking)
             threshold: Minimum similarity threshold
             rerank_top_k: Number of results to return after reranking (default: same as top_k)
+            fallback_threshold: If set and no FAISS result clears threshold,
+                rerank up to twice as many results scoring at least this instead
             
         Returns:
             List of tuples (chunk_text, rerank_score, metadata)
@@ -65,18 +226,54 @@ class RetrievalService:
         try:
             logger.info(f"Retrieving documents for query: {query[:50]}...")
             
-            # Retrieve initial results from FAISS
-            # Reduced multiplier to avoid token limits during reranking
+            # Retrieve initial results from FAISS; the reranker then picks
+            # the best top_k from twice as many candidates
             if self.use_reranker and top_k is not None:
-                initial_top_k = min(top_k * 2, 30)  # Cap at 30 to avoid token limits
+                initial_top_k = top_k * 2
             else:
                 initial_top_k = top_k
+            
+            # Near-identical recent queries are answered from the cache,
+            # skipping both the FAISS search and the reranker
+            try:
+                query_embedding = await self.vector_store.embedding_service.embed_text(query)
+            except Exception as e:
+                logger.error(f"Error embedding query: {e}")
+                return []
+            
+            cache_key = (top_k, threshold, rerank_top_k, fallback_threshold, self.use_reranker)
+            generation = self.vector_store.generation
+            cached = self.query_cache.get(query_embedding, cache_key, generation)
+            if cached is not None:
+                logger.info(f"Serving {len(cached)} cached results (query: '{query[:50]}...')")
+                return cached
                 
-            results = await self.vector_store.search(
-                query=query,
-                top_k=initial_top_k,
-                threshold=threshold
-            )
+            if fallback_threshold is None:
+                results = await self.vector_store.search(
+                    query=query,
+                    top_k=initial_top_k,
+                    threshold=threshold,
+                    query_embedding=query_embedding
+                )
+            else:
+                # One search at the lower threshold serves both passes; the
+                # similarity threshold applies to FAISS scores, so it is
+                # checked here, before the reranker replaces them
+                if threshold is None:
+                    threshold = settings.SIMILARITY_THRESHOLD
+                candidates = await self.vector_store.search(
+                    query=query,
+                    top_k=initial_top_k * 2 if initial_top_k else initial_top_k,
+                    threshold=fallback_threshold,
+                    query_embedding=query_embedding
+                )
+                results = [r for r in candidates if r[1] >= threshold][:initial_top_k]
+                if not results and candidates:
+                    logger.info(
+                        f"No results with threshold {threshold}, "
+                        f"using candidates above {fallback_threshold}"
+                    )
+                    results = candidates
             logger.info(f"Retrieved {len(results)} relevant chunks from FAISS (query: '{query[:50]}...')")
             
             # CRITICAL: If vector store has results but retrieval returns empty, log it
@@ -106,6 +303,8 @@ class RetrievalService:
                     logger.warning(f"Reranker failed: {e}. Using original FAISS results.")
                     # Continue with original results if reranking fails
             
+            if results:
+                self.query_cache.put(query_embedding, cache_key, generation, results)
             return results
         except Exception as e:
             logger.error(f"Error in retrieval: {e}")
@@ -120,42 +319,52 @@ class RetrievalService:
         Returns:
             Formatted context string
         """
+        context, _ = self.format_context_and_sources(results)
+        return context
+    
+    def format_context_and_sources(
+        self,
+        results: List[Tuple[str, float, dict]],
+        preview_len: int = 200
+    ) -> Tuple[str, List[Dict[str, Any]]]:
+        """Build the context string and the response sources in one pass.
+        
+        Args:
+            results: List of retrieved chunks with scores
+            preview_len: Maximum characters of each chunk shown in sources
+            
+        Returns:
+            Tuple of (formatted context string, list of source dicts)
+        """
         if not results:
             logger.error("format_context called with empty results list!")
-            return "No relevant context found."
+            return "No relevant context found.", []
         
         logger.info(f"Formatting context from {len(results)} results")
         
         context_parts = []
+        sources = []
         for i, (chunk, score, metadata) in enumerate(results, 1):
+            sources.append({
+                "chunk": preview_text(chunk, preview_len),
+                "similarity": score,
+                "metadata": metadata
+            })
+            
             # Validate chunk
-            if not chunk or len(chunk.strip()) == 0:
+            if not chunk or not chunk.strip():
                 logger.warning(f"Skipping empty chunk at index {i}")
                 continue
             
-            # Extract page number from metadata
-            page_num = None
-            if metadata:
-                page_num = metadata.get('page') or metadata.get('page_number') or metadata.get('pageNumber')
-                if page_num is not None:
-                    try:
-                        page_num = int(page_num)
-                    except (ValueError, TypeError):
-                        page_num = None
-            
-            page_citation = f" - Page {page_num}" if page_num else ""
-            context_parts.append(f"[Context {i}{page_citation} (relevance: {score:.3f})]\n{chunk}\n")
+            context_parts.append(
+                f"[Context {i}{_page_citation(metadata)} (relevance: {score:.3f})]\n{chunk}\n"
+            )
         
         formatted = "\n".join(context_parts)
         logger.info(f"Formatted context: {len(formatted)} chars from {len(context_parts)} chunks")
         
         if len(formatted.strip()) == 0:
             logger.error("Formatted context is empty after processing results!")
-            return "No relevant context found."
+            return "No relevant context found.", sources
         
-        return formatted
-
-
-
-
-
+        return formatted, sources
@@ -7,6 +7,34 @@ from collections import defaultdict
 
 logger = logging.getLogger(__name__)
 
+# Column separators that indicate a table row, in priority order
+SEPARATOR_PATTERNS = [
+    re.compile(r'\s*\|\s*'),  # Pipe separators
+    re.compile(r'\s{3,}'),     # Multiple spaces
+    re.compile(r'\t+'),        # Tabs
+]
+
+# Any run that could satisfy the multiple-spaces separator; matched against
+# the whole chunk, so it can also hit across line breaks (a false positive
+# only means the per-line scan runs)
+WHITESPACE_RUN_PATTERN = re.compile(r'\s{3}')
+
+# Cell value cleanup for _parse_table_value: drops thousands separators,
+# closing parentheses and currency symbols, and turns an opening
+# parenthesis into a minus sign, in a single pass
+CELL_CLEANUP_TABLE = str.maketrans({
+    ',': None,
+    '(': '-',
+    ')': None,
+    '€': None,
+    '$': None,
+    '£': None,
+    '¥': None,
+})
+BILLION_PATTERN = re.compile(r'[Bb]illion?', re.IGNORECASE)
+MILLION_PATTERN = re.compile(r'[Mm]illion?', re.IGNORECASE)
+THOUSAND_PATTERN = re.compile(r'[Kk]|thousand', re.IGNORECASE)
+
 
 class TableExtractor:
     """Service for extracting and parsing tables from document content."""
@@ -52,6 +80,11 @@ class TableExtractor:
         Returns:
             Table dictionary or None
         """
+        # Most chunks are prose with none of the separators; rule them out
+        # with one scan of the whole text instead of three regexes per line
+        if '|' not in text and '\t' not in text and not WHITESPACE_RUN_PATTERN.search(text):
+            return None
+        
         # Look for patterns that indicate tables
         # Pattern 1: Multiple lines with consistent separators (|, tabs, multiple spaces)
         lines = text.split('\n')
@@ -60,13 +93,6 @@ class TableExtractor:
         if len(lines) < 3:
             return None
         
-        # Look for separator patterns
-        separator_patterns = [
-            r'\s*\|\s*',  # Pipe separators
-            r'\s{3,}',     # Multiple spaces
-            r'\t+',        # Tabs
-        ]
-        
         table_rows = []
         header_found = False
         
@@ -76,10 +102,10 @@ class TableExtractor:
                 continue
             
             # Check if line contains table-like structure
-            for pattern in separator_patterns:
-                if re.search(pattern, line):
+            for pattern in SEPARATOR_PATTERNS:
+                if pattern.search(line):
                     # Split by pattern
-                    cells = re.split(pattern, line)
+                    cells = pattern.split(line)
                     cells = [c.strip() for c in cells if c.strip()]
                     
                     if len(cells) >= 2:  # At least 2 columns
@@ -199,25 +225,29 @@ class TableExtractor:
         if not value_str:
             return None
         
-        # Remove common formatting
-        value_str = value_str.strip()
-        value_str = value_str.replace(',', '')
-        value_str = value_str.replace('(', '-').replace(')', '')  # Negative in parentheses
+        # Remove common formatting and currency symbols; negative in parentheses
+        value_str = value_str.strip().translate(CELL_CLEANUP_TABLE)
         
-        # Remove currency symbols
-        value_str = re.sub(r'[€$£¥]', '', value_str)
+        # Most cells are plain numbers by now. float() rejects any unit
+        # letter or '%', so a successful parse needs no further handling
+        try:
+            return float(value_str) / 1e6  # Convert to millions for consistency
+        except ValueError:
+            pass
         
-        # Check for units (B, M, K)
+        # Check for units (B, M, K); "billion" and "million" contain their
+        # unit letter, so the upper-cased scan covers the word forms too
         multiplier = 1.0
-        if 'B' in value_str.upper() or 'billion' in value_str.lower():
+        value_upper = value_str.upper()
+        if 'B' in value_upper:
             multiplier = 1e9
-            value_str = re.sub(r'[Bb]illion?', '', value_str, flags=re.IGNORECASE)
-        elif 'M' in value_str.upper() or 'million' in value_str.lower():
+            value_str = BILLION_PATTERN.sub('', value_str)
+        elif 'M' in value_upper:
             multiplier = 1e6
-            value_str = re.sub(r'[Mm]illion?', '', value_str, flags=re.IGNORECASE)
-        elif 'K' in value_str.upper() or 'thousand' in value_str.lower():
+            value_str = MILLION_PATTERN.sub('', value_str)
+        elif 'K' in value_upper or 'thousand' in value_str.lower():
             multiplier = 1e3
-            value_str = re.sub(r'[Kk]|thousand', '', value_str, flags=re.IGNORECASE)
+            value_str = THOUSAND_PATTERN.sub('', value_str)
         
         # Remove percentage sign
         is_percentage = '%' in value_str
@@ -1,18 +1,83 @@
 """Vector store service using FAISS for similarity search."""
 
+import asyncio
 import logging
+import math
 import os
+import shutil
+import time
 from pathlib import Path
 from typing import List, Tuple, Optional, Dict, Any
 import numpy as np
 import faiss
+from sqlalchemy import delete, insert, select
 
 from app.services.embedder import EmbeddingService
-from app.core.config import settings
+from app.core.config import settings, get_worker_cpu_count
 from app.models.database import ChunkMetadata, get_db
 
 logger = logging.getLogger(__name__)
 
+# How long get_stats() results are reused before being recomputed
+STATS_CACHE_TTL_SECONDS = 1.0
+
+# Concurrent searches arriving within the window share one index.search()
+SEARCH_BATCH_WINDOW_SECONDS = 0.005
+SEARCH_BATCH_MAX_SIZE = 32
+
+# Index writes are coalesced: a save runs this long after the first
+# unsaved change, covering every batch added in between
+INDEX_SAVE_DELAY_SECONDS = 5.0
+
+# Added vectors are appended to a write-ahead log next to the index; the full
+# index is only rewritten (and the log emptied) once the log holds this many
+# vectors, when the index type changes, and at shutdown
+INDEX_WAL_MAX_VECTORS = 10_000
+
+# The log starts with the FAISS id of its first vector (int64), so vectors
+# already in the index file are skipped if a crash interrupts trimming
+WAL_HEADER_BYTES = 8
+
+# Bits per product-quantizer code; 8 gives 256 centroids per sub-vector
+PQ_BITS = 8
+
+# FAISS k-means wants at least this many training points per centroid
+IVF_TRAINING_POINTS_PER_LIST = 39
+
+
+# Index file header: fourcc, d (int32), ntotal (int64), two reserved int64s,
+# is_trained (1 byte), then metric_type (int32) at this offset
+INDEX_HEADER_METRIC_OFFSET = 33
+
+# Class names for the fourcc codes this service writes
+INDEX_TYPE_BY_FOURCC = {
+    b"IxF2": "IndexFlatL2",
+    b"IxFI": "IndexFlatIP",
+    b"IwPQ": "IndexIVFPQ",
+    b"IwSq": "IndexIVFScalarQuantizer",
+}
+
+
+def peek_index_type(index_path: Path) -> Optional[Tuple[str, int]]:
+    """Return the type and metric of a FAISS index on disk without loading it.
+    
+    Only the fixed-size header at the start of the file is read.
+    
+    Args:
+        index_path: Path to the FAISS index file
+        
+    Returns:
+        Tuple of (index class name, e.g. "IndexFlatL2", or the raw fourcc
+        for other types; faiss metric type), or None if no index exists
+    """
+    if not index_path.exists():
+        return None
+    with open(index_path, "rb") as f:
+        header = f.read(INDEX_HEADER_METRIC_OFFSET + 4)
+    fourcc = header[:4]
+    metric = int(np.frombuffer(header[INDEX_HEADER_METRIC_OFFSET:], dtype=np.int32)[0])
+    return INDEX_TYPE_BY_FOURCC.get(fourcc, fourcc.decode("ascii", "replace")), metric
+
 
 class VectorStoreService:
     """Service for managing vector store using FAISS."""
@@ -27,24 +92,72 @@ class VectorStoreService:
         self.store_path.mkdir(parents=True, exist_ok=True)
         
         self.index_path = self.store_path / settings.VECTOR_STORE_INDEX_NAME
+        self.wal_path = self.index_path.with_name(self.index_path.name + ".wal")
         self.index: Optional[faiss.Index] = None
         self.embedding_service = EmbeddingService()
         self.embedding_dim = settings.EMBEDDING_DIMENSION
         
-        # Track chunks in memory (for stats)
-        self._chunks: List[str] = []
+        # FAISS defaults to one OpenMP thread per logical CPU in every
+        # worker process; share the cores between workers instead
+        faiss.omp_set_num_threads(get_worker_cpu_count())
+        
+        # Chunk text and metadata indexed by FAISS id (also used for stats)
+        self._chunks: List[Optional[str]] = []
         self._metadata_list: List[Dict[str, Any]] = []
         
+        # (computed_at, stats) from the last get_stats() call
+        self._stats_cache: Optional[Tuple[float, Dict[str, Any]]] = None
+        
+        # Bumped on every write, so callers can tell cached results are stale
+        self.generation = 0
+        
+        # (query_vector, k, future) waiting for run_search_batcher()
+        self._search_queue: asyncio.Queue = asyncio.Queue()
+        self._search_batcher_running = False
+        
+        # Debounced index persistence; see _schedule_save(). _wal_bytes is
+        # the size of the write-ahead log, which holds vectors added since
+        # the index file was last written
+        self._index_dirty = False
+        self._wal_bytes = 0
+        self._save_task: Optional[asyncio.Task] = None
+        self._save_lock = asyncio.Lock()
+        
+        # Set while _maybe_convert_to_ivf() trains in a worker thread
+        self._ivf_converting = False
+        
         # Load or create index
         self._load_or_create_index()
         logger.info(f"Vector store initialized at {self.store_path}")
     
     def _load_or_create_index(self) -> None:
         """Load existing FAISS index or create a new one."""
+        # Vectors added after the index file was last written
+        wal_base, wal_vectors = self._read_wal()
+        
         if self.index_path.exists():
             try:
                 logger.info(f"Loading existing FAISS index from {self.index_path}")
                 self.index = faiss.read_index(str(self.index_path))
+                self._configure_index()
+                
+                # The index file may already hold the start of the log (a
+                # save finished but the log wasn't trimmed yet)
+                saved = self.index.ntotal - wal_base
+                if saved < 0:
+                    logger.warning(
+                        f"{self.wal_path} starts at id {wal_base} but the index holds "
+                        f"{self.index.ntotal} vectors; replaying the whole log"
+                    )
+                    saved = 0
+                pending = wal_vectors[saved:]
+                if len(pending):
+                    self.index.add(pending)
+                    self._wal_bytes = wal_vectors.nbytes
+                    self._index_dirty = True
+                    logger.info(f"Replayed {len(pending)} vectors from {self.wal_path}")
+                else:
+                    self.wal_path.unlink(missing_ok=True)
                 
                 # Load chunks and metadata from database
                 self._load_metadata_from_db()
@@ -56,27 +169,145 @@ class VectorStoreService:
         else:
             logger.info("No existing index found. Creating new FAISS index.")
             self._create_new_index()
+            if len(wal_vectors):
+                # Everything was added before the first full save
+                self.index.add(wal_vectors)
+                self._append_wal(wal_vectors)
+                self._load_metadata_from_db()
+                logger.info(f"Replayed {len(wal_vectors)} vectors from {self.wal_path}")
     
     def _create_new_index(self) -> None:
         """Create a new FAISS index."""
-        # Create L2 (Euclidean) distance index
-        # For cosine similarity, we normalize vectors
-        self.index = faiss.IndexFlatL2(self.embedding_dim)
+        # Vectors are normalized, so inner product is cosine similarity
+        self.index = faiss.IndexFlatIP(self.embedding_dim)
         self._chunks = []
         self._metadata_list = []
+        self._index_dirty = False
+        self.wal_path.unlink(missing_ok=True)
+        self._wal_bytes = 0
+        self.invalidate_stats_cache()
         logger.info(f"Created new FAISS index with dimension {self.embedding_dim}")
     
+    def _configure_index(self) -> None:
+        """Apply search-time parameters to the current index."""
+        if isinstance(self.index, faiss.IndexIVF):
+            self.index.nprobe = settings.VECTOR_STORE_IVF_NPROBE
+    
+    def _build_ivf_index(self, training_vectors: np.ndarray, metric: int) -> faiss.Index:
+        """Create a compressed IVF index trained on the given vectors.
+        
+        Queries then scan only nprobe inverted lists of compressed codes
+        instead of every full vector. The metric is kept from the flat index,
+        so similarity scores are computed the same way as before.
+        VECTOR_STORE_IVF_CODEC picks the code format: "sq8" (8-bit scalar
+        quantization, 1 byte per dimension; scores stay close enough to exact
+        cosine for SIMILARITY_THRESHOLD) or "pq" (product quantization, about
+        1 byte per 8 dimensions, with approximate scores).
+        
+        nlist grows with sqrt(N) but is capped so every list has enough
+        training points.
+        
+        Args:
+            training_vectors: Normalized embeddings to train on
+            metric: FAISS metric type of the index being replaced
+            
+        Returns:
+            Trained, empty IVF index
+        """
+        dimension = self.embedding_dim
+        nlist = max(1, min(
+            int(4 * math.sqrt(len(training_vectors))),
+            len(training_vectors) // IVF_TRAINING_POINTS_PER_LIST
+        ))
+        codec = settings.VECTOR_STORE_IVF_CODEC.lower()
+        
+        quantizer = faiss.IndexFlat(dimension, metric)
+        if codec == "sq8":
+            index = faiss.IndexIVFScalarQuantizer(
+                quantizer, dimension, nlist, faiss.ScalarQuantizer.QT_8bit, metric
+            )
+            description = f"IVF-SQ8 (nlist={nlist})"
+        else:
+            if codec != "pq":
+                logger.warning(f"Unknown VECTOR_STORE_IVF_CODEC '{codec}', using 'pq'")
+            # Aim for 8 dimensions per sub-quantizer; PQ needs m to divide d
+            m = next(m for m in range(max(1, dimension // 8), 0, -1) if dimension % m == 0)
+            index = faiss.IndexIVFPQ(quantizer, dimension, nlist, m, PQ_BITS, metric)
+            description = f"IVF-PQ (nlist={nlist}, m={m})"
+        index.train(training_vectors)
+        logger.info(f"Trained {description} index on {len(training_vectors)} vectors")
+        return index
+    
+    async def _maybe_convert_to_ivf(self, new_vectors: np.ndarray) -> None:
+        """Replace the flat index with a compressed IVF index once it grows large enough.
+        
+        Training uses every stored vector plus the batch about to be added;
+        the stored vectors are moved into the new index, the batch is left
+        for the caller to add. Training and the re-add run in a worker
+        thread; searches and adds keep using the flat index meanwhile, and
+        vectors added during training are copied over before the swap.
+        
+        Args:
+            new_vectors: Normalized embeddings about to be added
+        """
+        if not isinstance(self.index, faiss.IndexFlat) or self._ivf_converting:
+            return
+        if self.index.ntotal + len(new_vectors) < settings.VECTOR_STORE_IVF_MIN_VECTORS:
+            return
+        
+        self._ivf_converting = True
+        try:
+            existing = self.index.reconstruct_n(0, self.index.ntotal)
+            metric = self.index.metric_type
+            
+            def build() -> faiss.Index:
+                index = self._build_ivf_index(np.vstack([existing, new_vectors]), metric)
+                index.add(existing)
+                return index
+            
+            # Saves wait for the swap rather than rewriting the flat index
+            async with self._save_lock:
+                index = await asyncio.to_thread(build)
+                added = self.index.ntotal - len(existing)
+                if added:
+                    index.add(self.index.reconstruct_n(len(existing), added))
+                self.index = index
+                self._configure_index()
+        finally:
+            self._ivf_converting = False
+        
+        # Replaying the log into the old file would rebuild a flat index
+        self._schedule_save()
+    
     def _load_metadata_from_db(self) -> None:
         """Load chunk metadata from database."""
         try:
+            # Plain column rows rather than ORM objects: nothing here is
+            # modified, so identity-map bookkeeping would only cost memory
             with get_db() as db:
-                metadata_records = db.query(ChunkMetadata).all()
-                self._chunks = [record.chunk_text for record in metadata_records]
-                self._metadata_list = [
-                    record.extra_metadata or {} 
-                    for record in metadata_records
-                ]
-            logger.info(f"Loaded {len(self._chunks)} chunks from database")
+                rows = db.execute(
+                    select(
+                        ChunkMetadata.faiss_id,
+                        ChunkMetadata.chunk_text,
+                        ChunkMetadata.extra_metadata
+                    ).order_by(ChunkMetadata.faiss_id)
+                ).all()
+            
+            # Position i must hold FAISS id i; ids missing from the database
+            # are left as None and skipped by search()
+            size = rows[-1].faiss_id + 1 if rows else 0
+            chunks: List[Optional[str]] = [None] * size
+            metadata_list: List[Dict[str, Any]] = [{}] * size
+            for faiss_id, chunk_text, extra_metadata in rows:
+                chunks[faiss_id] = chunk_text
+                metadata_list[faiss_id] = extra_metadata or {}
+            if size != len(rows):
+                logger.warning(
+                    f"Chunk metadata is missing {size - len(rows)} of {size} FAISS ids"
+                )
+            self._chunks = chunks
+            self._metadata_list = metadata_list
+            logger.info(f"Loaded {len(rows)} chunks from database")
         except Exception as e:
             logger.warning(f"Failed to load metadata from database: {e}")
             self._chunks = []
@@ -109,22 +340,24 @@ class VectorStoreService:
         
         try:
             logger.info(f"Generating embeddings for {len(chunks)} chunks...")
-            embeddings = await self.embedding_service.embed_documents(chunks)
+            embeddings_array = await self.embedding_service.embed_documents_array(chunks)
             
-            if not embeddings:
+            if not len(embeddings_array):
                 raise ValueError("No embeddings generated")
             
-            if len(embeddings) != len(chunks):
+            if len(embeddings_array) != len(chunks):
                 raise ValueError(
-                    f"Embedding count ({len(embeddings)}) doesn't match chunk count ({len(chunks)})"
+                    f"Embedding count ({len(embeddings_array)}) doesn't match chunk count ({len(chunks)})"
                 )
             
-            # Convert to numpy array and normalize for cosine similarity
-            embeddings_array = np.array(embeddings, dtype=np.float32)
+            # Normalize for cosine similarity
             faiss.normalize_L2(embeddings_array)
             
+            # Large stores switch to an approximate index before adding
+            await self._maybe_convert_to_ivf(embeddings_array)
+            
             # Add to FAISS index
-            logger.info(f"Adding {len(embeddings)} embeddings to FAISS index...")
+            logger.info(f"Adding {len(embeddings_array)} embeddings to FAISS index...")
             self.index.add(embeddings_array)
             
             # Store chunks and metadata
@@ -135,8 +368,12 @@ class VectorStoreService:
             # Save metadata to database
             self._save_metadata_to_db(chunks, metadata, start_id)
             
-            # Save index to disk
-            self._save_index()
+            # Persist only the new vectors; the full index is rewritten
+            # later (debounced, off the event loop)
+            self._append_wal(embeddings_array)
+            if self._wal_bytes >= INDEX_WAL_MAX_VECTORS * self.embedding_dim * 4:
+                self._schedule_save()
+            self.invalidate_stats_cache()
             
             logger.info(
                 f"Successfully added {len(chunks)} chunks. "
@@ -161,33 +398,192 @@ class VectorStoreService:
             start_id: Starting FAISS index ID
         """
         try:
+            # One executemany INSERT instead of an ORM object per row
             with get_db() as db:
-                for i, (chunk, meta) in enumerate(zip(chunks, metadata)):
-                    faiss_id = start_id + i
-                    chunk_metadata = ChunkMetadata(
-                        faiss_id=faiss_id,
-                        chunk_text=chunk,
-                        extra_metadata=meta
-                    )
-                    db.add(chunk_metadata)
+                db.execute(
+                    insert(ChunkMetadata),
+                    [
+                        {
+                            "faiss_id": start_id + i,
+                            "chunk_text": chunk,
+                            "extra_metadata": meta
+                        }
+                        for i, (chunk, meta) in enumerate(zip(chunks, metadata))
+                    ]
+                )
                 db.commit()
             logger.info(f"Saved {len(chunks)} metadata records to database")
         except Exception as e:
             logger.warning(f"Failed to save metadata to database: {e}")
     
-    def _save_index(self) -> None:
-        """Save FAISS index to disk."""
+    def clear_metadata_in_db(self) -> int:
+        """Delete all chunk metadata records from the database.
+        
+        Blocking; async callers should run it in a worker thread.
+        
+        Returns:
+            Number of records deleted
+        """
+        # One bulk DELETE; rowcount replaces a separate COUNT query
+        with get_db() as db:
+            result = db.execute(
+                delete(ChunkMetadata).execution_options(synchronize_session=False)
+            )
+            db.commit()
+            count = result.rowcount
+        self.invalidate_stats_cache()
+        logger.info(f"Cleared {count} chunk metadata records from database")
+        return count
+
+    def backup_index(self, backup_path: Path) -> None:
+        """Preserve the current index file at backup_path.
+        
+        Uses a hard link where possible, which is constant time and costs no
+        extra disk space; callers unlink the original name afterwards, leaving
+        the link as the only copy. Falls back to a full copy across
+        filesystems or where links are unsupported.
+        
+        Blocking; async callers should run it in a worker thread.
+        
+        Args:
+            backup_path: Destination path for the backup
+        """
         try:
-            faiss.write_index(self.index, str(self.index_path))
-            logger.debug(f"Saved FAISS index to {self.index_path}")
-        except Exception as e:
-            logger.error(f"Failed to save FAISS index: {e}")
+            os.link(self.index_path, backup_path)
+        except OSError:
+            shutil.copy(self.index_path, backup_path)
+    
+    def _read_wal(self) -> Tuple[int, np.ndarray]:
+        """Read the vectors logged since the index file was last written.
+        
+        Returns:
+            Tuple of (FAISS id of the first logged vector, float32 array of
+            shape (n, embedding_dim)); the array is empty if there is no log
+        """
+        empty = np.empty((0, self.embedding_dim), dtype=np.float32)
+        if not self.wal_path.exists():
+            return 0, empty
+        
+        raw = self.wal_path.read_bytes()
+        if len(raw) < WAL_HEADER_BYTES:
+            self.wal_path.unlink()
+            return 0, empty
+        
+        base = int(np.frombuffer(raw[:WAL_HEADER_BYTES], dtype=np.int64)[0])
+        payload = raw[WAL_HEADER_BYTES:]
+        # A crash mid-append can leave a partial vector at the end; cut it
+        # off so later appends stay aligned
+        usable = len(payload) - len(payload) % (self.embedding_dim * 4)
+        if usable != len(payload):
+            os.truncate(self.wal_path, WAL_HEADER_BYTES + usable)
+        data = np.frombuffer(payload[:usable], dtype=np.float32).copy()
+        return base, data.reshape(-1, self.embedding_dim)
+    
+    def _append_wal(self, vectors: np.ndarray) -> None:
+        """Append vectors to the write-ahead log.
+        
+        Costs O(batch) I/O instead of the O(index) of a full write; the OS
+        flushes the data, so it survives an application crash.
+        
+        Args:
+            vectors: Normalized embeddings just added to the index
+        """
+        data = np.ascontiguousarray(vectors, dtype=np.float32).tobytes()
+        with open(self.wal_path, "ab") as f:
+            if f.tell() == 0:
+                # Called after the vectors were added to the index
+                base = self.index.ntotal - len(vectors)
+                f.write(np.array([base], dtype=np.int64).tobytes() + data)
+            else:
+                f.write(data)
+        self._wal_bytes += len(data)
+        self._index_dirty = True
+    
+    def _trim_wal(self, saved_bytes: int) -> None:
+        """Drop the first saved_bytes of the log, now covered by the index file.
+        
+        Vectors logged while the index was being written are kept, and the
+        header moves forward to the first of them.
+        
+        Args:
+            saved_bytes: Log size (excluding the header) when the saved index
+                was serialized
+        """
+        if saved_bytes >= self._wal_bytes:
+            self.wal_path.unlink(missing_ok=True)
+            self._wal_bytes = 0
+            return
+        
+        with open(self.wal_path, "rb") as f:
+            base = int(np.frombuffer(f.read(WAL_HEADER_BYTES), dtype=np.int64)[0])
+            f.seek(WAL_HEADER_BYTES + saved_bytes)
+            remaining = f.read()
+        base += saved_bytes // (self.embedding_dim * 4)
+        tmp_path = self.wal_path.with_name(self.wal_path.name + ".tmp")
+        with open(tmp_path, "wb") as f:
+            f.write(np.array([base], dtype=np.int64).tobytes() + remaining)
+        os.replace(tmp_path, self.wal_path)
+        self._wal_bytes = len(remaining)
+    
+    def _schedule_save(self) -> None:
+        """Mark the index as changed and save it after INDEX_SAVE_DELAY_SECONDS.
+        
+        Each save serializes the whole index, so batches added while a save
+        is pending are written together instead of one full write each.
+        """
+        self._index_dirty = True
+        if self._save_task is None or self._save_task.done():
+            self._save_task = asyncio.create_task(self._save_after_delay())
+    
+    async def _save_after_delay(self) -> None:
+        """Wait out the debounce delay, then save the index."""
+        await asyncio.sleep(INDEX_SAVE_DELAY_SECONDS)
+        await self.flush_index()
+    
+    async def flush_index(self) -> None:
+        """Write the full index now if it has changes beyond the index file.
+        
+        Also waits for a save already in progress, so once this returns the
+        index file on disk is current and the write-ahead log is empty
+        (unless vectors were added during the write). Called at shutdown and
+        before admin operations touch the index file.
+        """
+        async with self._save_lock:
+            if not self._index_dirty:
+                return
+            self._index_dirty = False
+            try:
+                # Serializing is an in-memory copy done on the event loop,
+                # so adds can't change the index mid-write; only the disk
+                # write runs in a worker thread
+                data = faiss.serialize_index(self.index)
+                saved_wal_bytes = self._wal_bytes
+                await asyncio.to_thread(self._write_index_file, data)
+                self._trim_wal(saved_wal_bytes)
+                logger.debug(f"Saved FAISS index to {self.index_path}")
+            except Exception as e:
+                self._index_dirty = True
+                logger.error(f"Failed to save FAISS index: {e}")
+    
+    def _write_index_file(self, data: np.ndarray) -> None:
+        """Atomically replace the index file with serialized index data.
+        
+        Args:
+            data: Output of faiss.serialize_index()
+        """
+        tmp_path = self.index_path.with_name(self.index_path.name + ".tmp")
+        with open(tmp_path, "wb") as f:
+            f.write(data.tobytes())
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.index_path)
     
     async def search(
         self,
         query: str,
         top_k: Optional[int] = None,
-        threshold: Optional[float] = None
+        threshold: Optional[float] = None,
+        query_embedding: Optional[List[float]] = None
     ) -> List[Tuple[str, float, Dict[str, Any]]]:
         """Search for similar documents.
         
@@ -195,6 +591,7 @@ class VectorStoreService:
             query: Query text
             top_k: Number of results to return
             threshold: Minimum similarity threshold (0.0 to 1.0)
+            query_embedding: Embedding of query, if the caller already has it
             
         Returns:
             List of tuples (chunk_text, similarity_score, metadata)
@@ -208,25 +605,36 @@ class VectorStoreService:
         
         try:
             # Generate query embedding
-            query_embedding = await self.embedding_service.embed_text(query)
+            if query_embedding is None:
+                query_embedding = await self.embedding_service.embed_text(query)
             query_vector = np.array([query_embedding], dtype=np.float32)
             faiss.normalize_L2(query_vector)
             
             # Search in FAISS
             k = min(top_k, self.index.ntotal)
-            distances, indices = self.index.search(query_vector, k)
+            distances, indices = await self._search_index(query_vector[0], k)
             
-            # Convert distances to similarity scores (1 - normalized distance)
-            # For L2 distance on normalized vectors: similarity = 1 - (distance / 2)
-            similarities = 1 - (distances[0] / 2.0)
+            # Inner product on normalized vectors is already the cosine
+            # similarity. Indexes created before the switch to inner product
+            # return squared L2 distances: similarity = 1 - (distance / 2)
+            if self.index.metric_type == faiss.METRIC_INNER_PRODUCT:
+                similarities = distances
+            else:
+                similarities = 1 - (distances / 2.0)
             
-            # Filter by threshold and format results
-            results = []
-            for i, (idx, sim) in enumerate(zip(indices[0], similarities)):
-                if sim >= threshold and idx < len(self._chunks):
-                    chunk_text = self._chunks[idx]
-                    metadata = self._metadata_list[idx] if idx < len(self._metadata_list) else {}
-                    results.append((chunk_text, float(sim), metadata))
+            # Filter by threshold in one vectorised pass; IVF indexes pad
+            # missing results with -1
+            keep = (similarities >= threshold) & (indices >= 0) & (indices < len(self._chunks))
+            metadata_count = len(self._metadata_list)
+            results = [
+                (
+                    self._chunks[idx],
+                    sim,
+                    self._metadata_list[idx] if idx < metadata_count else {}
+                )
+                for idx, sim in zip(indices[keep].tolist(), similarities[keep].tolist())
+                if self._chunks[idx] is not None
+            ]
             
             logger.info(
                 f"Search returned {len(results)} results "
@@ -238,19 +646,119 @@ class VectorStoreService:
             logger.error(f"Error searching vector store: {e}", exc_info=True)
             return []
     
+    async def _search_index(
+        self,
+        query_vector: np.ndarray,
+        k: int
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """Search the index for one normalized query vector.
+        
+        While run_search_batcher() is running the query joins the current
+        batch; otherwise the index is searched directly.
+        
+        Args:
+            query_vector: Normalized query embedding
+            k: Number of neighbours to return
+            
+        Returns:
+            Tuple of (distances, indices), each of length k
+        """
+        if not self._search_batcher_running:
+            distances, indices = self.index.search(query_vector[np.newaxis], k)
+            return distances[0], indices[0]
+        
+        future = asyncio.get_running_loop().create_future()
+        self._search_queue.put_nowait((query_vector, k, future))
+        return await future
+    
+    async def run_search_batcher(self) -> None:
+        """Answer queued searches in batches until cancelled.
+        
+        Queries arriving within SEARCH_BATCH_WINDOW_SECONDS of the first one
+        (up to SEARCH_BATCH_MAX_SIZE) are stacked into one matrix, so FAISS
+        computes their distances together instead of one query at a time.
+        """
+        loop = asyncio.get_running_loop()
+        self._search_batcher_running = True
+        try:
+            while True:
+                batch = [await self._search_queue.get()]
+                try:
+                    deadline = loop.time() + SEARCH_BATCH_WINDOW_SECONDS
+                    while len(batch) < SEARCH_BATCH_MAX_SIZE:
+                        timeout = deadline - loop.time()
+                        if timeout <= 0:
+                            break
+                        try:
+                            batch.append(await asyncio.wait_for(self._search_queue.get(), timeout))
+                        except asyncio.TimeoutError:
+                            break
+                except asyncio.CancelledError:
+                    self._search_batch(batch)
+                    raise
+                self._search_batch(batch)
+        finally:
+            # Searches queued from now on go straight to the index; answer
+            # the ones already waiting
+            self._search_batcher_running = False
+            while not self._search_queue.empty():
+                self._search_batch([self._search_queue.get_nowait()])
+    
+    def _search_batch(self, batch: List[Tuple[np.ndarray, int, asyncio.Future]]) -> None:
+        """Run one index.search() for a batch of queued queries.
+        
+        Args:
+            batch: (query_vector, k, future) for each query
+        """
+        try:
+            # Results are sorted by distance, so each query's top k is a
+            # prefix of the batch's top max(k)
+            max_k = min(max(k for _, k, _ in batch), self.index.ntotal)
+            distances, indices = self.index.search(
+                np.vstack([vector for vector, _, _ in batch]), max_k
+            )
+        except Exception as e:
+            for _, _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        
+        for row, (_, k, future) in enumerate(batch):
+            # Skip callers that were cancelled while waiting
+            if not future.done():
+                future.set_result((distances[row, :k], indices[row, :k]))
+    
     def get_stats(self) -> Dict[str, Any]:
         """Get vector store statistics.
         
+        Results are cached for STATS_CACHE_TTL_SECONDS so health probes and
+        query handlers share one computation; writes invalidate the cache.
+        
         Returns:
             Dictionary with stats
         """
+        now = time.monotonic()
+        cached = self._stats_cache
+        if cached is not None and now - cached[0] < STATS_CACHE_TTL_SECONDS:
+            return dict(cached[1])
+        
         total_vectors = self.index.ntotal if self.index else 0
         chunks_count = len(self._chunks)
         
-        return {
+        stats = {
             "total_vectors": total_vectors,
             "chunks_count": chunks_count,
             "is_synced": total_vectors == chunks_count,
             "index_path": str(self.index_path),
             "index_exists": self.index_path.exists()
         }
+        self._stats_cache = (now, stats)
+        return dict(stats)
+    
+    def invalidate_stats_cache(self) -> None:
+        """Drop cached stats so the next get_stats() call recomputes them.
+        
+        Called after every write, so it also advances the store generation.
+        """
+        self._stats_cache = None
+        self.generation += 1
@@ -1,21 +1,34 @@
 """Example script to test the RAG API."""
 
-import requests
+import asyncio
 import json
+import time
+
+import httpx
 
 API_URL = "http://localhost:8000/api/v1"
 
+# Requests sent at once by check_concurrent_queries()
+CONCURRENT_QUERIES = 20
+
+SAMPLE_QUERIES = [
+    "What is artificial intelligence?",
+    "How does machine learning work?",
+    "What is deep learning?",
+    "What are neural networks used for?",
+]
+
 
-def test_health():
+async def check_health(client: httpx.AsyncClient):
     """Test health endpoint."""
     print("Testing health endpoint...")
-    response = requests.get(f"{API_URL}/health")
+    response = await client.get("/health")
     print(f"Status: {response.status_code}")
     print(f"Response: {json.dumps(response.json(), indent=2)}")
     print()
 
 
-def test_ingest_text():
+async def check_ingest_text(client: httpx.AsyncClient):
     """Test text ingestion."""
     print("Testing text ingestion...")
     sample_text = """
@@ -25,20 +38,17 @@ def test_ingest_text():
     with multiple layers to process complex patterns in data.
     """
     
-    response = requests.post(
-        f"{API_URL}/ingest",
-        json={"text": sample_text}
-    )
+    response = await client.post("/ingest", json={"text": sample_text})
     print(f"Status: {response.status_code}")
     print(f"Response: {json.dumps(response.json(), indent=2)}")
     print()
 
 
-def test_query():
+async def check_query(client: httpx.AsyncClient):
     """Test query endpoint."""
     print("Testing query endpoint...")
-    response = requests.post(
-        f"{API_URL}/query",
+    response = await client.post(
+        "/query",
         json={"query": "What is artificial intelligence?"}
     )
     print(f"Status: {response.status_code}")
@@ -48,6 +58,37 @@ def test_query():
     print()
 
 
+async def check_concurrent_queries(client: httpx.AsyncClient, count: int = CONCURRENT_QUERIES):
+    """Send many queries at once and report throughput."""
+    print(f"Testing {count} concurrent queries...")
+    queries = [SAMPLE_QUERIES[i % len(SAMPLE_QUERIES)] for i in range(count)]
+    
+    start = time.perf_counter()
+    responses = await asyncio.gather(
+        *(client.post("/query", json={"query": query}) for query in queries)
+    )
+    elapsed = time.perf_counter() - start
+    
+    succeeded = sum(1 for response in responses if response.status_code == 200)
+    print(f"Succeeded: {succeeded}/{count}")
+    print(f"Elapsed: {elapsed:.2f}s ({count / elapsed:.1f} queries/s)")
+    print()
+
+
+async def main():
+    """Run every check against one shared connection pool."""
+    # Queries wait on the embedding and LLM APIs, so allow generous timeouts
+    async with httpx.AsyncClient(
+        base_url=API_URL,
+        timeout=120.0,
+        limits=httpx.Limits(max_connections=CONCURRENT_QUERIES)
+    ) as client:
+        await check_health(client)
+        await check_ingest_text(client)
+        await check_query(client)
+        await check_concurrent_queries(client)
+
+
 if __name__ == "__main__":
     print("=" * 50)
     print("RAG API Test Script")
@@ -55,11 +96,9 @@ if __name__ == "__main__":
     print()
     
     try:
-        test_health()
-        test_ingest_text()
-        test_query()
+        asyncio.run(main())
         print("All tests completed!")
-    except requests.exceptions.ConnectionError:
+    except httpx.ConnectError:
         print("Error: Could not connect to API. Make sure the server is running.")
     except Exception as e:
         print(f"Error: {e}")